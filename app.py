@@ -1,85 +1,99 @@
+import hmac
+import os
 import dash
 from dash import dcc, html
-from src.components.sidebar import create_sidebar
-from src.components.pages.overview import create_overview_page, register_callbacks as register_overview_callbacks
-from src.components.pages.region import create_region_page, register_callbacks as register_region_callbacks
-from src.components.pages.customer import create_customer_page, register_callbacks as register_customer_callbacks
-from src.components.pages.profit import create_profit_page, register_callbacks as register_profit_callbacks
+from src.components.sidebar import create_sidebar, page_from_path, register_callbacks as register_sidebar_callbacks
+from src.components.pages.overview import render_overview_page, register_callbacks as register_overview_callbacks
+from src.components.pages.region import render_region_page, register_callbacks as register_region_callbacks
+from src.components.pages.customer import render_customer_page, register_callbacks as register_customer_callbacks
+from src.components.pages.profit import render_profit_page, models_loaded, register_callbacks as register_profit_callbacks
 from dash.dependencies import Input, Output
+from flask import jsonify, request
+from src.config import settings
+from src.data.refresher import get_status, is_ready, start_background, trigger_refresh
+from src.components import tables
+from src.utils import response_cache
 
-# Inisialisasi aplikasi Dash
-app = dash.Dash(__name__, suppress_callback_exceptions=True)
-app.title = "Superstore BI Dashboard"
+# Halaman dirender lengkap (layout + figure awal) dalam satu response
+PAGE_RENDERERS = {
+    'overview': render_overview_page,
+    'region': render_region_page,
+    'customer': render_customer_page,
+    'profit': render_profit_page,
+}
 
-# Daftarkan callback dari setiap halaman
-register_overview_callbacks(app)
-register_region_callbacks(app)
-register_customer_callbacks(app)
-register_profit_callbacks(app)
+def _admin_allowed():
+    if settings.ADMIN_TOKEN:
+        return hmac.compare_digest(request.headers.get('X-Admin-Token', ''), settings.ADMIN_TOKEN)
+    return request.remote_addr in ('127.0.0.1', '::1')
 
-# Layout utama
-app.layout = html.Div([
-    dcc.Store(id='current-page', data='overview'),
-    create_sidebar(),
-    html.Div(id='page-content', style={'margin-left': '270px', 'padding': '20px', 'background-color': '#f8f9fa', 'min-height': '100vh'})
-])
+def create_app(background=True):
+    """Build the Dash app. With background=False nothing is started in this
+    process (for a preloading server: see wsgi.py and gunicorn.conf.py)."""
+    # Inisialisasi aplikasi Dash
+    app = dash.Dash(__name__, suppress_callback_exceptions=True)
+    app.title = "Superstore BI Dashboard"
 
-# Callback untuk navigasi halaman
-@app.callback(
-    Output('page-content', 'children'),
-    [Input('current-page', 'data')]
-)
-def display_page(current_page):
-    print(f"Rendering page: {current_page}")
-    if current_page == 'overview':
-        return create_overview_page()
-    elif current_page == 'region':
-        return create_region_page()
-    elif current_page == 'customer':
-        return create_customer_page()
-    elif current_page == 'profit':
-        return create_profit_page()
-    return create_overview_page()
+    # Daftarkan callback dari sidebar dan setiap halaman
+    register_sidebar_callbacks(app)
+    register_overview_callbacks(app)
+    register_region_callbacks(app)
+    register_customer_callbacks(app)
+    register_profit_callbacks(app)
 
-# Callback untuk navigasi sidebar
-@app.callback(
-    [Output('current-page', 'data'),
-     Output('nav-overview', 'style'),
-     Output('nav-region', 'style'),
-     Output('nav-customer', 'style'),
-     Output('nav-profit', 'style')],
-    [Input('nav-overview', 'n_clicks'),
-     Input('nav-region', 'n_clicks'),
-     Input('nav-customer', 'n_clicks'),
-     Input('nav-profit', 'n_clicks')]
-)
-def update_page(overview_clicks, region_clicks, customer_clicks, profit_clicks):
-    from src.config.styles import custom_style
-    ctx = dash.callback_context
-    
-    if not ctx.triggered:
-        print("No navigation triggered, defaulting to overview")
-        return 'overview', {**custom_style['nav-link'], **custom_style['nav-link-active']}, custom_style['nav-link'], custom_style['nav-link'], custom_style['nav-link']
-    
-    button_id = ctx.triggered[0]['prop_id'].split('.')[0]
-    print(f"Navigation triggered by: {button_id}")
-    
-    styles = [custom_style['nav-link']] * 4
-    if button_id == 'nav-overview':
-        styles[0] = {**custom_style['nav-link'], **custom_style['nav-link-active']}
-        return 'overview', *styles
-    elif button_id == 'nav-region':
-        styles[1] = {**custom_style['nav-link'], **custom_style['nav-link-active']}
-        return 'region', *styles
-    elif button_id == 'nav-customer':
-        styles[2] = {**custom_style['nav-link'], **custom_style['nav-link-active']}
-        return 'customer', *styles
-    elif button_id == 'nav-profit':
-        styles[3] = {**custom_style['nav-link'], **custom_style['nav-link-active']}
-        return 'profit', *styles
-    
-    return 'overview', {**custom_style['nav-link'], **custom_style['nav-link-active']}, custom_style['nav-link'], custom_style['nav-link'], custom_style['nav-link']
+    # Layout utama; halaman aktif mengikuti URL (/, /region, /customer, /profit)
+    app.layout = html.Div([
+        dcc.Location(id='url'),
+        create_sidebar(),
+        html.Div(id='page-content', style={'margin-left': '270px', 'padding': '20px', 'background-color': '#f8f9fa', 'min-height': '100vh'})
+    ])
 
-if __name__ == '__main__':
-    app.run(debug=True, port=8050)
+    # Callback untuk navigasi halaman: satu request per perpindahan halaman,
+    # callback grafik halaman baru tidak dipanggil lagi (prevent_initial_call)
+    @app.callback(
+        Output('page-content', 'children'),
+        [Input('url', 'pathname')]
+    )
+    def display_page(pathname):
+        current_page = page_from_path(pathname)
+        print(f"Rendering page: {current_page}")
+        return PAGE_RENDERERS[current_page]()
+
+    # Endpoint admin untuk refresh dataset (POST ?full=1 untuk reload penuh)
+    @app.server.route('/admin/refresh', methods=['GET', 'POST'])
+    def admin_refresh():
+        if not _admin_allowed():
+            return jsonify({'error': 'forbidden'}), 403
+        if request.method == 'POST':
+            trigger_refresh(full=request.args.get('full') in ('1', 'true'))
+            return jsonify({'triggered': True, **get_status()}), 202
+        return jsonify(get_status())
+
+    # Statistik cache response callback (POST untuk mengosongkan)
+    @app.server.route('/admin/cache', methods=['GET', 'POST'])
+    def admin_cache():
+        if not _admin_allowed():
+            return jsonify({'error': 'forbidden'}), 403
+        if request.method == 'POST':
+            response_cache.clear()
+            tables.clear()
+        return jsonify(response_cache.get_stats())
 
+    # Readiness probe: 200 setelah dataset dimuat dan cache-nya dibangun, 503 sebelumnya
+    @app.server.route('/ready')
+    def ready():
+        status = get_status()
+        body = {'ready': is_ready(), 'generation': status['generation'], 'rows': status['rows'],
+                'models_loaded': models_loaded()}
+        return jsonify(body), 200 if body['ready'] else 503
+
+    if background:
+        start_background()
+    return app
+
+if __name__ == '__main__':
+    debug = True
+    # Dengan reloader (debug) proses induk hanya mengawasi file: warm-up dan refresher
+    # hanya dijalankan di proses anak yang melayani request (WERKZEUG_RUN_MAIN)
+    app = create_app(background=not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true')
+    app.run(debug=debug, port=8050)
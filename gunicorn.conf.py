@@ -0,0 +1,18 @@
+# Konfigurasi gunicorn: gunicorn -c gunicorn.conf.py wsgi:server
+import os
+
+bind = os.environ.get('SUPERSTORE_BIND', '0.0.0.0:8050')
+workers = int(os.environ.get('WEB_CONCURRENCY', '4'))
+worker_class = 'gthread'
+threads = int(os.environ.get('SUPERSTORE_THREADS', '4'))
+timeout = int(os.environ.get('SUPERSTORE_WORKER_TIMEOUT', '120'))
+
+# wsgi.py memuat dataset dan model di master sebelum fork; worker berbagi halamannya copy-on-write
+preload_app = True
+
+
+def post_fork(server, worker):
+    # Pool koneksi warisan master dilepas oleh hook at-fork di src/config/database.py.
+    # Thread tidak ikut ter-fork, jadi refresher dimulai di setiap worker.
+    from src.data.refresher import start_background
+    start_background()
@@ -0,0 +1,163 @@
+import logging
+import math
+
+import numpy as np
+import plotly.graph_objects as go
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Kelipatan "bulat" lebar bin, seperti autobin plotly.js
+_NICE_STEPS = (1, 2, 2.5, 5, 10)
+
+
+def _bin_width(low, high, nbins):
+    # Satu nilai saja: bin sempit di sekitar nilai itu
+    span = (high - low) or abs(low) or 1.0
+    raw = span / nbins
+    scale = 10 ** math.floor(math.log10(raw))
+    return next(step * scale for step in _NICE_STEPS if step * scale >= raw)
+
+
+def histogram_bins(values, nbins, weights=None):
+    """(bin edges, totals) of `values` in at most about `nbins` bins of a round width.
+
+    Totals count the values per bin, or sum their `weights`. Bins are closed
+    on the left, the last one on both sides; NaN values are dropped and no
+    values give no bins.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    keep = ~np.isnan(values)
+    values = values[keep]
+    if weights is not None:
+        weights = np.asarray(weights, dtype=np.float64)[keep]
+    if len(values) == 0:
+        return np.zeros(1), np.zeros(0)
+    low, high = values.min(), values.max()
+    width = _bin_width(low, high, nbins)
+    # Tepi dibulatkan ke presisi lebar bin (bukan 0.30000000000000004), nilai sedikit lebih halus:
+    # noise float32 (0.7 -> 0.69999999) tidak menggeser nilai yang tepat di tepi ke bin sebelumnya
+    decimals = max(0, -math.floor(math.log10(width))) + 2
+    values = np.round(values, decimals + 3)
+    start = math.floor(low / width) * width
+    count = max(1, math.ceil((high - start) / width + 1e-9))
+    edges = np.round(start + width * np.arange(count + 1), decimals)
+    totals, edges = np.histogram(values, bins=edges, weights=weights)
+    return edges, totals
+
+
+def histogram(values, nbins, title, x_title, color, weights=None, y_title='count'):
+    """Histogram binned on the server and drawn as one bar per bin.
+
+    Looks like px.histogram, but the figure carries one value per bin instead
+    of every underlying value, so its size doesn't grow with the data.
+    """
+    edges, totals = histogram_bins(values, nbins, weights)
+    figure = go.Figure(go.Bar(
+        x=np.round((edges[:-1] + edges[1:]) / 2, 12),
+        y=totals,
+        width=np.diff(edges),
+        customdata=np.column_stack([edges[:-1], edges[1:]]),
+        marker_color=color,
+        hovertemplate=f'{x_title}=%{{customdata[0]}} - %{{customdata[1]}}<br>{y_title}=%{{y}}<extra></extra>'
+    ))
+    figure.update_layout(title=title, xaxis_title=x_title, yaxis_title=y_title, bargap=0)
+    return figure
+
+
+# Properti scatter yang tidak ada di scattergl (mis. cliponaxis, orientation) dibuang saat konversi
+_GL_PROPS = set(go.Scattergl()._valid_props)
+
+
+def _numeric(values):
+    return np.asarray(values).dtype.kind in 'biuf'
+
+
+def _marker_trace(trace):
+    return trace.type in ('scatter', 'scattergl') and trace.x is not None and 'markers' in (trace.mode or '') \
+        and 'lines' not in (trace.mode or '')
+
+
+def _grid_cells(values, low, high, size):
+    scaled = (np.nan_to_num(np.asarray(values, dtype=np.float64)) - low) / ((high - low) or 1.0)
+    return np.clip((scaled * size).astype(np.int64), 0, size - 1)
+
+
+def _thin(trace, keep, bounds):
+    """Positions of at most `keep` points of `trace`: one per occupied cell of a
+    grid over the plot area, the biggest marker of each cell first"""
+    n = len(trace.x)
+    size = trace.marker.size
+    order = np.arange(n)
+    if size is not None and not np.isscalar(size):
+        order = np.argsort(-np.abs(np.asarray(size, dtype=np.float64)), kind='stable')
+    if bounds is None or not (_numeric(trace.x) and _numeric(trace.y)):
+        return np.unique(np.linspace(0, n - 1, keep).round().astype(np.int64))
+    def first_per_cell(side):
+        cells = _grid_cells(trace.x, bounds[0], bounds[1], side) * side + _grid_cells(trace.y, bounds[2], bounds[3], side)
+        return np.unique(cells[order], return_index=True)[1]
+
+    # Data yang mengumpul mengisi sedikit sel: grid diperhalus selama sel terisi masih dalam jatah
+    side = max(1, math.isqrt(keep))
+    first = first_per_cell(side)
+    while side < n:
+        finer = first_per_cell(side * 3 // 2 + 1)
+        if len(finer) > keep:
+            break
+        side, first = side * 3 // 2 + 1, finer
+    return np.sort(order[first])
+
+
+def _take(props, n, positions):
+    # Semua properti per titik (x, y, customdata, hovertext, marker.size/color, ...) dipotong bersama
+    taken = {}
+    for key, value in props.items():
+        if isinstance(value, dict):
+            taken[key] = _take(value, n, positions)
+        elif isinstance(value, np.ndarray) and value.ndim > 0 and len(value) == n:
+            taken[key] = value[positions]
+        elif isinstance(value, (list, tuple)) and len(value) == n and key != 'colorscale':
+            taken[key] = [value[i] for i in positions]
+        else:
+            taken[key] = value
+    return taken
+
+
+def _bounds(traces):
+    xs = [np.asarray(trace.x, dtype=np.float64) for trace in traces if _numeric(trace.x) and _numeric(trace.y)]
+    ys = [np.asarray(trace.y, dtype=np.float64) for trace in traces if _numeric(trace.x) and _numeric(trace.y)]
+    if not xs:
+        return None
+    x, y = np.concatenate(xs), np.concatenate(ys)
+    return np.nanmin(x), np.nanmax(x), np.nanmin(y), np.nanmax(y)
+
+
+def apply_point_budget(figure, budget=None):
+    """`figure` with at most about `budget` scatter markers (default settings.POINT_BUDGET).
+
+    Above the budget, marker-only scatter traces become WebGL (scattergl) and
+    are thinned on the server to their share of the budget, keeping one point
+    per occupied cell of a grid over the plot area so clusters and outliers
+    stay visible. Figures within the budget are returned unchanged.
+    """
+    budget = settings.POINT_BUDGET if budget is None else budget
+    traces = [trace for trace in figure.data if _marker_trace(trace)]
+    total = sum(len(trace.x) for trace in traces)
+    if budget <= 0 or total <= budget:
+        return figure
+
+    bounds = _bounds(traces)
+    data = []
+    kept = 0
+    for trace in figure.data:
+        if not _marker_trace(trace):
+            data.append(trace)
+            continue
+        n = len(trace.x)
+        positions = _thin(trace, max(1, budget * n // total), bounds)
+        props = _take(trace.to_plotly_json(), n, positions)
+        data.append(go.Scattergl({key: value for key, value in props.items() if key in _GL_PROPS}))
+        kept += len(positions)
+    logger.debug(f"Scatter figure thinned from {total} to {kept} points (WebGL)")
+    return go.Figure(data=data, layout=figure.layout)
@@ -1,15 +1,30 @@
+import logging
 import dash
 import pandas as pd
-from dash import html, dcc, dash_table
+from dash import html, dcc
 from dash.dependencies import Input, Output, State
 import plotly.express as px
 from src.config.styles import custom_style
-from src.data.data_loader import get_data
+from src.data.query import aggregate, is_empty
+from src.components.figures import histogram
+from src.components.render import fill_outputs, initial_value
+from src.components.tables import (PAGE_SIZE, explorer_table, register_table_callback, table_frame, table_outputs,
+                                   table_page)
+from src.utils.response_cache import cached_callback
+
+logger = logging.getLogger(__name__)
+
+# Tabel customer: semua customer, dipaging/diurutkan/difilter di server
+CUSTOMER_COLUMNS = [
+    {"name": i, "id": i, "type": "numeric", "format": {"specifier": ",.0f"}} if i != "Customer"
+    else {"name": i, "id": i} for i in ['Customer', 'Sales ($)', 'Profit ($)', 'Orders']
+]
+CUSTOMER_SORT = [{'column_id': 'Sales ($)', 'direction': 'desc'}]
+CUSTOMER_TOOLTIPS = {'Sales ($)': ',.0f', 'Profit ($)': ',.0f', 'Orders': ',.0f'}
 
 def create_customer_page():
-    df, _, _, _, _, _, _ = get_data()
-    if df.empty:
-        print("Customer page: DataFrame is empty")
+    if is_empty():
+        logger.warning("Customer page: DataFrame is empty")
         return html.Div([
             html.H1("👥 Customer Analysis Dashboard", style={'color': '#2c3e50', 'margin-bottom': '30px'}),
             html.P("⚠️ Tidak ada data tersedia. Periksa koneksi database atau file data_loader.py.", 
@@ -65,8 +80,8 @@ def create_customer_page():
         # Customer Details
         html.Div([
             html.Div([
-                html.H3("🌟 Top 10 Customers", style={'color': '#2c3e50', 'margin-bottom': '20px'}),
-                html.Div(id="top-customers-table")
+                html.H3("🌟 Customers by Sales", style={'color': '#2c3e50', 'margin-bottom': '20px'}),
+                explorer_table('top-customers-table', CUSTOMER_COLUMNS, CUSTOMER_SORT)
             ], style={**custom_style['card'], 'width': '50%'}),
             
             html.Div([
@@ -75,6 +90,106 @@ def create_customer_page():
         ], style={'display': 'flex', 'gap': '20px'}),
     ])
 
+# Output callback grafik; render_*_page() mengisinya langsung di layout awal
+CHART_OUTPUTS = [
+    ('customer-segment-chart', 'figure'),
+    ('customer-value-dist', 'figure'),
+    ('repeat-customer-chart', 'figure'),
+    ('monthly-customer-trend', 'figure'),
+    ('customer-filter-indicator', 'children'),
+]
+
+def _filters(filter_state):
+    selected_segment = filter_state.get('selected_segment')
+    selected_customer_type = filter_state.get('selected_customer_type')
+    if selected_segment:
+        return {'segment': selected_segment}
+    if selected_customer_type:
+        # Repeat = lebih dari satu order (filters.COHORTS), dihitung di backend query
+        return {'repeat_customer': selected_customer_type == 'Repeat'}
+    return {}
+
+@cached_callback('customer-charts')
+def update_customer_charts(filter_state):
+    selected_segment = filter_state.get('selected_segment')
+    selected_customer_type = filter_state.get('selected_customer_type')
+
+    # Update filter text
+    if selected_segment:
+        filter_text = f"Filtered by Segment: {selected_segment}"
+    elif selected_customer_type:
+        filter_text = f"Filtered by Customer Type: {selected_customer_type}"
+    else:
+        filter_text = "No filter applied. Click on charts to filter data."
+
+    # Filter data based on selections
+    filters = _filters(filter_state)
+
+    # Customer Segment Chart
+    segment_counts = aggregate({'customer_id': ('customer_id', 'nunique')}, by=['segment'], filters=filters)
+    segment_chart = px.pie(segment_counts, values='customer_id', names='segment',
+                          title=f'👥 Customer Distribution by Segment {"- " + selected_segment if selected_segment else ""}',
+                          color_discrete_sequence=['#667eea', '#f5576c', '#43e97b'])
+    segment_chart.update_layout(plot_bgcolor='white', paper_bgcolor='white')
+
+    # Per-customer totals feed the value distribution and repeat analysis
+    customer_totals = aggregate({
+        'sales': ('sales', 'sum'),
+        'profit': ('profit', 'sum'),
+        'order_key': ('order_key', 'nunique')
+    }, by=['customer_name'], filters=filters)
+
+    # Customer Value Distribution
+    value_dist = histogram(customer_totals['sales'], nbins=30,
+                           title=f'💵 Customer Value Distribution {"- " + selected_segment if selected_segment else "- " + selected_customer_type if selected_customer_type else ""}',
+                           x_title='sales', color='#667eea')
+    value_dist.update_layout(plot_bgcolor='white', paper_bgcolor='white')
+
+    # Repeat Customer Analysis
+    customer_orders = customer_totals[['customer_name', 'order_key']].copy()
+    customer_orders['customer_type'] = customer_orders['order_key'].apply(lambda x: 'Repeat' if x > 1 else 'One-time')
+    repeat_analysis = customer_orders['customer_type'].value_counts().reset_index()
+    repeat_analysis.columns = ['customer_type', 'count']
+
+    repeat_chart = px.bar(repeat_analysis, x='customer_type', y='count',
+                         title=f'🔄 Repeat vs One-time Customers {"- " + selected_segment if selected_segment else ""}',
+                         color='customer_type',
+                         color_discrete_sequence=['#f5576c', '#43e97b'])
+    repeat_chart.update_layout(plot_bgcolor='white', paper_bgcolor='white')
+
+    # Monthly Customer Trend
+    monthly_customers = aggregate({'customer_id': ('customer_id', 'nunique')}, by=['year', 'month'], filters=filters)
+    monthly_customers['date'] = pd.to_datetime(monthly_customers[['year', 'month']].assign(day=1))
+
+    customer_trend = px.line(monthly_customers, x='date', y='customer_id',
+                           title=f'📅 Monthly Active Customers {"- " + selected_segment if selected_segment else "- " + selected_customer_type if selected_customer_type else ""}',
+                           color_discrete_sequence=['#43e97b'])
+    customer_trend.update_layout(plot_bgcolor='white', paper_bgcolor='white')
+    customer_trend.update_traces(line=dict(width=3))
+
+    return segment_chart, value_dist, repeat_chart, customer_trend, filter_text
+
+def _customer_totals(filter_state):
+    customers = aggregate({
+        'sales': ('sales', 'sum'),
+        'profit': ('profit', 'sum'),
+        'order_key': ('order_key', 'nunique')
+    }, by=['customer_name'], filters=_filters(filter_state)).round(2)
+    customers.columns = ['Customer', 'Sales ($)', 'Profit ($)', 'Orders']
+    return customers
+
+def update_customers_table(filter_state, page_current=0, page_size=PAGE_SIZE, sort_by=CUSTOMER_SORT, filter_query=''):
+    """One page of the customers table (every customer, paged, sorted and filtered on the server)"""
+    frame = table_frame('customers', filter_state, _customer_totals)
+    return table_page(frame, page_current, page_size, sort_by, filter_query, CUSTOMER_TOOLTIPS)
+
+def render_customer_page():
+    """Customer layout with its charts and table already filled in"""
+    layout = create_customer_page()
+    filter_state = initial_value(layout, 'customer-filter-state', 'data')
+    fill_outputs(layout, CHART_OUTPUTS, update_customer_charts(filter_state))
+    return fill_outputs(layout, table_outputs('top-customers-table'), update_customers_table(filter_state))
+
 def register_callbacks(app):
     @app.callback(
         Output('customer-filter-state', 'data'),
@@ -84,7 +199,8 @@ def register_callbacks(app):
             Input('repeat-customer-chart', 'clickData'),
             Input('top-customers-table', 'active_cell')
         ],
-        [State('customer-filter-state', 'data')]
+        [State('customer-filter-state', 'data')],
+        prevent_initial_call=True
     )
     def update_customer_filter_state(reset_clicks, segment_click, repeat_click, table_click, current_state):
         ctx = dash.callback_context
@@ -116,124 +232,13 @@ def register_callbacks(app):
             new_state['selected_customer_name'] = None
             
         elif trigger_id == 'top-customers-table' and table_click:
-            # This will be handled in the main callback using the filtered data
-            pass
+            # Klik sel tabel tidak mengubah filter (dan tidak mereset halaman tabel)
+            return dash.no_update
             
         return new_state
 
-    @app.callback(
-        [
-            Output('customer-segment-chart', 'figure'),
-            Output('customer-value-dist', 'figure'),
-            Output('repeat-customer-chart', 'figure'),
-            Output('top-customers-table', 'children'),
-            Output('monthly-customer-trend', 'figure'),
-            Output('customer-filter-indicator', 'children')
-        ],
-        [
-            Input('current-page', 'data'),
-            Input('customer-filter-state', 'data')
-        ]
-    )
-    def update_customer_charts(current_page, filter_state):
-        df, _, _, _, _, _, _ = get_data()
-        
-        if current_page != 'customer':
-            return {}, {}, {}, [], {}, ""
-        
-        selected_segment = filter_state.get('selected_segment')
-        selected_customer_type = filter_state.get('selected_customer_type')
-        
-        # Update filter text
-        if selected_segment:
-            filter_text = f"Filtered by Segment: {selected_segment}"
-        elif selected_customer_type:
-            filter_text = f"Filtered by Customer Type: {selected_customer_type}"
-        else:
-            filter_text = "No filter applied. Click on charts to filter data."
-        
-        # Filter DataFrame based on selections
-        filtered_df = df
-        if selected_segment:
-            filtered_df = df[df['segment'] == selected_segment]
-        elif selected_customer_type:
-            customer_orders = df.groupby('customer_name')['order_key'].nunique().reset_index()
-            repeat_customers = customer_orders[customer_orders['order_key'] > 1]['customer_name']
-            if selected_customer_type == 'Repeat':
-                filtered_df = df[df['customer_name'].isin(repeat_customers)]
-            else:
-                filtered_df = df[~df['customer_name'].isin(repeat_customers)]
-        
-        # Customer Segment Chart
-        segment_counts = filtered_df.groupby('segment')['customer_id'].nunique().reset_index()
-        segment_chart = px.pie(segment_counts, values='customer_id', names='segment',
-                              title=f'👥 Customer Distribution by Segment {"- " + selected_segment if selected_segment else ""}',
-                              color_discrete_sequence=['#667eea', '#f5576c', '#43e97b'])
-        segment_chart.update_layout(plot_bgcolor='white', paper_bgcolor='white')
-        
-        # Customer Value Distribution
-        customer_values = filtered_df.groupby('customer_name')['sales'].sum().reset_index()
-        value_dist = px.histogram(customer_values, x='sales', nbins=30,
-                                 title=f'💵 Customer Value Distribution {"- " + selected_segment if selected_segment else "- " + selected_customer_type if selected_customer_type else ""}',
-                                 color_discrete_sequence=['#667eea'])
-        value_dist.update_layout(plot_bgcolor='white', paper_bgcolor='white')
-        
-        # Repeat Customer Analysis
-        customer_orders = filtered_df.groupby('customer_name')['order_key'].nunique().reset_index()
-        customer_orders['customer_type'] = customer_orders['order_key'].apply(lambda x: 'Repeat' if x > 1 else 'One-time')
-        repeat_analysis = customer_orders['customer_type'].value_counts().reset_index()
-        repeat_analysis.columns = ['customer_type', 'count']
-        
-        repeat_chart = px.bar(repeat_analysis, x='customer_type', y='count',
-                             title=f'🔄 Repeat vs One-time Customers {"- " + selected_segment if selected_segment else ""}',
-                             color='customer_type',
-                             color_discrete_sequence=['#f5576c', '#43e97b'])
-        repeat_chart.update_layout(plot_bgcolor='white', paper_bgcolor='white')
-        
-        # Top Customers Table
-        top_customers = filtered_df.groupby('customer_name').agg({
-            'sales': 'sum',
-            'profit': 'sum',
-            'order_key': 'nunique'
-        }).round(2).reset_index()
-        top_customers.columns = ['Customer', 'Sales ($)', 'Profit ($)', 'Orders']
-        top_customers = top_customers.nlargest(10, 'Sales ($)')
-        
-        customer_table = dash_table.DataTable(
-            data=top_customers.to_dict('records'),
-            columns=[{"name": i, "id": i, "type": "numeric", "format": {"specifier": ",.0f"}} if i != "Customer" else {"name": i, "id": i} for i in top_customers.columns],
-            style_cell={'textAlign': 'left', 'padding': '10px', 'fontSize': 14},
-            style_header={
-                'backgroundColor': '#667eea',
-                'color': 'white',
-                'fontWeight': 'bold',
-                'textAlign': 'center'
-            },
-            style_data={'backgroundColor': '#f8f9fa'},
-            style_data_conditional=[
-                {
-                    'if': {'row_index': i},
-                    'backgroundColor': '#e3f2fd' if i % 2 == 0 else '#ffffff',
-                    'color': 'black'
-                } for i in range(len(top_customers))
-            ],
-            tooltip_data=[
-                {
-                    col: {'value': f"{row[col]:,.0f}" if col != 'Customer' else row[col], 'type': 'markdown'}
-                    for col in top_customers.columns
-                } for _, row in top_customers.iterrows()
-            ],
-            style_table={'overflowX': 'auto'},
-        )
-        
-        # Monthly Customer Trend
-        monthly_customers = filtered_df.groupby(['year', 'month'])['customer_id'].nunique().reset_index()
-        monthly_customers['date'] = pd.to_datetime(monthly_customers[['year', 'month']].assign(day=1))
-        
-        customer_trend = px.line(monthly_customers, x='date', y='customer_id',
-                               title=f'📅 Monthly Active Customers {"- " + selected_segment if selected_segment else "- " + selected_customer_type if selected_customer_type else ""}',
-                               color_discrete_sequence=['#43e97b'])
-        customer_trend.update_layout(plot_bgcolor='white', paper_bgcolor='white')
-        customer_trend.update_traces(line=dict(width=3))
-        
-        return segment_chart, value_dist, repeat_chart, customer_table, customer_trend, filter_text
\ No newline at end of file
+    app.callback([Output(*output) for output in CHART_OUTPUTS],
+                 [Input('customer-filter-state', 'data')],
+                 prevent_initial_call=True)(update_customer_charts)
+    register_table_callback(app, 'top-customers-table', ('customer-filter-state', 'data'), update_customers_table)
+
@@ -1,15 +1,32 @@
+import logging
 import pandas as pd
-from dash import html, dcc
-from dash.dependencies import Input, Output
+from dash import Patch, html, dcc
+from dash.dependencies import Input, Output, State
 import plotly.express as px
 import plotly.graph_objects as go
 from src.config.styles import custom_style, color_schemes
-from src.data.data_loader import get_data
+from src.data.filters import parse_filter_state
+from src.data.query import aggregate_many, data_version, is_empty
+from src.components.render import fill_outputs, initial_value
+from src.utils.response_cache import cached_callback
+
+logger = logging.getLogger(__name__)
+
+def _filter_description(filter_type, filters):
+    if filter_type == 'sales_trend':
+        month_name = pd.to_datetime(f"{filters['year']}-{filters['month']:02d}-01").strftime("%B %Y")
+        return f"📅 Filtered by: {month_name}"
+    elif filter_type == 'category':
+        return f"🏷️ Filtered by Category: {filters['category']}"
+    elif filter_type == 'product':
+        return f"🏆 Filtered by Product: {filters['product_name']}"
+    elif filter_type == 'segment':
+        return f"💼 Filtered by Segment: {filters['segment']}"
+    return ""
 
 def create_overview_page():
-    df, _, _, _, _, _, _ = get_data()
-    if df.empty:
-        print("Overview page: DataFrame is empty")
+    if is_empty():
+        logger.warning("Overview page: DataFrame is empty")
         return html.Div([
             html.H1("📊 Sales Overview Dashboard", style={'color': '#2c3e50', 'margin-bottom': '30px'}),
             html.P("⚠️ Tidak ada data tersedia. Periksa koneksi database atau file data_loader.py.", 
@@ -117,280 +134,261 @@ def create_overview_page():
         
         # Hidden div to store current filter state
         html.Div(id='current-filter-state', style={'display': 'none'}),
+        # Versi data grafik yang sedang tampil; patch sorotan hanya berlaku untuk versi yang sama
+        html.Div(id='current-data-version', style={'display': 'none'}),
     ])
 
-def register_callbacks(app):
-    @app.callback(
-        [Output('sales-trend-chart', 'figure'),
-         Output('category-pie-chart', 'figure'),
-         Output('top-products-chart', 'figure'),
-         Output('segment-performance-chart', 'figure'),
-         Output('filter-status', 'children'),
-         Output('filter-status', 'style')],
-        [Input('current-page', 'data'),
-         Input('current-filter-state', 'children')]
+# Semua output overview: grafik, status filter, dan KPI, dari satu callback
+OVERVIEW_OUTPUTS = [
+    ('sales-trend-chart', 'figure'),
+    ('category-pie-chart', 'figure'),
+    ('top-products-chart', 'figure'),
+    ('segment-performance-chart', 'figure'),
+    ('filter-status', 'children'),
+    ('filter-status', 'style'),
+    ('total-sales-metric', 'children'),
+    ('total-profit-metric', 'children'),
+    ('total-orders-metric', 'children'),
+    ('avg-discount-metric', 'children'),
+]
+
+# Agregasi overview, dihitung sekaligus dari data yang sama untuk satu filter
+OVERVIEW_QUERIES = [
+    dict(measures={'sales': ('sales', 'sum')}, by=['year', 'month']),
+    dict(measures={'sales': ('sales', 'sum')}, by=['category']),
+    dict(measures={'sales': ('sales', 'sum')}, by=['product_name'], order_by='sales', limit=10),
+    dict(measures={'sales': ('sales', 'sum'), 'profit': ('profit', 'sum'), 'quantity': ('quantity', 'sum')},
+         by=['segment']),
+    dict(measures={'rows': ('sales', 'count'), 'sales': ('sales', 'sum'), 'profit': ('profit', 'sum'),
+                   'orders': ('order_key', 'nunique'), 'discount': ('discount', 'mean')}),
+]
+
+# Tipe filter klik -> posisi grafiknya di OVERVIEW_OUTPUTS dan OVERVIEW_QUERIES. Grafik yang
+# diklik tidak difilter pilihannya sendiri: datanya tetap, hanya sorotannya yang berubah
+CLICK_CHARTS = {'sales_trend': 0, 'category': 1, 'product': 2, 'segment': 3}
+
+def _overview_data(filter_type, filters):
+    own = CLICK_CHARTS.get(filter_type)
+    results = aggregate_many([query for i, query in enumerate(OVERVIEW_QUERIES) if i != own], filters)
+    if own is not None:
+        results.insert(own, aggregate_many([OVERVIEW_QUERIES[own]])[0])
+    monthly_sales = results[0]
+    monthly_sales['date'] = pd.to_datetime(monthly_sales[['year', 'month']].assign(day=1))
+    return results
+
+def _metrics(metrics):
+    # Calculate metrics for filtered data
+    if metrics['rows'] > 0:
+        total_sales = metrics['sales']
+        total_profit = metrics['profit']
+        total_orders = int(metrics['orders'])
+        avg_discount = metrics['discount'] * 100
+    else:
+        total_sales = total_profit = total_orders = avg_discount = 0
+
+    return (
+        f"${total_sales:,.0f}",
+        f"${total_profit:,.0f}",
+        f"{total_orders:,}",
+        f"{avg_discount:.1f}%"
     )
-    def update_overview_charts(current_page, filter_state):
-        df, _, _, _, _, _, _ = get_data()
-        print(f"Overview callback - current_page: {current_page}, df rows: {len(df)}")
-        
-        if current_page != 'overview':
-            return {}, {}, {}, {}, "", {'display': 'none'}
-        
-        # Parse filter state
-        filtered_df = df.copy()
-        filter_info = ""
-        filter_display_style = {'display': 'none'}
-        
-        if filter_state and filter_state.strip():
-            filter_parts = filter_state.split('|')
-            filter_type = filter_parts[0]
-            
-            if filter_type == 'sales_trend' and len(filter_parts) >= 3:
-                year = int(filter_parts[1])
-                month = int(filter_parts[2])
-                filtered_df = filtered_df[
-                    (filtered_df['year'] == year) &
-                    (filtered_df['month'] == month)
-                ]
-                month_name = pd.to_datetime(f"{year}-{month:02d}-01").strftime("%B %Y")
-                filter_info = f"📅 Filtered by: {month_name}"
-            
-            elif filter_type == 'category' and len(filter_parts) >= 2:
-                category = filter_parts[1]
-                filtered_df = filtered_df[filtered_df['category'] == category]
-                filter_info = f"🏷️ Filtered by Category: {category}"
-            
-            elif filter_type == 'product' and len(filter_parts) >= 2:
-                product = filter_parts[1]
-                filtered_df = filtered_df[filtered_df['product_name'] == product]
-                filter_info = f"🏆 Filtered by Product: {product}"
-            
-            elif filter_type == 'segment' and len(filter_parts) >= 2:
-                segment = filter_parts[1]
-                filtered_df = filtered_df[filtered_df['segment'] == segment]
-                filter_info = f"💼 Filtered by Segment: {segment}"
-            
-            filter_display_style = {
-                'background': '#e8f4fd',
-                'border-left': '4px solid #667eea',
-                'padding': '15px',
-                'margin-bottom': '20px',
-                'border-radius': '5px',
-                'display': 'block'
-            }
-        
-        # Sales Trend Chart
-        monthly_sales = filtered_df.groupby(['year', 'month'])['sales'].sum().reset_index()
-        monthly_sales['date'] = pd.to_datetime(monthly_sales[['year', 'month']].assign(day=1))
-        
-        # Create sales trend with highlighting
-        sales_trend = px.line(monthly_sales, x='date', y='sales', 
-                             title='📈 Monthly Sales Trend',
-                             color_discrete_sequence=['#667eea'])
-        
-        # Highlight selected point if filtered by sales trend
-        if filter_state and filter_state.startswith('sales_trend'):
-            filter_parts = filter_state.split('|')
-            if len(filter_parts) >= 3:
-                selected_year = int(filter_parts[1])
-                selected_month = int(filter_parts[2])
-                selected_date = pd.to_datetime(f"{selected_year}-{selected_month:02d}-01")
-                
-                # Add highlighted point
-                selected_sales = monthly_sales[monthly_sales['date'] == selected_date]['sales'].iloc[0] if len(monthly_sales[monthly_sales['date'] == selected_date]) > 0 else 0
-                sales_trend.add_trace(go.Scatter(
-                    x=[selected_date],
-                    y=[selected_sales],
-                    mode='markers',
-                    marker=dict(size=15, color='#f5576c', symbol='circle', line=dict(width=3, color='white')),
-                    name='Selected Point',
-                    showlegend=False
-                ))
-        
-        sales_trend.update_layout(plot_bgcolor='white', paper_bgcolor='white')
-        sales_trend.update_traces(line=dict(width=3))
-        
-        # Category Pie Chart
-        category_sales = filtered_df.groupby('category')['sales'].sum().reset_index()
-        
-        # Create color mapping for highlighting
-        colors = px.colors.qualitative.Set3
-        if filter_state and filter_state.startswith('category'):
-            selected_category = filter_state.split('|')[1]
-            pie_colors = []
-            for cat in category_sales['category']:
-                if cat == selected_category:
-                    pie_colors.append('#f5576c')  # Highlight color
-                else:
-                    pie_colors.append('#d3d3d3')  # Muted color
-        else:
-            pie_colors = colors
-        
-        category_pie = px.pie(category_sales, values='sales', names='category',
-                             title='🏷️ Sales by Category',
-                             color_discrete_sequence=pie_colors)
-        category_pie.update_layout(plot_bgcolor='white', paper_bgcolor='white')
-        
-        # Top Products Chart
-        top_products = filtered_df.groupby('product_name')['sales'].sum().nlargest(10).reset_index()
-        
-        # Create color mapping for highlighting
-        if filter_state and filter_state.startswith('product'):
-            selected_product = filter_state.split('|')[1]
-            bar_colors = ['#f5576c' if prod == selected_product else '#667eea' for prod in top_products['product_name']]
-        else:
-            bar_colors = '#667eea'
-        
-        top_products_chart = px.bar(top_products, x='sales', y='product_name',
-                                   title='🏆 Top 10 Products by Sales',
-                                   orientation='h',
-                                   color_discrete_sequence=[bar_colors] if isinstance(bar_colors, str) else None)
-        
-        if isinstance(bar_colors, list):
-            top_products_chart.update_traces(marker_color=bar_colors)
-        
-        top_products_chart.update_layout(plot_bgcolor='white', paper_bgcolor='white', height=400)
-        
-        # Segment Performance Chart
-        segment_metrics = filtered_df.groupby('segment').agg({
-            'sales': 'sum',
-            'profit': 'sum',
-            'quantity': 'sum'
-        }).reset_index()
-        
-        # Create segment chart with highlighting
-        if filter_state and filter_state.startswith('segment'):
-            selected_segment = filter_state.split('|')[1]
-            # Create separate traces for highlighted and normal segments
-            segment_chart = go.Figure()
-            
-            for i, segment in enumerate(segment_metrics['segment']):
-                color_sales = '#f5576c' if segment == selected_segment else '#667eea'
-                color_profit = '#ff6b8a' if segment == selected_segment else '#7e8ef0'
-                
-                segment_chart.add_trace(go.Bar(
-                    name='Sales' if i == 0 else None,
-                    x=[segment],
-                    y=[segment_metrics[segment_metrics['segment'] == segment]['sales'].iloc[0]],
-                    marker_color=color_sales,
-                    legendgroup='sales',
-                    showlegend=(i == 0)
-                ))
-                
-                segment_chart.add_trace(go.Bar(
-                    name='Profit' if i == 0 else None,
-                    x=[segment],
-                    y=[segment_metrics[segment_metrics['segment'] == segment]['profit'].iloc[0]],
-                    marker_color=color_profit,
-                    legendgroup='profit',
-                    showlegend=(i == 0)
-                ))
-        else:
-            segment_chart = px.bar(segment_metrics, x='segment', y=['sales', 'profit'],
-                                  title='💼 Performance by Customer Segment',
-                                  barmode='group',
-                                  color_discrete_sequence=['#667eea', '#f5576c'])
-        
-        segment_chart.update_layout(
-            title='💼 Performance by Customer Segment',
-            plot_bgcolor='white', 
-            paper_bgcolor='white',
-            barmode='group'
-        )
-        
-        return sales_trend, category_pie, top_products_chart, segment_chart, filter_info, filter_display_style
 
+# Figure tiap grafik dibangun tanpa sorotan; sorotan adalah daftar (path properti, nilai)
+# yang diterapkan ke figure lengkap atau dikirim sebagai dash.Patch
+
+def _sales_trend_figure(monthly_sales):
+    sales_trend = px.line(monthly_sales, x='date', y='sales', 
+                         title='📈 Monthly Sales Trend',
+                         color_discrete_sequence=['#667eea'])
+    # Trace titik terpilih, kosong sampai sebuah bulan diklik
+    sales_trend.add_trace(go.Scatter(
+        x=[],
+        y=[],
+        mode='markers',
+        marker=dict(size=15, color='#f5576c', symbol='circle', line=dict(width=3, color='white')),
+        name='Selected Point',
+        showlegend=False
+    ))
+    sales_trend.update_layout(plot_bgcolor='white', paper_bgcolor='white')
+    sales_trend.update_traces(line=dict(width=3))
+    return sales_trend
+
+def _sales_trend_highlight(monthly_sales, filters):
+    # Highlight selected point if filtered by sales trend
+    x, y = [], []
+    if filters:
+        selected_date = pd.to_datetime(f"{filters['year']}-{filters['month']:02d}-01")
+        selected = monthly_sales[monthly_sales['date'] == selected_date]
+        x, y = [selected_date], [selected['sales'].iloc[0] if len(selected) > 0 else 0]
+    return [(('data', 1, 'x'), x), (('data', 1, 'y'), y)]
+
+def _category_figure(category_sales):
+    category_pie = px.pie(category_sales, values='sales', names='category',
+                         title='🏷️ Sales by Category',
+                         color_discrete_sequence=px.colors.qualitative.Set3)
+    category_pie.update_layout(plot_bgcolor='white', paper_bgcolor='white')
+    return category_pie
+
+def _category_highlight(category_sales, filters):
+    # Create color mapping for highlighting
+    colors = px.colors.qualitative.Set3
+    if filters:
+        pie_colors = ['#f5576c' if cat == filters['category'] else '#d3d3d3'  # Highlight / muted color
+                      for cat in category_sales['category']]
+    else:
+        pie_colors = [colors[i % len(colors)] for i in range(len(category_sales))]
+    return [(('data', 0, 'marker', 'colors'), pie_colors)]
+
+def _top_products_figure(top_products):
+    top_products_chart = px.bar(top_products, x='sales', y='product_name',
+                               title='🏆 Top 10 Products by Sales',
+                               orientation='h',
+                               color_discrete_sequence=['#667eea'])
+    top_products_chart.update_layout(plot_bgcolor='white', paper_bgcolor='white', height=400)
+    return top_products_chart
+
+def _top_products_highlight(top_products, filters):
+    bar_colors = '#667eea'
+    if filters:
+        bar_colors = ['#f5576c' if prod == filters['product_name'] else '#667eea'
+                      for prod in top_products['product_name']]
+    return [(('data', 0, 'marker', 'color'), bar_colors)]
+
+def _segment_figure(segment_metrics):
+    segment_chart = px.bar(segment_metrics, x='segment', y=['sales', 'profit'],
+                          title='💼 Performance by Customer Segment',
+                          barmode='group',
+                          color_discrete_sequence=['#667eea', '#f5576c'])
+    segment_chart.update_layout(
+        title='💼 Performance by Customer Segment',
+        plot_bgcolor='white', 
+        paper_bgcolor='white',
+        barmode='group'
+    )
+    return segment_chart
+
+def _segment_highlight(segment_metrics, filters):
+    color_sales, color_profit = '#667eea', '#f5576c'
+    if filters:
+        # Warna per bar: segmen terpilih disorot di trace sales dan profit
+        selected = segment_metrics['segment'] == filters['segment']
+        color_sales = ['#f5576c' if hit else '#667eea' for hit in selected]
+        color_profit = ['#ff6b8a' if hit else '#7e8ef0' for hit in selected]
+    return [(('data', 0, 'marker', 'color'), color_sales), (('data', 1, 'marker', 'color'), color_profit)]
+
+# (figure, sorotan) per grafik, urut seperti OVERVIEW_OUTPUTS
+CHARTS = [
+    (_sales_trend_figure, _sales_trend_highlight),
+    (_category_figure, _category_highlight),
+    (_top_products_figure, _top_products_highlight),
+    (_segment_figure, _segment_highlight),
+]
+
+def _apply(target, updates):
+    """Set each (path, value) of `updates` on a figure or on a dash.Patch of it"""
+    for path, value in updates:
+        node = target
+        for part in path[:-1]:
+            node = node[part]
+        node[path[-1]] = value
+    return target
+
+def _unchanged_charts(previous_state, filter_type):
+    # Data grafik sama di kedua state kalau masing-masing tanpa filter atau dengan filter grafik itu sendiri
+    previous_type, _ = parse_filter_state(previous_state)
+    return {i for chart_type, i in CLICK_CHARTS.items() if {previous_type, filter_type} <= {'', chart_type}}
+
+@cached_callback('overview')
+def update_overview(filter_state, previous_state=None):
+    """Charts, filter status and KPI metrics of the overview for one filter state.
+
+    Given the `previous_state` the page is showing, charts whose data stays the
+    same (the clicked chart, on a click or a reset) come back as a dash.Patch
+    of their highlight instead of a full figure.
+    """
+    # Parse filter state
+    filter_type, filters = parse_filter_state(filter_state)
+    filter_info = _filter_description(filter_type, filters)
+    filter_display_style = {'display': 'none'}
+    if filter_state and filter_state.strip():
+        filter_display_style = {
+            'background': '#e8f4fd',
+            'border-left': '4px solid #667eea',
+            'padding': '15px',
+            'margin-bottom': '20px',
+            'border-radius': '5px',
+            'display': 'block'
+        }
+
+    data = _overview_data(filter_type, filters)
+    unchanged = _unchanged_charts(previous_state, filter_type) if previous_state is not None else set()
+    charts = []
+    for i, (figure, highlight) in enumerate(CHARTS):
+        updates = highlight(data[i], filters if i == CLICK_CHARTS.get(filter_type) else {})
+        charts.append(_apply(Patch() if i in unchanged else figure(data[i]), updates))
+
+    return (*charts, filter_info, filter_display_style, *_metrics(data[4].iloc[0]))
+
+def _filter_state_from_click(trigger_id, sales_click, category_click, product_click, segment_click, reset_clicks):
+    """Filter state string for the chart click (or reset) that triggered the callback"""
+    # Reset button clicked
+    if trigger_id == 'reset-filters-btn' and reset_clicks > 0:
+        return ""
+
+    # Determine which chart was clicked and extract filter info
+    if trigger_id == 'sales-trend-chart' and sales_click and sales_click['points']:
+        clicked_date = sales_click['points'][0]['x']
+        clicked_date = pd.to_datetime(clicked_date)
+        return f"sales_trend|{clicked_date.year}|{clicked_date.month}"
+
+    elif trigger_id == 'category-pie-chart' and category_click and category_click['points']:
+        clicked_category = category_click['points'][0]['label']
+        return f"category|{clicked_category}"
+
+    elif trigger_id == 'top-products-chart' and product_click and product_click['points']:
+        clicked_product = product_click['points'][0]['y']
+        return f"product|{clicked_product}"
+
+    elif trigger_id == 'segment-performance-chart' and segment_click and segment_click['points']:
+        clicked_segment = segment_click['points'][0]['x']
+        return f"segment|{clicked_segment}"
+
+    return ""
+
+def render_overview_page():
+    """Overview layout with its charts, KPIs and filter status already filled in"""
+    layout = create_overview_page()
+    filter_state = initial_value(layout, 'current-filter-state', 'children')
+    fill_outputs(layout, [('current-data-version', 'children')], [data_version()])
+    return fill_outputs(layout, OVERVIEW_OUTPUTS, update_overview(filter_state))
+
+def register_callbacks(app):
+    # Klik grafik atau reset: filter state baru, semua grafik dan KPI dalam satu round trip
     @app.callback(
-        Output('current-filter-state', 'children'),
+        [Output(*output) for output in OVERVIEW_OUTPUTS] + [Output('current-filter-state', 'children'),
+                                                            Output('current-data-version', 'children')],
         [Input('sales-trend-chart', 'clickData'),
          Input('category-pie-chart', 'clickData'),
          Input('top-products-chart', 'clickData'),
          Input('segment-performance-chart', 'clickData'),
-         Input('reset-filters-btn', 'n_clicks')]
+         Input('reset-filters-btn', 'n_clicks')],
+        [State('current-filter-state', 'children'),
+         State('current-data-version', 'children')],
+        prevent_initial_call=True
     )
-    def update_filter_state(sales_click, category_click, product_click, segment_click, reset_clicks):
-        """Update the current filter state based on chart clicks"""
+    def update_cross_filter(sales_click, category_click, product_click, segment_click, reset_clicks, previous_state,
+                            previous_version):
+        """Apply the clicked chart's filter to the other charts and the metrics, and highlight it"""
         from dash import callback_context
-        
-        if not callback_context.triggered:
-            return ""
-        
-        trigger_id = callback_context.triggered[0]['prop_id'].split('.')[0]
-        
-        # Reset button clicked
-        if trigger_id == 'reset-filters-btn' and reset_clicks > 0:
-            return ""
-        
-        # Determine which chart was clicked and extract filter info
-        if trigger_id == 'sales-trend-chart' and sales_click and sales_click['points']:
-            clicked_date = sales_click['points'][0]['x']
-            clicked_date = pd.to_datetime(clicked_date)
-            return f"sales_trend|{clicked_date.year}|{clicked_date.month}"
-        
-        elif trigger_id == 'category-pie-chart' and category_click and category_click['points']:
-            clicked_category = category_click['points'][0]['label']
-            return f"category|{clicked_category}"
-        
-        elif trigger_id == 'top-products-chart' and product_click and product_click['points']:
-            clicked_product = product_click['points'][0]['y']
-            return f"product|{clicked_product}"
-        
-        elif trigger_id == 'segment-performance-chart' and segment_click and segment_click['points']:
-            clicked_segment = segment_click['points'][0]['x']
-            return f"segment|{clicked_segment}"
-        
-        return ""
 
-    @app.callback(
-        [Output('total-sales-metric', 'children'),
-         Output('total-profit-metric', 'children'),
-         Output('total-orders-metric', 'children'),
-         Output('avg-discount-metric', 'children')],
-        [Input('current-filter-state', 'children')]
-    )
-    def update_metrics(filter_state):
-        """Update metrics based on current filter state"""
-        df, _, _, _, _, _, _ = get_data()
-        filtered_df = df.copy()  # Start with full DataFrame
-        
-        # Apply filter based on current state
-        if filter_state and filter_state.strip():
-            filter_parts = filter_state.split('|')
-            filter_type = filter_parts[0]
-            
-            if filter_type == 'sales_trend' and len(filter_parts) >= 3:
-                year = int(filter_parts[1])
-                month = int(filter_parts[2])
-                filtered_df = filtered_df[
-                    (filtered_df['year'] == year) &
-                    (filtered_df['month'] == month)
-                ]
-            
-            elif filter_type == 'category' and len(filter_parts) >= 2:
-                category = filter_parts[1]
-                filtered_df = filtered_df[filtered_df['category'] == category]
-            
-            elif filter_type == 'product' and len(filter_parts) >= 2:
-                product = filter_parts[1]
-                filtered_df = filtered_df[filtered_df['product_name'] == product]
-            
-            elif filter_type == 'segment' and len(filter_parts) >= 2:
-                segment = filter_parts[1]
-                filtered_df = filtered_df[filtered_df['segment'] == segment]
-        
-        # Calculate metrics for filtered DataFrame
-        if not filtered_df.empty:
-            total_sales = filtered_df['sales'].sum()
-            total_profit = filtered_df['profit'].sum()
-            total_orders = filtered_df['order_key'].nunique()
-            avg_discount = filtered_df['discount'].mean() * 100
-        else:
-            total_sales = total_profit = total_orders = avg_discount = 0
-        
-        return (
-            f"${total_sales:,.0f}",
-            f"${total_profit:,.0f}",
-            f"{total_orders:,}",
-            f"{avg_discount:.1f}%"
-        )
\ No newline at end of file
+        filter_state = ""
+        if callback_context.triggered:
+            trigger_id = callback_context.triggered[0]['prop_id'].split('.')[0]
+            filter_state = _filter_state_from_click(trigger_id, sales_click, category_click, product_click,
+                                                   segment_click, reset_clicks)
+        # Data berganti sejak grafik di browser dibuat (refresh background): urutan/isi bar bisa
+        # lain, jadi semua grafik dikirim utuh, bukan patch sorotan
+        version = data_version()
+        if previous_version != version:
+            return [*update_overview(filter_state), filter_state, version]
+        return [*update_overview(filter_state, previous_state or ""), filter_state, version]
@@ -1,11 +1,16 @@
 import dash
 import pandas as pd
 import numpy as np
-from dash import html, dcc, dash_table
+from dash import html, dcc
 from dash.dependencies import Input, Output, State
 import plotly.express as px
 from src.config.styles import custom_style
-from src.data.data_loader import get_data
+from src.data.query import aggregate, columns as query_columns, distinct, is_empty
+from src.components.figures import apply_point_budget, histogram
+from src.components.render import fill_outputs, initial_value
+from src.components.tables import (PAGE_SIZE, explorer_table, register_table_callback, table_frame, table_outputs,
+                                   table_page)
+from src.utils.response_cache import cached_callback
 import pickle
 import logging
 
@@ -13,6 +18,14 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Tabel produk rugi: semua produk dengan profit < 0, dipaging/diurutkan/difilter di server
+LOSS_COLUMNS = [
+    {"name": "Product", "id": "Product"},
+    {"name": "Loss ($)", "id": "Loss ($)", "type": "numeric", "format": {"specifier": ",.2f"}},
+]
+LOSS_SORT = [{'column_id': 'Loss ($)', 'direction': 'asc'}]
+LOSS_TOOLTIPS = {'Loss ($)': ',.2f'}
+
 # Define fallback values for dropdowns based on provided counts
 FALLBACK_SHIP_MODES = ['Standard Class', 'Second Class', 'First Class', 'Same Day']
 FALLBACK_CATEGORIES = ['Office Supplies', 'Technology', 'Furniture']
@@ -47,6 +60,11 @@ except FileNotFoundError as e:
 except Exception as e:
     logger.error(f"Unexpected error loading models: {e}")
 
+def models_loaded():
+    """True when the prediction models and encoders are available"""
+    return all(obj is not None for obj in (reg_model, clf_model, scaler, le_ship_mode, le_category,
+                                           le_subcategory, selector_reg, selector_clf))
+
 def predict_profit_and_loss(quantity, discount, shipping_cost, ship_mode, category, sub_category):
     if any(v is None for v in [reg_model, clf_model, scaler, le_ship_mode, le_category, le_subcategory, selector_reg, selector_clf]):
         return {'error': 'Model or encoder not loaded. Check the models directory and logs.'}
@@ -90,8 +108,7 @@ def predict_profit_and_loss(quantity, discount, shipping_cost, ship_mode, catego
         return {'error': f"Prediction failed: {str(e)}"}
 
 def create_profit_page():
-    df, _, _, _, _, _, _ = get_data()
-    if df.empty:
+    if is_empty():
         logger.warning("Profit page: DataFrame is empty")
         return html.Div([
             html.H1("💰 Discount & Profit Analysis", style={'color': '#2c3e50', 'margin-bottom': '30px'}),
@@ -99,25 +116,26 @@ def create_profit_page():
                    style={'color': '#e74c3c', 'text-align': 'left'})
         ])
     
+    columns = query_columns()
     # Log DataFrame columns for debugging
-    logger.info(f"DataFrame columns: {df.columns.tolist()}")
+    logger.info(f"DataFrame columns: {columns}")
     
     # Dynamically detect column names
-    category_col = next((col for col in df.columns if 'category' in col.lower()), 'Category')
-    subcategory_col = next((col for col in df.columns if 'sub' in col.lower() and 'category' in col.lower()), 'Sub-Category')
-    discount_col = next((col for col in df.columns if 'discount' in col.lower()), 'Discount')
-    sales_col = next((col for col in df.columns if 'sales' in col.lower()), 'Sales')
-    profit_col = next((col for col in df.columns if 'profit' in col.lower()), 'Profit')
-    product_col = next((col for col in df.columns if 'product' in col.lower() and 'name' in col.lower()), 'Product Name')
-    ship_mode_col = next((col for col in df.columns if 'ship' in col.lower() and 'mode' in col.lower()), 'Ship Mode')
+    category_col = next((col for col in columns if 'category' in col.lower()), 'Category')
+    subcategory_col = next((col for col in columns if 'sub' in col.lower() and 'category' in col.lower()), 'Sub-Category')
+    discount_col = next((col for col in columns if 'discount' in col.lower()), 'Discount')
+    sales_col = next((col for col in columns if 'sales' in col.lower()), 'Sales')
+    profit_col = next((col for col in columns if 'profit' in col.lower()), 'Profit')
+    product_col = next((col for col in columns if 'product' in col.lower() and 'name' in col.lower()), 'Product Name')
+    ship_mode_col = next((col for col in columns if 'ship' in col.lower() and 'mode' in col.lower()), 'Ship Mode')
     
     logger.info(f"Detected columns: Category={category_col}, Sub-Category={subcategory_col}, Discount={discount_col}, "
                 f"Sales={sales_col}, Profit={profit_col}, Product Name={product_col}, Ship Mode={ship_mode_col}")
     
     # Get unique values for dropdowns from DataFrame or fallback
-    ship_modes = df[ship_mode_col].unique().tolist() if ship_mode_col in df.columns else FALLBACK_SHIP_MODES
-    categories = df[category_col].unique().tolist() if category_col in df.columns else FALLBACK_CATEGORIES
-    subcategories = df[subcategory_col].unique().tolist() if subcategory_col in df.columns else FALLBACK_SUBCATEGORIES
+    ship_modes = distinct(ship_mode_col) if ship_mode_col in columns else FALLBACK_SHIP_MODES
+    categories = distinct(category_col) if category_col in columns else FALLBACK_CATEGORIES
+    subcategories = distinct(subcategory_col) if subcategory_col in columns else FALLBACK_SUBCATEGORIES
     
     # Use encoder classes if available and valid
     if le_ship_mode and hasattr(le_ship_mode, 'classes_'):
@@ -208,7 +226,8 @@ def create_profit_page():
                 'font-size': '24px', 
                 'font-weight': '600'
             }),
-            html.Div(id="loss-products-table")
+            explorer_table('loss-products-table', LOSS_COLUMNS, LOSS_SORT, header_color='#e74c3c',
+                           stripes=('#fdf2f2', '#ffffff'), background='#fdf2f2')
         ], style={**custom_style['card'], 'margin-bottom': '30px', 'padding': '20px'}),
         
         # Profit Prediction Section (Moved to Bottom)
@@ -512,6 +531,166 @@ def create_profit_page():
         }),
     ])
 
+# Output callback grafik; render_*_page() mengisinya langsung di layout awal
+CHART_OUTPUTS = [
+    ('profit-margin-chart', 'figure'),
+    ('discount-impact-chart', 'figure'),
+    ('category-profitability', 'figure'),
+    ('discount-distribution', 'figure'),
+    ('profit-filter-indicator', 'children'),
+]
+
+def _detect_columns(columns):
+    # Dynamically detect column names
+    category_col = next((col for col in columns if 'category' in col.lower()), 'Category')
+    subcategory_col = next((col for col in columns if 'sub' in col.lower() and 'category' in col.lower()), 'Sub-Category')
+    discount_col = next((col for col in columns if 'discount' in col.lower()), 'Discount')
+    sales_col = next((col for col in columns if 'sales' in col.lower()), 'Sales')
+    profit_col = next((col for col in columns if 'profit' in col.lower()), 'Profit')
+    product_col = next((col for col in columns if 'product' in col.lower() and 'name' in col.lower()), 'Product Name')
+    return category_col, subcategory_col, discount_col, sales_col, profit_col, product_col
+
+def _filters(filter_state, columns):
+    category_col, _, discount_col = _detect_columns(columns)[:3]
+    selected_category = filter_state.get('selected_category')
+    selected_discount_range = filter_state.get('selected_discount_range')
+    if selected_category and category_col in columns:
+        return {category_col: selected_category}
+    if selected_discount_range and discount_col in columns:
+        range_map = {
+            '0-10%': (0, 0.1),
+            '10-20%': (0.1, 0.2),
+            '20-30%': (0.2, 0.3),
+            '30%+': (0.3, 1.0)
+        }
+        min_d, max_d = range_map.get(selected_discount_range, (0, 1))
+        return {discount_col: ('between', min_d, max_d)}
+    return {}
+
+@cached_callback('profit-charts')
+def update_profit_charts(filter_state):
+    if is_empty():
+        logger.warning("DataFrame is empty in update_profit_charts")
+        return dash.no_update, dash.no_update, dash.no_update, dash.no_update, "No data available"
+
+    columns = query_columns()
+    category_col, subcategory_col, discount_col, sales_col, profit_col = _detect_columns(columns)[:5]
+
+    selected_category = filter_state.get('selected_category')
+    selected_discount_range = filter_state.get('selected_discount_range')
+
+    if selected_category:
+        filter_text = f"Filtered by Category: {selected_category}"
+    elif selected_discount_range:
+        filter_text = f"Filtered by Discount Range: {selected_discount_range}"
+    else:
+        filter_text = "No filter applied. Click on charts to filter data."
+
+    filters = _filters(filter_state, columns)
+
+    # Profit Margin by Category
+    if category_col in columns and sales_col in columns and profit_col in columns:
+        category_profit = aggregate({
+            sales_col: (sales_col, 'sum'),
+            profit_col: (profit_col, 'sum')
+        }, by=[category_col], filters=filters)
+        category_profit['profit_margin'] = (category_profit[profit_col] / category_profit[sales_col] * 100).round(2)
+
+        margin_chart = px.bar(category_profit, x=category_col, y='profit_margin',
+                             title=f'📊 Profit Margin by Category {"- " + selected_category if selected_category else "- " + selected_discount_range if selected_discount_range else ""} (%)',
+                             color='profit_margin',
+                             color_continuous_scale='RdYlGn')
+        margin_chart.update_layout(plot_bgcolor='white', paper_bgcolor='white')
+    else:
+        margin_chart = px.bar(title="📊 Profit Margin by Category - Data Unavailable")
+
+    # Discount Impact
+    if discount_col in columns:
+        discount_impact = aggregate({
+            sales_col: (sales_col, 'sum'),
+            profit_col: (profit_col, 'sum')
+        }, by=['discount_range'], filters=filters)
+
+        impact_chart = px.bar(discount_impact, x='discount_range', y=[sales_col, profit_col],
+                             title=f'💸 Discount Impact on Sales & Profit {"- " + selected_category if selected_category else ""}',
+                             barmode='group',
+                             color_discrete_sequence=['#667eea', '#f5576c'])
+        impact_chart.update_layout(plot_bgcolor='white', paper_bgcolor='white')
+    else:
+        impact_chart = px.bar(title="💸 Discount Impact - Data Unavailable")
+
+    # Category Profitability
+    groupby_columns = [category_col]
+    if subcategory_col in columns:
+        groupby_columns.append(subcategory_col)
+
+    if all(c in columns for c in groupby_columns + [sales_col, profit_col]):
+        cat_profit_detail = aggregate({
+            profit_col: (profit_col, 'sum'),
+            sales_col: (sales_col, 'sum')
+        }, by=groupby_columns, filters=filters)
+
+        # Transform profit for size to ensure non-negative values
+        cat_profit_detail['profit_size'] = np.abs(cat_profit_detail[profit_col])  # Use absolute value
+        cat_profit_detail['profit_size'] = cat_profit_detail['profit_size'] + 1  # Shift to avoid zero
+
+        hover_data = {category_col: True, sales_col: ':.2f', profit_col: ':.2f'}
+        if subcategory_col in groupby_columns:
+            hover_data[subcategory_col] = True
+
+        profitability_chart = px.scatter(
+            cat_profit_detail, 
+            x=sales_col, 
+            y=profit_col,
+            color=category_col, 
+            size='profit_size',  # Use transformed column
+            hover_name=category_col,
+            hover_data=hover_data,
+            custom_data=[category_col],
+            title=f'💎 Category Profitability Matrix {"- " + selected_category if selected_category else "- " + selected_discount_range if selected_discount_range else ""}'
+        )
+        profitability_chart.update_layout(plot_bgcolor='white', paper_bgcolor='white')
+        profitability_chart = apply_point_budget(profitability_chart)
+    else:
+        profitability_chart = px.scatter(title="💎 Category Profitability - Data Unavailable")
+
+    # Discount Distribution
+    if discount_col in columns:
+        # Jumlah baris per nilai diskon, di-bin di server (count dijumlahkan per bin)
+        discount_counts = aggregate({'count': (discount_col, 'count')}, by=[discount_col], filters=filters)
+        discount_dist = histogram(discount_counts[discount_col], nbins=20, weights=discount_counts['count'],
+                                  title=f'📈 Discount Distribution {"- " + selected_category if selected_category else ""}',
+                                  x_title=discount_col, color='#f5576c')
+        discount_dist.update_layout(plot_bgcolor='white', paper_bgcolor='white')
+    else:
+        discount_dist = px.histogram(title="📈 Discount Distribution - Data Unavailable")
+
+    return margin_chart, impact_chart, profitability_chart, discount_dist, filter_text
+
+def _loss_products(filter_state):
+    columns = [] if is_empty() else query_columns()
+    profit_col, product_col = _detect_columns(columns)[4:]
+    if product_col not in columns or profit_col not in columns:
+        return pd.DataFrame({'Product': pd.Series(dtype=object), 'Loss ($)': pd.Series(dtype=float)})
+    loss_products = aggregate({profit_col: (profit_col, 'sum')}, by=[product_col], filters=_filters(filter_state, columns),
+                              order_by=profit_col, ascending=True)
+    loss_products = loss_products[loss_products[profit_col] < 0]
+    loss_products.columns = ['Product', 'Loss ($)']
+    loss_products['Loss ($)'] = loss_products['Loss ($)'].round(1)
+    return loss_products
+
+def update_loss_table(filter_state, page_current=0, page_size=PAGE_SIZE, sort_by=LOSS_SORT, filter_query=''):
+    """One page of the loss products table (every product with a loss, paged, sorted and filtered on the server)"""
+    frame = table_frame('loss-products', filter_state, _loss_products)
+    return table_page(frame, page_current, page_size, sort_by, filter_query, LOSS_TOOLTIPS)
+
+def render_profit_page():
+    """Profit layout with its charts and table already filled in"""
+    layout = create_profit_page()
+    filter_state = initial_value(layout, 'profit-filter-state', 'data')
+    fill_outputs(layout, CHART_OUTPUTS, update_profit_charts(filter_state))
+    return fill_outputs(layout, table_outputs('loss-products-table'), update_loss_table(filter_state))
+
 def register_callbacks(app):
     @app.callback(
         Output('profit-filter-state', 'data'),
@@ -522,7 +701,8 @@ def register_callbacks(app):
             Input('category-profitability', 'clickData'),
             Input('loss-products-table', 'active_cell')
         ],
-        [State('profit-filter-state', 'data')]
+        [State('profit-filter-state', 'data')],
+        prevent_initial_call=True
     )
     def update_profit_filter_state(reset_clicks, margin_click, discount_click, category_click, table_click, current_state):
         ctx = dash.callback_context
@@ -563,181 +743,15 @@ def register_callbacks(app):
             new_state['selected_product'] = None
             
         elif trigger_id == 'loss-products-table' and table_click:
-            pass
+            # Klik sel tabel tidak mengubah filter (dan tidak mereset halaman tabel)
+            return dash.no_update
             
         return new_state
 
-    @app.callback(
-        [
-            Output('profit-margin-chart', 'figure'),
-            Output('discount-impact-chart', 'figure'),
-            Output('category-profitability', 'figure'),
-            Output('discount-distribution', 'figure'),
-            Output('loss-products-table', 'children'),
-            Output('profit-filter-indicator', 'children')
-        ],
-        [
-            Input('current-page', 'data'),
-            Input('profit-filter-state', 'data')
-        ]
-    )
-    def update_profit_charts(current_page, filter_state):
-        df, _, _, _, _, _, _ = get_data()
-        
-        if current_page != 'profit':
-            return dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update
-        
-        if df.empty:
-            logger.warning("DataFrame is empty in update_profit_charts")
-            return dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, "No data available"
-        
-        # Dynamically detect column names
-        category_col = next((col for col in df.columns if 'category' in col.lower()), 'Category')
-        subcategory_col = next((col for col in df.columns if 'sub' in col.lower() and 'category' in col.lower()), 'Sub-Category')
-        discount_col = next((col for col in df.columns if 'discount' in col.lower()), 'Discount')
-        sales_col = next((col for col in df.columns if 'sales' in col.lower()), 'Sales')
-        profit_col = next((col for col in df.columns if 'profit' in col.lower()), 'Profit')
-        product_col = next((col for col in df.columns if 'product' in col.lower() and 'name' in col.lower()), 'Product Name')
-        
-        selected_category = filter_state.get('selected_category')
-        selected_discount_range = filter_state.get('selected_discount_range')
-        
-        if selected_category:
-            filter_text = f"Filtered by Category: {selected_category}"
-        elif selected_discount_range:
-            filter_text = f"Filtered by Discount Range: {selected_discount_range}"
-        else:
-            filter_text = "No filter applied. Click on charts to filter data."
-        
-        filtered_df = df
-        if selected_category and category_col in df.columns:
-            filtered_df = df[df[category_col] == selected_category]
-        elif selected_discount_range and discount_col in df.columns:
-            range_map = {
-                '0-10%': (0, 0.1),
-                '10-20%': (0.1, 0.2),
-                '20-30%': (0.2, 0.3),
-                '30%+': (0.3, 1.0)
-            }
-            min_d, max_d = range_map.get(selected_discount_range, (0, 1))
-            filtered_df = df[(df[discount_col] >= min_d) & (df[discount_col] < max_d)]
-        
-        # Profit Margin by Category
-        if category_col in filtered_df.columns and sales_col in filtered_df.columns and profit_col in filtered_df.columns:
-            category_profit = filtered_df.groupby(category_col).agg({
-                sales_col: 'sum',
-                profit_col: 'sum'
-            }).reset_index()
-            category_profit['profit_margin'] = (category_profit[profit_col] / category_profit[sales_col] * 100).round(2)
-            
-            margin_chart = px.bar(category_profit, x=category_col, y='profit_margin',
-                                 title=f'📊 Profit Margin by Category {"- " + selected_category if selected_category else "- " + selected_discount_range if selected_discount_range else ""} (%)',
-                                 color='profit_margin',
-                                 color_continuous_scale='RdYlGn')
-            margin_chart.update_layout(plot_bgcolor='white', paper_bgcolor='white')
-        else:
-            margin_chart = px.bar(title="📊 Profit Margin by Category - Data Unavailable")
-        
-        # Discount Impact
-        if discount_col in filtered_df.columns:
-            filtered_df['discount_range'] = pd.cut(filtered_df[discount_col], bins=[0, 0.1, 0.2, 0.3, 1.0], 
-                                         labels=['0-10%', '10-20%', '20-30%', '30%+'])
-            discount_impact = filtered_df.groupby('discount_range').agg({
-                sales_col: 'sum',
-                profit_col: 'sum'
-            }).reset_index()
-            
-            impact_chart = px.bar(discount_impact, x='discount_range', y=[sales_col, profit_col],
-                                 title=f'💸 Discount Impact on Sales & Profit {"- " + selected_category if selected_category else ""}',
-                                 barmode='group',
-                                 color_discrete_sequence=['#667eea', '#f5576c'])
-            impact_chart.update_layout(plot_bgcolor='white', paper_bgcolor='white')
-        else:
-            impact_chart = px.bar(title="💸 Discount Impact - Data Unavailable")
-        
-        # Category Profitability
-        groupby_columns = [category_col]
-        if subcategory_col in filtered_df.columns:
-            groupby_columns.append(subcategory_col)
-        
-        if all(c in filtered_df.columns for c in groupby_columns + [sales_col, profit_col]):
-            cat_profit_detail = filtered_df.groupby(groupby_columns).agg({
-                profit_col: 'sum',
-                sales_col: 'sum'
-            }).reset_index()
-            
-            # Transform profit for size to ensure non-negative values
-            cat_profit_detail['profit_size'] = np.abs(cat_profit_detail[profit_col])  # Use absolute value
-            cat_profit_detail['profit_size'] = cat_profit_detail['profit_size'] + 1  # Shift to avoid zero
-            
-            hover_data = {category_col: True, sales_col: ':.2f', profit_col: ':.2f'}
-            if subcategory_col in groupby_columns:
-                hover_data[subcategory_col] = True
-            
-            profitability_chart = px.scatter(
-                cat_profit_detail, 
-                x=sales_col, 
-                y=profit_col,
-                color=category_col, 
-                size='profit_size',  # Use transformed column
-                hover_name=category_col,
-                hover_data=hover_data,
-                custom_data=[category_col],
-                title=f'💎 Category Profitability Matrix {"- " + selected_category if selected_category else "- " + selected_discount_range if selected_discount_range else ""}'
-            )
-            profitability_chart.update_layout(plot_bgcolor='white', paper_bgcolor='white')
-        else:
-            profitability_chart = px.scatter(title="💎 Category Profitability - Data Unavailable")
-        
-        # Discount Distribution
-        if discount_col in filtered_df.columns:
-            discount_dist = px.histogram(filtered_df, x=discount_col, nbins=20,
-                                       title=f'📈 Discount Distribution {"- " + selected_category if selected_category else ""}',
-                                       color_discrete_sequence=['#f5576c'])
-            discount_dist.update_layout(plot_bgcolor='white', paper_bgcolor='white')
-        else:
-            discount_dist = px.histogram(title="📈 Discount Distribution - Data Unavailable")
-        
-        # Loss Products Table
-        if product_col in filtered_df.columns and profit_col in filtered_df.columns:
-            loss_products = filtered_df.groupby(product_col)[profit_col].sum().reset_index()
-            loss_products = loss_products[loss_products[profit_col] < 0].nsmallest(10, profit_col)
-            loss_products.columns = ['Product', 'Loss ($)']
-            loss_products['Loss ($)'] = loss_products['Loss ($)'].round(1)
-            
-            if not loss_products.empty:
-                loss_table = dash_table.DataTable(
-                    data=loss_products.to_dict('records'),
-                    columns=[{"name": i, "id": i, "type": "numeric", "format": {"specifier": ",.2f"}} if 'Loss' in i else {"name": i, "id": i} for i in loss_products.columns],
-                    style_cell={'textAlign': 'left', 'padding': '10px', 'fontSize': 14},
-                    style_header={
-                        'backgroundColor': '#e74c3c',
-                        'color': 'white',
-                        'fontWeight': 'bold',
-                        'textAlign': 'center'
-                    },
-                    style_data={'backgroundColor': '#fdf2f2'},
-                    style_data_conditional=[
-                        {
-                            'if': {'row_index': i},
-                            'backgroundColor': '#fdf2f2' if i % 2 == 0 else '#ffffff',
-                            'color': 'black'
-                        } for i in range(len(loss_products))
-                    ],
-                    tooltip_data=[
-                        {
-                            col: {'value': f"{row[col]:,.2f}" if 'Loss' in col else row[col], 'type': 'markdown'}
-                            for col in loss_products.columns
-                        } for _, row in loss_products.iterrows()
-                    ],
-                    style_table={'overflowX': 'auto'},
-                )
-            else:
-                loss_table = html.P("🎉 No products with losses found!", style={'text-align': 'center', 'color': '#27ae60'})
-        else:
-            loss_table = html.P("⚠️ Product or profit data unavailable", style={'text-align': 'center', 'color': '#e74c3c'})
-        
-        return margin_chart, impact_chart, profitability_chart, discount_dist, loss_table, filter_text
+    app.callback([Output(*output) for output in CHART_OUTPUTS],
+                 [Input('profit-filter-state', 'data')],
+                 prevent_initial_call=True)(update_profit_charts)
+    register_table_callback(app, 'loss-products-table', ('profit-filter-state', 'data'), update_loss_table)
 
     @app.callback(
     Output('prediction-output', 'children'),
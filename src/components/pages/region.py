@@ -1,15 +1,29 @@
+import logging
 import dash
 import pandas as pd
-from dash import html, dcc, dash_table
+from dash import html, dcc
 from dash.dependencies import Input, Output, State
 import plotly.express as px
 from src.config.styles import custom_style
-from src.data.data_loader import get_data
+from src.data.query import aggregate, is_empty
+from src.components.render import fill_outputs, initial_value
+from src.components.tables import (PAGE_SIZE, explorer_table, register_table_callback, table_frame, table_outputs,
+                                   table_page)
+from src.utils.response_cache import cached_callback
+
+logger = logging.getLogger(__name__)
+
+# Tabel kota: semua kota, dipaging/diurutkan/difilter di server
+CITY_COLUMNS = [
+    {"name": i, "id": i, "type": "numeric", "format": {"specifier": ",.0f"}} if i != "City"
+    else {"name": i, "id": i} for i in ['City', 'Sales ($)', 'Profit ($)', 'Orders']
+]
+CITY_SORT = [{'column_id': 'Sales ($)', 'direction': 'desc'}]
+CITY_TOOLTIPS = {'Sales ($)': ',.0f', 'Profit ($)': ',.0f', 'Orders': ',.0f'}
 
 def create_region_page():
-    df, _, _, _, _, _, _ = get_data()
-    if df.empty:
-        print("Region page: DataFrame is empty")
+    if is_empty():
+        logger.warning("Region page: DataFrame is empty")
         return html.Div([
             html.H1("🌍 Regional Analysis Dashboard", style={'color': '#2c3e50', 'margin-bottom': '30px'}),
             html.P("⚠️ Tidak ada data tersedia. Periksa koneksi database atau file data_loader.py.", 
@@ -69,11 +83,164 @@ def create_region_page():
         
         # Top Cities Table
         html.Div([
-            html.H3("🏙️ Top 10 Cities by Sales", style={'color': '#2c3e50', 'margin-bottom': '20px'}),
-            html.Div(id="top-cities-table")
+            html.H3("🏙️ Cities by Sales", style={'color': '#2c3e50', 'margin-bottom': '20px'}),
+            explorer_table('top-cities-table', CITY_COLUMNS, CITY_SORT)
         ], style=custom_style['card']),
     ])
 
+# Output callback grafik; render_*_page() mengisinya langsung di layout awal
+CHART_OUTPUTS = [
+    ('regional-map', 'figure'),
+    ('sales-by-region-chart', 'figure'),
+    ('profit-by-state-chart', 'figure'),
+    ('filter-indicator', 'children'),
+]
+
+def _filters(filter_state):
+    if filter_state.get('selected_state'):
+        return {'state': filter_state['selected_state']}
+    if filter_state.get('selected_region'):
+        return {'region': filter_state['selected_region']}
+    return {}
+
+@cached_callback('region-charts')
+def update_regional_charts(filter_state):
+    selected_state = filter_state.get('selected_state')
+    selected_region = filter_state.get('selected_region')
+
+    # Update filter text
+    if selected_state:
+        filter_text = f"Filtered by State: {selected_state}"
+    elif selected_region:
+        filter_text = f"Filtered by Region: {selected_region}"
+    else:
+        filter_text = "No filter applied. Click on the map or charts to filter data."
+
+    # Filter data
+    filters = _filters(filter_state)
+
+    # Regional Map
+    region_sales = aggregate({'sales': ('sales', 'sum')}, by=['state', 'lat', 'lng'])
+    region_sales['sales_scaled'] = region_sales['sales'] / region_sales['sales'].max() * 30
+
+    regional_map = px.scatter_mapbox(
+        region_sales,
+        lat='lat',
+        lon='lng',
+        size='sales_scaled',
+        color='sales',
+        color_continuous_scale='Viridis',
+        hover_name='state',
+        hover_data={
+            'sales': ':,.0f',
+            'sales_scaled': False,
+            'lat': False,
+            'lng': False
+        },
+        title=f'🗺️ Sales Distribution by Location '
+              f'{"- " + selected_state if selected_state else "- " + selected_region if selected_region else ""}',
+        mapbox_style='open-street-map',
+        height=500,
+        zoom=3.5,
+        center={'lat': 37.0902, 'lon': -95.7129},
+        opacity=0.7
+    )
+    regional_map.update_layout(
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        margin={'r': 20, 't': 50, 'l': 20, 'b': 20},
+        title={'x': 0.5, 'xanchor': 'center', 'font': {'size': 20, 'color': '#2c3e50'}},
+        mapbox_accesstoken=None,
+        showlegend=True,
+        mapbox=dict(
+            zoom=5 if selected_state else 3.5,
+            pitch=0,
+            bearing=0,
+            style='open-street-map',
+            center=(
+                {'lat': region_sales[region_sales['state'] == selected_state]['lat'].iloc[0],
+                 'lon': region_sales[region_sales['state'] == selected_state]['lng'].iloc[0]}
+                if selected_state else {'lat': 37.0902, 'lon': -95.7129}
+            ),
+            bounds={'west': -180, 'east': 180, 'south': -90, 'north': 90}
+        )
+    )
+
+    # Sales by Region
+    region_totals = aggregate({'sales': ('sales', 'sum')}, by=['region'], filters=filters)
+    region_chart = px.bar(
+        region_totals,
+        x='region',
+        y='sales',
+        title=f'🌎 Sales by Region '
+              f'{"- " + selected_state if selected_state else "- " + selected_region if selected_region else ""}',
+        color='sales',
+        color_continuous_scale='Blues',
+        text_auto='.2s'
+    )
+    region_chart.update_layout(
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        xaxis_title="Region",
+        yaxis_title="Sales ($)",
+        font=dict(size=12),
+        showlegend=False
+    )
+    region_chart.update_traces(
+        textposition='auto',
+        hovertemplate='<b>%{x}</b><br>Sales: $%{y:,.0f}<extra></extra>'
+    )
+
+    # Profit by State
+    state_profit = aggregate({'profit': ('profit', 'sum')}, by=['state'], filters=filters,
+                             order_by='profit', limit=15)
+    state_chart = px.bar(
+        state_profit,
+        x='profit',
+        y='state',
+        title=f'💰 {"Profit by City in " + selected_state if selected_state else "Profit by State"}',
+        orientation='h',
+        color='profit',
+        color_continuous_scale='Greens',
+        text_auto='.2s'
+    )
+    state_chart.update_layout(
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        height=500,
+        xaxis_title="Profit ($)",
+        yaxis_title="State",
+        font=dict(size=12),
+        showlegend=False
+    )
+    state_chart.update_traces(
+        textposition='auto',
+        hovertemplate='<b>%{y}</b><br>Profit: $%{x:,.0f}<extra></extra>'
+    )
+
+    return regional_map, region_chart, state_chart, filter_text
+
+def _city_totals(filter_state):
+    cities = aggregate({
+        'sales': ('sales', 'sum'),
+        'profit': ('profit', 'sum'),
+        'order_key': ('order_key', 'nunique')
+    }, by=['city'], filters=_filters(filter_state)).round(2)
+    cities.columns = ['City', 'Sales ($)', 'Profit ($)', 'Orders']
+    return cities
+
+def update_cities_table(filter_state, page_current=0, page_size=PAGE_SIZE, sort_by=CITY_SORT, filter_query=''):
+    """One page of the cities table (every city, paged, sorted and filtered on the server)"""
+    frame = table_frame('cities', filter_state, _city_totals)
+    return table_page(frame, page_current, page_size, sort_by, filter_query, CITY_TOOLTIPS)
+
+def render_region_page():
+    """Region layout with its charts and table already filled in"""
+    layout = create_region_page()
+    filter_state = initial_value(layout, 'region-filter-state', 'data')
+    fill_outputs(layout, CHART_OUTPUTS, update_regional_charts(filter_state))
+    return fill_outputs(layout, table_outputs('top-cities-table'), update_cities_table(filter_state))
+
 def register_callbacks(app):
     @app.callback(
         Output('region-filter-state', 'data'),
@@ -83,7 +250,8 @@ def register_callbacks(app):
             Input('sales-by-region-chart', 'clickData'),
             Input('profit-by-state-chart', 'clickData')
         ],
-        [State('region-filter-state', 'data')]
+        [State('region-filter-state', 'data')],
+        prevent_initial_call=True
     )
     def update_filter_state(reset_clicks, map_click, region_click, state_click, current_state):
         ctx = dash.callback_context
@@ -112,178 +280,8 @@ def register_callbacks(app):
             
         return new_state
 
-    @app.callback(
-        [
-            Output('regional-map', 'figure'),
-            Output('sales-by-region-chart', 'figure'),
-            Output('profit-by-state-chart', 'figure'),
-            Output('top-cities-table', 'children'),
-            Output('filter-indicator', 'children')
-        ],
-        [
-            Input('current-page', 'data'),
-            Input('region-filter-state', 'data')
-        ]
-    )
-    def update_regional_charts(current_page, filter_state):
-        df, _, _, _, _, _, _ = get_data()
-        
-        if current_page != 'region':
-            return {}, {}, {}, [], ""
-        
-        selected_state = filter_state.get('selected_state')
-        selected_region = filter_state.get('selected_region')
-        
-        # Update filter text
-        if selected_state:
-            filter_text = f"Filtered by State: {selected_state}"
-        elif selected_region:
-            filter_text = f"Filtered by Region: {selected_region}"
-        else:
-            filter_text = "No filter applied. Click on the map or charts to filter data."
-        
-        # Filter DataFrame
-        filtered_df = df
-        if selected_state:
-            filtered_df = df[df['state'] == selected_state]
-        elif selected_region:
-            filtered_df = df[df['region'] == selected_region]
-        
-        # Regional Map
-        region_sales = df.groupby(['state', 'lat', 'lng'])['sales'].sum().reset_index()
-        region_sales['sales_scaled'] = region_sales['sales'] / region_sales['sales'].max() * 30
+    app.callback([Output(*output) for output in CHART_OUTPUTS],
+                 [Input('region-filter-state', 'data')],
+                 prevent_initial_call=True)(update_regional_charts)
+    register_table_callback(app, 'top-cities-table', ('region-filter-state', 'data'), update_cities_table)
 
-        regional_map = px.scatter_mapbox(
-            region_sales,
-            lat='lat',
-            lon='lng',
-            size='sales_scaled',
-            color='sales',
-            color_continuous_scale='Viridis',
-            hover_name='state',
-            hover_data={
-                'sales': ':,.0f',
-                'sales_scaled': False,
-                'lat': False,
-                'lng': False
-            },
-            title=f'🗺️ Sales Distribution by Location '
-                  f'{"- " + selected_state if selected_state else "- " + selected_region if selected_region else ""}',
-            mapbox_style='open-street-map',
-            height=500,
-            zoom=3.5,
-            center={'lat': 37.0902, 'lon': -95.7129},
-            opacity=0.7
-        )
-        regional_map.update_layout(
-            plot_bgcolor='white',
-            paper_bgcolor='white',
-            margin={'r': 20, 't': 50, 'l': 20, 'b': 20},
-            title={'x': 0.5, 'xanchor': 'center', 'font': {'size': 20, 'color': '#2c3e50'}},
-            mapbox_accesstoken=None,
-            showlegend=True,
-            mapbox=dict(
-                zoom=5 if selected_state else 3.5,
-                pitch=0,
-                bearing=0,
-                style='open-street-map',
-                center=(
-                    {'lat': region_sales[region_sales['state'] == selected_state]['lat'].iloc[0],
-                     'lon': region_sales[region_sales['state'] == selected_state]['lng'].iloc[0]}
-                    if selected_state else {'lat': 37.0902, 'lon': -95.7129}
-                ),
-                bounds={'west': -180, 'east': 180, 'south': -90, 'north': 90}
-            )
-        )
-        
-        # Sales by Region
-        region_totals = filtered_df.groupby('region')['sales'].sum().reset_index()
-        region_chart = px.bar(
-            region_totals,
-            x='region',
-            y='sales',
-            title=f'🌎 Sales by Region '
-                  f'{"- " + selected_state if selected_state else "- " + selected_region if selected_region else ""}',
-            color='sales',
-            color_continuous_scale='Blues',
-            text_auto='.2s'
-        )
-        region_chart.update_layout(
-            plot_bgcolor='white',
-            paper_bgcolor='white',
-            xaxis_title="Region",
-            yaxis_title="Sales ($)",
-            font=dict(size=12),
-            showlegend=False
-        )
-        region_chart.update_traces(
-            textposition='auto',
-            hovertemplate='<b>%{x}</b><br>Sales: $%{y:,.0f}<extra></extra>'
-        )
-        
-        # Profit by State
-        state_profit = filtered_df.groupby('state')['profit'].sum().nlargest(15).reset_index()
-        state_chart = px.bar(
-            state_profit,
-            x='profit',
-            y='state',
-            title=f'💰 {"Profit by City in " + selected_state if selected_state else "Profit by State"}',
-            orientation='h',
-            color='profit',
-            color_continuous_scale='Greens',
-            text_auto='.2s'
-        )
-        state_chart.update_layout(
-            plot_bgcolor='white',
-            paper_bgcolor='white',
-            height=500,
-            xaxis_title="Profit ($)",
-            yaxis_title="State",
-            font=dict(size=12),
-            showlegend=False
-        )
-        state_chart.update_traces(
-            textposition='auto',
-            hovertemplate='<b>%{y}</b><br>Profit: $%{x:,.0f}<extra></extra>'
-        )
-        
-        # Top Cities Table
-        top_cities = filtered_df.groupby('city').agg({
-            'sales': 'sum',
-            'profit': 'sum',
-            'order_key': 'nunique'
-        }).round(2).reset_index()
-        top_cities.columns = ['City', 'Sales ($)', 'Profit ($)', 'Orders']
-        top_cities = top_cities.nlargest(10, 'Sales ($)')
-        
-        table = dash_table.DataTable(
-            data=top_cities.to_dict('records'),
-            columns=[
-                {"name": i, "id": i, "type": "numeric", "format": {"specifier": ",.0f"}} if i != "City"
-                else {"name": i, "id": i} for i in top_cities.columns
-            ],
-            style_cell={'textAlign': 'left', 'padding': '10px', 'fontSize': 14},
-            style_header={
-                'backgroundColor': '#667eea',
-                'color': 'white',
-                'fontWeight': 'bold',
-                'textAlign': 'center'
-            },
-            style_data={'backgroundColor': '#f8f9fa'},
-            style_data_conditional=[
-                {
-                    'if': {'row_index': i},
-                    'backgroundColor': '#e3f2fd' if i % 2 == 0 else '#ffffff',
-                    'color': 'black'
-                } for i in range(len(top_cities))
-            ],
-            tooltip_data=[
-                {
-                    col: {'value': f"{row[col]:,.0f}" if col != 'City' else row[col], 'type': 'markdown'}
-                    for col in top_cities.columns
-                } for _, row in top_cities.iterrows()
-            ],
-            style_table={'overflowX': 'auto'},
-        )
-        
-        return regional_map, region_chart, state_chart, table, filter_text
\ No newline at end of file
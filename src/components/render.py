@@ -0,0 +1,27 @@
+import dash
+
+
+def fill_outputs(layout, outputs, values):
+    """Set the (component id, property) `outputs` inside `layout` to `values`.
+
+    Used to send a page with the results its callbacks would produce, instead
+    of an empty layout followed by callback round trips. Components missing
+    from the layout and dash.no_update values are skipped.
+    """
+    for (component_id, prop), value in zip(outputs, values):
+        if value is dash.no_update:
+            continue
+        try:
+            component = layout[component_id]
+        except KeyError:
+            continue
+        setattr(component, prop, value)
+    return layout
+
+
+def initial_value(layout, component_id, prop):
+    """Value of `prop` of the component `component_id` in `layout` (None if unset or missing)"""
+    try:
+        return getattr(layout[component_id], prop, None)
+    except KeyError:
+        return None
@@ -1,17 +1,44 @@
-from dash import html
+import json
+
+from dash import dcc, html
+from dash.dependencies import Input, Output
 from src.config.styles import custom_style
 
+# (halaman, URL, label) menu navigasi; '/' = overview
+NAV_ITEMS = [
+    ('overview', '/', "🏠 Overview"),
+    ('region', '/region', "🌍 Analisis Wilayah"),
+    ('customer', '/customer', "👥 Analisis Pelanggan"),
+    ('profit', '/profit', "💰 Diskon & Profit"),
+]
+
+def page_from_path(pathname):
+    """Page name for a URL path; unknown paths show the overview"""
+    name = (pathname or '/').strip('/')
+    return name if name in {page for page, _, _ in NAV_ITEMS} else 'overview'
+
 def create_sidebar():
     return html.Div([
         html.Div([
             html.H2("📊 Superstore BI", style={'margin-bottom': '30px', 'text-align': 'center'}),
-            html.Button("🏠 Overview", id="nav-overview", n_clicks=0, 
-                       style=custom_style['nav-link']),
-            html.Button("🌍 Analisis Wilayah", id="nav-region", n_clicks=0, 
-                       style=custom_style['nav-link']),
-            html.Button("👥 Analisis Pelanggan", id="nav-customer", n_clicks=0, 
-                       style=custom_style['nav-link']),
-            html.Button("💰 Diskon & Profit", id="nav-profit", n_clicks=0, 
-                       style=custom_style['nav-link']),
+            *[dcc.Link(label, href=href, id=f"nav-{page}", style=custom_style['nav-link'])
+              for page, href, label in NAV_ITEMS],
         ])
-    ], style=custom_style['sidebar'])
\ No newline at end of file
+    ], style=custom_style['sidebar'])
+
+def register_callbacks(app):
+    # Highlight menu aktif dihitung di browser dari URL, tanpa request ke server
+    app.clientside_callback(
+        f"""
+        function(pathname) {{
+            const pages = {json.dumps([page for page, _, _ in NAV_ITEMS])};
+            const base = {json.dumps(custom_style['nav-link'])};
+            const active = Object.assign({{}}, base, {json.dumps(custom_style['nav-link-active'])});
+            let name = (pathname || '/').replace(/^\\/+|\\/+$/g, '');
+            if (!pages.includes(name)) {{ name = 'overview'; }}
+            return pages.map(page => page === name ? active : base);
+        }}
+        """,
+        [Output(f"nav-{page}", 'style') for page, _, _ in NAV_ITEMS],
+        Input('url', 'pathname')
+    )
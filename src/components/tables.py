@@ -0,0 +1,203 @@
+import json
+import logging
+import math
+import re
+import threading
+import time
+
+import dash
+import pandas as pd
+from dash import dash_table
+from dash.dependencies import Input, Output
+
+from src.config import settings
+from src.data.query import data_version
+from src.utils.cache_backend import dump_frame, load_frame, open_cache
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 10
+# Properti tabel yang diisi callback halaman (dan oleh render_*_page() untuk halaman pertama)
+PAGE_PROPS = ['data', 'page_count', 'tooltip_data', 'page_current']
+
+# Tabel lengkap (semua kota/customer/produk) per filter state dan versi data; callback
+# halaman hanya memotong satu halaman darinya
+_frames = None
+_frames_lock = threading.Lock()
+
+# Operator filter_query DataTable -> operator pandas ('s'/'i' di depan = case sensitive/insensitive)
+_OPERATORS = {
+    '>=': 'ge', 'ge': 'ge', '<=': 'le', 'le': 'le', '<': 'lt', 'lt': 'lt', '>': 'gt', 'gt': 'gt',
+    '!=': 'ne', 'ne': 'ne', '=': 'eq', 'eq': 'eq', 'contains': 'contains', 'datestartswith': 'datestartswith',
+}
+_FILTER_PART = re.compile(r'^\s*\{(?P<column>[^}]+)\}\s+(?P<operator>\S+)\s*(?P<value>.*?)\s*$')
+
+
+def explorer_table(table_id, columns, sort_by, header_color='#667eea', stripes=('#e3f2fd', '#ffffff'),
+                   background='#f8f9fa'):
+    """DataTable whose paging, sorting and filtering run on the server (see table_page).
+
+    Rows are striped by rule (even/odd), so the styling doesn't grow with the
+    number of rows.
+    """
+    return dash_table.DataTable(
+        id=table_id,
+        columns=columns,
+        data=[],
+        page_action='custom',
+        page_current=0,
+        page_size=PAGE_SIZE,
+        sort_action='custom',
+        sort_mode='single',
+        sort_by=sort_by,
+        filter_action='custom',
+        filter_query='',
+        style_cell={'textAlign': 'left', 'padding': '10px', 'fontSize': 14},
+        style_header={
+            'backgroundColor': header_color,
+            'color': 'white',
+            'fontWeight': 'bold',
+            'textAlign': 'center'
+        },
+        style_data={'backgroundColor': background},
+        style_data_conditional=[
+            {'if': {'row_index': 'even'}, 'backgroundColor': stripes[0], 'color': 'black'},
+            {'if': {'row_index': 'odd'}, 'backgroundColor': stripes[1], 'color': 'black'},
+        ],
+        style_table={'overflowX': 'auto'},
+    )
+
+
+def _cache():
+    global _frames
+    if _frames is None:
+        with _frames_lock:
+            if _frames is None:
+                _frames = open_cache('tables', settings.RESPONSE_CACHE_SIZE, settings.RESPONSE_CACHE_MB * 1024 ** 2)
+    return _frames
+
+
+def table_frame(name, filter_state, build):
+    """`build(filter_state)`, the full rows of table `name`, cached per data version"""
+    if not settings.RESPONSE_CACHE:
+        return build(filter_state)
+    version = data_version()
+    key = json.dumps([name, version, filter_state], sort_keys=True, default=str)
+    entry = _cache().get(key)
+    if entry is not None and (settings.RESPONSE_CACHE_TTL <= 0
+                              or time.time() - entry[0] <= settings.RESPONSE_CACHE_TTL):
+        frame = load_frame(entry[1])
+        if frame is not None:
+            return frame
+    frame = build(filter_state)
+    try:
+        _cache().set(key, version, dump_frame(frame))
+    except (ValueError, TypeError, NotImplementedError) as e:
+        logger.debug(f"Table {name} not cached: {e}")
+    return frame
+
+
+def clear():
+    _cache().clear()
+
+
+def _condition(series, operator, value):
+    sensitive = not operator.startswith('i')
+    operator = _OPERATORS.get(operator[1:] if operator[:1] in ('s', 'i') and operator[1:] in _OPERATORS
+                              else operator)
+    if operator is None:
+        return None
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'`':
+        value = value[1:-1]
+    if operator in ('contains', 'datestartswith'):
+        text = series.astype(str)
+        if operator == 'datestartswith':
+            return text.str.startswith(value)
+        return text.str.contains(value, case=sensitive, regex=False)
+    if pd.api.types.is_numeric_dtype(series):
+        try:
+            value = float(value)
+        except ValueError:
+            return None
+    else:
+        # Kolom teks (juga categorical tanpa urutan) dibandingkan sebagai string
+        series = series.astype(str)
+        if not sensitive:
+            series, value = series.str.casefold(), value.casefold()
+    return getattr(series, operator)(value)
+
+
+def apply_filter_query(frame, filter_query):
+    """Rows of `frame` matching a DataTable filter_query ('{col} op value && ...').
+
+    Parts naming an unknown column or operator, or whose values can't be
+    compared, are ignored.
+    """
+    if not filter_query:
+        return frame
+    mask = pd.Series(True, index=frame.index)
+    for part in filter_query.split(' && '):
+        match = _FILTER_PART.match(part)
+        if match is None or match['column'] not in frame.columns:
+            continue
+        try:
+            condition = _condition(frame[match['column']], match['operator'], match['value'])
+        except (TypeError, ValueError) as e:
+            logger.debug(f"Ignoring filter {part!r}: {e}")
+            continue
+        if condition is not None:
+            mask &= condition
+    return frame[mask]
+
+
+def _tooltips(page, formats):
+    # Per kolom sekaligus, hanya untuk baris halaman ini
+    values = {col: page[col].map(('{:' + formats[col] + '}').format) if col in formats else page[col].astype(str)
+              for col in page.columns}
+    return [{col: {'value': value, 'type': 'markdown'} for col, value in zip(values, row)}
+            for row in zip(*values.values())]
+
+
+def table_page(frame, page_current, page_size, sort_by, filter_query, formats):
+    """(rows, page count, tooltips, page index) of one page of `frame`.
+
+    `frame` is filtered by `filter_query` and sorted by `sort_by` (DataTable
+    properties) first; only the requested page is serialized. `formats` maps
+    columns to the format spec of their tooltip. A page index past the end
+    is moved to the last page.
+    """
+    frame = apply_filter_query(frame, filter_query)
+    sort_by = [s for s in sort_by or [] if s['column_id'] in frame.columns]
+    if sort_by:
+        frame = frame.sort_values([s['column_id'] for s in sort_by],
+                                  ascending=[s['direction'] == 'asc' for s in sort_by], kind='stable')
+    page_size = page_size or PAGE_SIZE
+    page_count = max(1, math.ceil(len(frame) / page_size))
+    page_current = min(page_current or 0, page_count - 1)
+    page = frame.iloc[page_current * page_size:(page_current + 1) * page_size]
+    return page.to_dict('records'), page_count, _tooltips(page, formats), page_current
+
+
+def table_outputs(table_id):
+    return [(table_id, prop) for prop in PAGE_PROPS]
+
+
+def register_table_callback(app, table_id, filter_input, update):
+    """Serve the pages of `table_id` with `update(filter_state, page_current, page_size, sort_by, filter_query)`.
+
+    `filter_input` is the (id, property) of the page's filter state. A new
+    filter state, sort order or filter query starts again from the first page.
+    """
+    @app.callback(
+        [Output(*output) for output in table_outputs(table_id)],
+        [Input(*filter_input),
+         Input(table_id, 'page_current'),
+         Input(table_id, 'page_size'),
+         Input(table_id, 'sort_by'),
+         Input(table_id, 'filter_query')],
+        prevent_initial_call=True
+    )
+    def update_table_page(filter_state, page_current, page_size, sort_by, filter_query):
+        if dash.callback_context.triggered[0]['prop_id'] != f"{table_id}.page_current":
+            page_current = 0
+        return update(filter_state, page_current, page_size, sort_by, filter_query)
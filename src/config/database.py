@@ -1,11 +1,67 @@
+import os
+import threading
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import URL, make_url
+
+from src.config import settings
+
+# Satu engine (dan satu pool koneksi) per proses
+_engine = None
+_engine_lock = threading.Lock()
+
+def database_url():
+    if settings.DATABASE_URL:
+        return make_url(settings.DATABASE_URL)
+    return URL.create(
+        'postgresql+psycopg2',
+        username=settings.DB_USER,
+        password=settings.DB_PASS,
+        host=settings.DB_HOST,
+        port=int(settings.DB_PORT),
+        database=settings.DB_NAME,
+    )
+
+def _create_engine():
+    connect_args = {}
+    if settings.DB_STATEMENT_TIMEOUT_MS > 0:
+        connect_args['options'] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+    return create_engine(
+        database_url(),
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=connect_args,
+    )
 
 def get_db_connection():
-    DB_USER = 'postgres'
-    DB_PASS = '18agustuz203'
-    DB_HOST = 'localhost'
-    DB_PORT = '5432'
-    DB_NAME = 'dwh_superstore2'
-    
-    engine = create_engine(f'postgresql+psycopg2://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}')
-    return engine
\ No newline at end of file
+    """Process-wide pooled engine, created on first use"""
+    global _engine
+    engine = _engine
+    if engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = _create_engine()
+            engine = _engine
+    return engine
+
+def dispose_engine(close=True):
+    """Drop the pooled connections; the next checkout opens fresh ones.
+
+    close=False only forgets the connections without closing them, which is
+    what a forked child must do with sockets it shares with its parent.
+    """
+    engine = _engine
+    if engine is not None:
+        engine.dispose(close=close)
+
+def _after_fork_in_child():
+    global _engine_lock
+    # Lock bisa saja sedang dipegang thread lain saat fork
+    _engine_lock = threading.Lock()
+    dispose_engine(close=False)
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -0,0 +1,97 @@
+import os
+
+
+def _env_flag(name, default):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() not in ('0', 'false', 'no', 'off', '')
+
+
+# Snapshot kolumnar hasil load_data() (Parquet)
+SNAPSHOT_ENABLED = _env_flag('SUPERSTORE_SNAPSHOT', True)
+SNAPSHOT_DIR = os.environ.get('SUPERSTORE_SNAPSHOT_DIR', os.path.join('.cache', 'snapshot'))
+
+# Dataset dipublikasikan sekali sebagai file kolom NumPy yang dipetakan (mmap) read-only oleh
+# semua worker; default di /dev/shm kalau ada, selain itu .cache/columns
+COLUMN_STORE = _env_flag('SUPERSTORE_COLUMN_STORE', True)
+COLUMN_STORE_DIR = os.environ.get('SUPERSTORE_COLUMN_STORE_DIR', '')
+
+# Kolom teks sebagai categorical, numerik di-downcast, fact_sales tidak disimpan terpisah
+COMPACT_STORAGE = _env_flag('SUPERSTORE_COMPACT', True)
+
+# Load dataset yang gagal dicoba lagi dengan backoff eksponensial (detik awal, batas atas)
+LOAD_RETRY_SECONDS = float(os.environ.get('SUPERSTORE_LOAD_RETRY_SECONDS', '5'))
+LOAD_RETRY_MAX_SECONDS = float(os.environ.get('SUPERSTORE_LOAD_RETRY_MAX_SECONDS', '300'))
+
+# Kolom high-water mark fact_sales untuk refresh_data()
+REFRESH_WATERMARK_COLUMN = os.environ.get('SUPERSTORE_REFRESH_WATERMARK', 'order_key')
+
+# Refresh dataset di background (detik, 0 = hanya lewat trigger admin)
+REFRESH_INTERVAL = int(os.environ.get('SUPERSTORE_REFRESH_INTERVAL', '0'))
+
+# Token untuk endpoint /admin/*; kosong = hanya dari localhost
+ADMIN_TOKEN = os.environ.get('SUPERSTORE_ADMIN_TOKEN', '')
+
+# Ekstraksi warehouse: 'pages' = hanya kolom yang dipakai halaman, 'all' = SELECT *
+EXTRACT_PROJECTION = os.environ.get('SUPERSTORE_PROJECTION', 'pages')
+EXTRACT_WORKERS = int(os.environ.get('SUPERSTORE_EXTRACT_WORKERS', '6'))
+
+# Engine ekstraksi fact_sales: 'read_sql' atau 'copy' (COPY ... TO STDOUT, psycopg2)
+FACT_EXTRACT_ENGINE = os.environ.get('SUPERSTORE_FACT_ENGINE', 'read_sql')
+
+# Streaming fact_sales lewat server-side cursor (baris per chunk, 0 = nonaktif)
+EXTRACT_CHUNKSIZE = int(os.environ.get('SUPERSTORE_STREAM_CHUNKSIZE', '0'))
+
+# Koneksi warehouse (SUPERSTORE_DATABASE_URL menimpa komponen di bawah)
+DATABASE_URL = os.environ.get('SUPERSTORE_DATABASE_URL', '')
+DB_USER = os.environ.get('SUPERSTORE_DB_USER', 'postgres')
+DB_PASS = os.environ.get('SUPERSTORE_DB_PASS', '18agustuz203')
+DB_HOST = os.environ.get('SUPERSTORE_DB_HOST', 'localhost')
+DB_PORT = os.environ.get('SUPERSTORE_DB_PORT', '5432')
+DB_NAME = os.environ.get('SUPERSTORE_DB_NAME', 'dwh_superstore2')
+
+# Pool koneksi: satu engine per proses, dipakai semua komponen
+DB_POOL_SIZE = int(os.environ.get('SUPERSTORE_DB_POOL_SIZE', '6'))
+DB_MAX_OVERFLOW = int(os.environ.get('SUPERSTORE_DB_MAX_OVERFLOW', '4'))
+DB_POOL_TIMEOUT = int(os.environ.get('SUPERSTORE_DB_POOL_TIMEOUT', '30'))
+DB_POOL_RECYCLE = int(os.environ.get('SUPERSTORE_DB_POOL_RECYCLE', '1800'))
+DB_POOL_PRE_PING = _env_flag('SUPERSTORE_DB_PRE_PING', True)
+# Batas waktu per statement di server (milidetik, 0 = tanpa batas)
+DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('SUPERSTORE_DB_STATEMENT_TIMEOUT_MS', '300000'))
+
+# Mesin agregasi callback halaman: 'pandas' (dataset di memori) atau 'sql' (GROUP BY di warehouse)
+QUERY_ENGINE = os.environ.get('SUPERSTORE_QUERY_ENGINE', 'pandas')
+
+# Cube pra-agregasi per generasi dataset untuk rollup aditif (backend pandas)
+CUBE_ENABLED = _env_flag('SUPERSTORE_CUBE', True)
+
+# Sketch distinct-count per cell cube: 'hll' (HyperLogLog), 'exact', atau 'off'
+DISTINCT_SKETCH = os.environ.get('SUPERSTORE_DISTINCT_SKETCH', 'hll')
+HLL_PRECISION = int(os.environ.get('SUPERSTORE_HLL_PRECISION', '14'))
+
+# Bitmap index per nilai dimensi untuk filter klik pada data level baris
+BITMAP_INDEX = _env_flag('SUPERSTORE_BITMAP_INDEX', True)
+
+# Cache LRU posisi baris hasil filter (per generasi dataset dan filter)
+VIEW_CACHE_SIZE = int(os.environ.get('SUPERSTORE_VIEW_CACHE_SIZE', '32'))
+VIEW_CACHE_MB = int(os.environ.get('SUPERSTORE_VIEW_CACHE_MB', '64'))
+
+# Cache output callback halaman (figure/tabel terserialisasi) per filter state dan versi data
+RESPONSE_CACHE = _env_flag('SUPERSTORE_RESPONSE_CACHE', True)
+RESPONSE_CACHE_SIZE = int(os.environ.get('SUPERSTORE_RESPONSE_CACHE_SIZE', '256'))
+RESPONSE_CACHE_MB = int(os.environ.get('SUPERSTORE_RESPONSE_CACHE_MB', '128'))
+# Umur maksimum entri (detik, 0 = sampai versi data berganti)
+RESPONSE_CACHE_TTL = int(os.environ.get('SUPERSTORE_RESPONSE_CACHE_TTL', '600'))
+
+# Backend cache bersama: 'memory' (per proses), 'sqlite' (file di disk) atau 'shm' (file di /dev/shm);
+# 'sqlite'/'shm' dibagi semua worker yang memakai path yang sama
+CACHE_BACKEND = os.environ.get('SUPERSTORE_CACHE_BACKEND', 'memory')
+CACHE_PATH = os.environ.get('SUPERSTORE_CACHE_PATH', '')
+
+# Cache hasil GROUP BY warehouse (backend query 'sql') per fingerprint warehouse, berumur RESPONSE_CACHE_TTL
+AGGREGATE_CACHE = _env_flag('SUPERSTORE_AGGREGATE_CACHE', True)
+
+# Batas titik per figure scatter; di atasnya trace jadi WebGL (scattergl) dan titiknya
+# ditipiskan per sel grid di server (0 = tanpa batas)
+POINT_BUDGET = int(os.environ.get('SUPERSTORE_POINT_BUDGET', '5000'))
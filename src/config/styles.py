@@ -29,6 +29,7 @@ custom_style = {
         'border': 'none',
         'background': 'transparent',
         'width': '100%',
+        'box-sizing': 'border-box',
         'text-align': 'left'
     },
     'nav-link-active': {
@@ -3,7 +3,7 @@ from itertools import combinations
 
 def calculate_customer_lifetime_value(df):
     """Calculate Customer Lifetime Value"""
-    customer_metrics = df.groupby('customer_name').agg({
+    customer_metrics = df.groupby('customer_name', observed=True).agg({
         'sales': 'sum',
         'profit': 'sum',
         'order_key': 'nunique',
@@ -35,7 +35,7 @@ def seasonal_analysis(df):
         9: 'Fall', 10: 'Fall', 11: 'Fall'
     })
     
-    seasonal_data = df.groupby(['season', 'category']).agg({
+    seasonal_data = df.groupby(['season', 'category'], observed=True).agg({
         'sales': 'sum',
         'profit': 'sum',
         'quantity': 'sum'
@@ -45,7 +45,7 @@ def seasonal_analysis(df):
 
 def market_basket_analysis(df):
     """Simple market basket analysis"""
-    order_products = df.groupby('order_id')['product_name'].apply(list).reset_index()
+    order_products = df.groupby('order_id', observed=True)['product_name'].apply(list).reset_index()
     
     product_pairs = []
     for products in order_products['product_name']:
@@ -59,25 +59,25 @@ def market_basket_analysis(df):
 def export_dashboard_data(df):
     """Export processed data for external use"""
     export_data = {
-        'sales_summary': df.groupby(['year', 'month', 'category']).agg({
+        'sales_summary': df.groupby(['year', 'month', 'category'], observed=True).agg({
             'sales': 'sum',
             'profit': 'sum',
             'quantity': 'sum'
         }).reset_index(),
         
-        'customer_summary': df.groupby(['customer_name', 'segment']).agg({
+        'customer_summary': df.groupby(['customer_name', 'segment'], observed=True).agg({
             'sales': 'sum',
             'profit': 'sum',
             'order_key': 'nunique'
         }).reset_index(),
         
-        'product_performance': df.groupby(['product_name', 'category', 'sub_category']).agg({
+        'product_performance': df.groupby(['product_name', 'category', 'sub_category'], observed=True).agg({
             'sales': 'sum',
             'profit': 'sum',
             'quantity': 'sum'
         }).reset_index(),
         
-        'regional_analysis': df.groupby(['region', 'state', 'city']).agg({
+        'regional_analysis': df.groupby(['region', 'state', 'city'], observed=True).agg({
             'sales': 'sum',
             'profit': 'sum',
             'order_key': 'nunique'
@@ -0,0 +1,156 @@
+import logging
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Kolom dimensi yang diindeks (nilai klik filter); kolom yang tidak ada dilewati
+INDEX_COLUMNS = ['category', 'sub_category', 'sub-category', 'segment', 'region', 'state', 'city',
+                 'product_name', 'customer_name', 'year', 'month']
+
+CHUNK_BITS = 16
+CHUNK_SIZE = 1 << CHUNK_BITS
+# Container dengan lebih banyak baris dari ini disimpan sebagai bitset 8 KB
+ARRAY_LIMIT = 4096
+
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.int64)
+
+
+def _to_bitset(offsets):
+    bits = np.zeros(CHUNK_SIZE, dtype=bool)
+    bits[offsets] = True
+    return np.packbits(bits, bitorder='little')
+
+
+def _bitset_offsets(bitset):
+    return np.flatnonzero(np.unpackbits(bitset, bitorder='little')).astype(np.uint16)
+
+
+def _is_bitset(container):
+    return container.dtype == np.uint8
+
+
+def _cardinality(container):
+    return int(_POPCOUNT[container].sum()) if _is_bitset(container) else len(container)
+
+
+def _intersect(a, b):
+    if _is_bitset(a) and _is_bitset(b):
+        bits = a & b
+        return _bitset_offsets(bits) if _cardinality(bits) <= ARRAY_LIMIT else bits
+    if _is_bitset(a):
+        a, b = b, a
+    if _is_bitset(b):
+        return a[((b[a >> 3] >> (a & 7).astype(np.uint8)) & 1).astype(bool)]
+    return np.intersect1d(a, b, assume_unique=True)
+
+
+class RoaringBitmap:
+    """Set of row positions, split into 2^16-row chunks.
+
+    Each chunk is a sorted uint16 offset array while it holds at most
+    ARRAY_LIMIT rows and a packed bitset above that, as in Roaring bitmaps.
+    """
+
+    __slots__ = ('keys', 'containers')
+
+    def __init__(self, keys, containers):
+        self.keys = keys
+        self.containers = containers
+
+    @classmethod
+    def from_sorted(cls, positions):
+        positions = np.asarray(positions, dtype=np.int64)
+        chunks = positions >> CHUNK_BITS
+        starts = np.flatnonzero(np.r_[True, chunks[1:] != chunks[:-1]]) if len(positions) else np.zeros(0, np.int64)
+        ends = np.r_[starts[1:], len(positions)]
+        containers = []
+        for start, end in zip(starts, ends):
+            offsets = (positions[start:end] & (CHUNK_SIZE - 1)).astype(np.uint16)
+            containers.append(offsets if end - start <= ARRAY_LIMIT else _to_bitset(offsets))
+        return cls(chunks[starts], containers)
+
+    def __len__(self):
+        return sum(_cardinality(container) for container in self.containers)
+
+    def __and__(self, other):
+        _, mine, theirs = np.intersect1d(self.keys, other.keys, assume_unique=True, return_indices=True)
+        keys, containers = [], []
+        for i, j in zip(mine, theirs):
+            container = _intersect(self.containers[i], other.containers[j])
+            if _cardinality(container):
+                keys.append(self.keys[i])
+                containers.append(container)
+        return RoaringBitmap(np.array(keys, dtype=np.int64), containers)
+
+    def to_array(self):
+        """Sorted row positions"""
+        parts = [(int(key) << CHUNK_BITS) + (_bitset_offsets(container) if _is_bitset(container) else container).astype(np.int64)
+                 for key, container in zip(self.keys, self.containers)]
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+
+    def nbytes(self):
+        return self.keys.nbytes + sum(container.nbytes for container in self.containers)
+
+
+def union_all(bitmaps):
+    """Union of `bitmaps` (one pass over their positions)"""
+    bitmaps = list(bitmaps)
+    if len(bitmaps) == 1:
+        return bitmaps[0]
+    positions = [bitmap.to_array() for bitmap in bitmaps]
+    return RoaringBitmap.from_sorted(np.unique(np.concatenate(positions)) if positions else [])
+
+
+BitmapIndex = namedtuple('BitmapIndex', ['generation', 'rows', 'columns'])
+
+_index = None
+
+
+def _column_bitmaps(series):
+    codes, uniques = pd.factorize(series)
+    order = np.argsort(codes, kind='stable')
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    # Baris NULL (kode -1) ada di depan setelah argsort
+    bounds = np.r_[0, np.cumsum(counts)] + int((codes < 0).sum())
+    return {value: RoaringBitmap.from_sorted(order[bounds[i]:bounds[i + 1]])
+            for i, value in enumerate(uniques)}
+
+
+def build_index(df, generation=None):
+    """Row bitmap of every value of the INDEX_COLUMNS in `df`"""
+    started = time.perf_counter()
+    columns = {col: _column_bitmaps(df[col]) for col in INDEX_COLUMNS if col in df.columns}
+    size = sum(bitmap.nbytes() for bitmaps in columns.values() for bitmap in bitmaps.values())
+    logger.info(f"Bitmap index for generation {generation}: {len(columns)} columns, "
+                f"{size / 1024 ** 2:.1f} MB in {time.perf_counter() - started:.2f}s")
+    return BitmapIndex(generation, len(df), columns)
+
+
+def get_index(dataset):
+    """Bitmap index of `dataset`, built once per generation"""
+    global _index
+    index = _index
+    if index is None or index.generation != dataset.generation:
+        index = _index = build_index(dataset.df, dataset.generation)
+    return index
+
+
+def lookup(index, column, condition):
+    """Bitmap of the rows matching `condition` on `column`, or None if the index can't answer it"""
+    bitmaps = index.columns.get(column)
+    if bitmaps is None:
+        return None
+    empty = RoaringBitmap(np.zeros(0, dtype=np.int64), [])
+    if isinstance(condition, tuple):
+        if condition[0] != 'in':
+            return None
+        found = [bitmaps[value] for value in condition[1] if value in bitmaps]
+        return union_all(found) if found else empty
+    try:
+        return bitmaps.get(condition, empty)
+    except TypeError:  # nilai tidak hashable
+        return None
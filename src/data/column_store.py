@@ -0,0 +1,164 @@
+import json
+import logging
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+STORE_FORMAT = 1
+
+
+class UnsupportedColumn(Exception):
+    pass
+
+
+def _base_dir():
+    if settings.COLUMN_STORE_DIR:
+        return settings.COLUMN_STORE_DIR
+    # /dev/shm (tmpfs) kalau ada: halaman file dibagi semua proses tanpa I/O disk
+    if os.path.isdir('/dev/shm'):
+        return os.path.join('/dev/shm', 'superstore-columns')
+    return os.path.join('.cache', 'columns')
+
+
+def _store_dir(fingerprint):
+    return os.path.join(_base_dir(), fingerprint[:16])
+
+
+def _trusted(path):
+    # Direktori bersama (/dev/shm) hanya dipakai kalau dibuat oleh user yang sama
+    return os.stat(path).st_uid == os.getuid()
+
+
+def _categories(values):
+    categories = values.tolist()
+    if not all(isinstance(value, (str, int, float, bool)) for value in categories):
+        raise UnsupportedColumn(f"categories of type {values.dtype}")
+    return categories
+
+
+def _write_column(path, frame, col, i):
+    series = frame[col]
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        np.save(os.path.join(path, f"{i}.npy"), series.cat.codes.to_numpy())
+        return {'name': col, 'kind': 'categorical', 'file': f"{i}.npy",
+                'categories': _categories(dtype.categories), 'ordered': bool(dtype.ordered)}
+    if isinstance(dtype, np.dtype) and dtype.kind in 'biufM':
+        np.save(os.path.join(path, f"{i}.npy"), series.to_numpy())
+        return {'name': col, 'kind': 'array', 'file': f"{i}.npy"}
+    if isinstance(dtype, np.dtype) and dtype.kind == 'O':
+        # Kolom object (mis. tanggal): disimpan dictionary-encoded, didekode per proses
+        codes, uniques = pd.factorize(series)
+        np.save(os.path.join(path, f"{i}.npy"), codes.astype(np.int32))
+        return {'name': col, 'kind': 'object', 'file': f"{i}.npy", 'categories': _categories(uniques)}
+    raise UnsupportedColumn(f"{col} ({dtype})")
+
+
+def write_store(fingerprint, frames):
+    """Write `frames` as one .npy file per column under the fingerprint's directory.
+
+    The directory is renamed into place when complete, so readers never see a
+    partial store. Returns False when the store can't be written (e.g. full
+    tmpfs or an unsupported dtype).
+    """
+    base = _base_dir()
+    final = _store_dir(fingerprint)
+    tmp = os.path.join(base, f".tmp-{fingerprint[:16]}-{os.getpid()}")
+    try:
+        os.makedirs(base, mode=0o700, exist_ok=True)
+        if not _trusted(base):
+            raise PermissionError(f"{base} is owned by another user")
+        os.makedirs(tmp, mode=0o700)
+        manifest = {'format': STORE_FORMAT, 'fingerprint': fingerprint, 'frames': {}}
+        for key, frame in frames.items():
+            if frame is None:
+                continue
+            if not isinstance(frame.index, pd.RangeIndex) or frame.index.start != 0 or frame.index.step != 1:
+                raise UnsupportedColumn(f"{key} index")
+            columns = [_write_column(tmp, frame, col, f"{key}.{i}") for i, col in enumerate(frame.columns)]
+            manifest['frames'][key] = {'rows': len(frame), 'columns': columns}
+        with open(os.path.join(tmp, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f)
+        os.rename(tmp, final)
+    except FileExistsError:
+        pass  # proses lain sudah menulis store yang sama
+    except OSError as e:
+        if not os.path.isdir(final):
+            logger.warning(f"Could not write column store to {final}: {e}")
+            return False
+    except (UnsupportedColumn, ValueError, TypeError) as e:
+        logger.warning(f"Dataset can't be stored as mapped columns: {e}")
+        return False
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    _remove_old_stores(keep=os.path.basename(final))
+    logger.info(f"Column store {fingerprint[:12]} published at {final}")
+    return True
+
+
+def _read_column(path, meta, rows):
+    values = np.load(os.path.join(path, meta['file']), mmap_mode='r', allow_pickle=False)
+    if len(values) != rows:
+        raise ValueError(f"{meta['name']}: expected {rows} rows, found {len(values)}")
+    if meta['kind'] == 'categorical':
+        dtype = pd.CategoricalDtype(meta['categories'], ordered=meta['ordered'])
+        return pd.Categorical.from_codes(values, dtype=dtype)
+    if meta['kind'] == 'object':
+        uniques = np.array(meta['categories'] + [None], dtype=object)
+        return uniques[values]  # kode -1 (NULL) jatuh ke None di akhir
+    return values
+
+
+def attach_store(fingerprint):
+    """Frames of the store for `fingerprint`, read-only and memory-mapped, or None.
+
+    Numeric and categorical columns are views of the mapped files: every
+    process attached to the same store shares their pages.
+    """
+    if not settings.COLUMN_STORE or fingerprint is None:
+        return None
+    path = _store_dir(fingerprint)
+    try:
+        if not _trusted(path):
+            return None
+        with open(os.path.join(path, 'manifest.json')) as f:
+            manifest = json.load(f)
+        if manifest.get('format') != STORE_FORMAT or manifest.get('fingerprint') != fingerprint:
+            return None
+        frames = {'fact_sales': None}
+        for key, meta in manifest['frames'].items():
+            # copy=False: satu block per kolom, tanpa konsolidasi (yang akan menyalin ke heap)
+            frames[key] = pd.DataFrame({col['name']: _read_column(path, col, meta['rows']) for col in meta['columns']},
+                                       copy=False)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Column store at {path} is unreadable, ignoring it: {e}")
+        return None
+    return frames
+
+
+def share(fingerprint, frames):
+    """`frames` backed by the shared column store: attached if another process
+    already published it, otherwise written first. Falls back to `frames`."""
+    if not settings.COLUMN_STORE or fingerprint is None:
+        return frames
+    attached = attach_store(fingerprint)
+    if attached is None and write_store(fingerprint, frames):
+        attached = attach_store(fingerprint)
+    return attached if attached is not None else frames
+
+
+def _remove_old_stores(keep):
+    # Proses yang masih memetakan store lama tetap bisa membacanya sampai dilepas
+    base = _base_dir()
+    for entry in os.listdir(base):
+        full = os.path.join(base, entry)
+        if entry != keep and not entry.startswith('.tmp-') and os.path.isdir(full):
+            shutil.rmtree(full, ignore_errors=True)
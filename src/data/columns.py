@@ -0,0 +1,26 @@
+from src.data.cube import CUBE_DISTINCT, CUBE_GRAIN, CUBE_MEASURES
+from src.data.filters import BANDS, COHORTS
+
+# Kolom hasil join yang dibaca setiap halaman. Extractor hanya mengambil kolom
+# ini, kolom cube/band/cohort (lihat dashboard_columns) dan surrogate key;
+# perbarui daftar ini saat halaman memakai kolom baru.
+PAGE_COLUMNS = {
+    'overview': ['year', 'month', 'sales', 'profit', 'quantity', 'discount',
+                 'category', 'product_name', 'segment', 'order_key'],
+    'region': ['state', 'city', 'region', 'lat', 'lng', 'sales', 'profit', 'order_key'],
+    'customer': ['segment', 'customer_name', 'customer_id', 'order_key',
+                 'sales', 'profit', 'year', 'month'],
+    # Halaman profit mendeteksi nama kolom secara dinamis; ETL menulis 'sub-category'
+    'profit': ['category', 'sub-category', 'sub_category', 'discount', 'sales', 'profit',
+               'product_name', 'ship_mode'],
+}
+
+
+def dashboard_columns():
+    """Union of the columns every consumer of the merged dataset reads: the
+    pages, the cube (grain, measures, distinct counts), bands and cohorts"""
+    columns = {col for page_columns in PAGE_COLUMNS.values() for col in page_columns}
+    columns.update(CUBE_GRAIN, CUBE_MEASURES, CUBE_DISTINCT)
+    columns.update(band.column for band in BANDS.values())
+    columns.update(col for cohort in COHORTS.values() for col in (cohort.key, cohort.column))
+    return sorted(columns)
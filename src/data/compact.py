@@ -0,0 +1,77 @@
+import pandas as pd
+from pandas.api.types import (infer_dtype, is_bool_dtype, is_float_dtype, is_integer_dtype, is_object_dtype,
+                              is_string_dtype, union_categoricals)
+
+# Measures stored as float32. `discount` stays float64: the profit page buckets it
+# at exact decimal edges (0.1, 0.2, 0.3) and float32(0.1) > 0.1.
+FLOAT32_COLUMNS = ['sales', 'profit', 'shipping_cost', 'lat', 'lng']
+
+
+def is_key_column(column):
+    return column.endswith('_key')
+
+
+def compact_frame(df):
+    """Dictionary-encode text columns and downcast numerics.
+
+    Surrogate keys become int32, other integers the smallest integer type that
+    fits, FLOAT32_COLUMNS float32 and every text column a categorical. Columns
+    that are already compact are left untouched, so this is safe to re-apply.
+    """
+    columns = {}
+    for col in df.columns:
+        series = df[col]
+        dtype = series.dtype
+        if isinstance(dtype, pd.CategoricalDtype) or is_bool_dtype(dtype):
+            continue
+        if is_integer_dtype(dtype):
+            if is_key_column(col):
+                if dtype != 'int32':
+                    columns[col] = series.astype('int32')
+            else:
+                downcast = pd.to_numeric(series, downcast='integer')
+                if downcast.dtype != dtype:
+                    columns[col] = downcast
+        elif is_float_dtype(dtype):
+            if col in FLOAT32_COLUMNS and dtype != 'float32':
+                columns[col] = series.astype('float32')
+            elif is_key_column(col) and series.notna().all():
+                columns[col] = series.astype('int32')
+        elif is_object_dtype(dtype) or is_string_dtype(dtype):
+            if infer_dtype(series, skipna=True) in ('string', 'empty'):
+                columns[col] = series.astype('category')
+    if not columns:
+        return df
+    return df.assign(**columns)
+
+
+def concat_frames(base, new):
+    """Append `new` rows to `base` without decoding categoricals.
+
+    Category sets are unioned (kept sorted so groupby order does not change)
+    and every other column is concatenated with the usual pandas upcasting.
+    Columns of `base` must all exist in `new`.
+    """
+    columns = {}
+    for col in base.columns:
+        if isinstance(base[col].dtype, pd.CategoricalDtype):
+            addition = new[col]
+            if not isinstance(addition.dtype, pd.CategoricalDtype):
+                addition = addition.astype('category')
+            columns[col] = pd.Series(
+                union_categoricals([base[col].array, addition.array], sort_categories=True), name=col)
+        else:
+            columns[col] = pd.concat([base[col], new[col]], ignore_index=True)
+    return pd.DataFrame(columns, copy=False)
+
+
+def memory_report(df):
+    """Per-column memory usage (deep), largest first"""
+    usage = df.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({
+        'column': usage.index,
+        'dtype': [str(df[col].dtype) for col in usage.index],
+        'bytes': usage.values,
+    })
+    report['mb'] = (report['bytes'] / 1024 ** 2).round(2)
+    return report.sort_values('bytes', ascending=False).reset_index(drop=True)
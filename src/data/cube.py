@@ -0,0 +1,154 @@
+import logging
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from src.config import settings
+from src.data.filters import BANDS, filter_frame, frame_column
+from src.data.sketch import build_sketch, count_distinct
+
+logger = logging.getLogger(__name__)
+
+# Grain cube; kolom yang tidak ada di dataset dilewati (ETL menulis 'sub-category')
+CUBE_GRAIN = ['year', 'month', 'category', 'sub_category', 'sub-category', 'segment',
+              'region', 'state', 'ship_mode']
+CUBE_MEASURES = ['sales', 'profit', 'quantity', 'discount', 'shipping_cost']
+# Kolom dengan sketch distinct-count per cell (nunique)
+CUBE_DISTINCT = ['order_key', 'customer_id']
+# Diskon disimpan sebagai nilai mentah selama jumlah nilainya kecil (filter rentang
+# diskon di halaman profit butuh nilai mentah); kalau tidak, hanya band-nya
+MAX_RAW_DISCOUNT_VALUES = 64
+
+Cube = namedtuple('Cube', ['generation', 'frame', 'grain', 'measures', 'distinct'])
+
+_cube = None
+
+
+def _grain(df):
+    grain = [col for col in CUBE_GRAIN if col in df.columns]
+    band = BANDS['discount_range']
+    if band.column in df.columns:
+        if df[band.column].nunique() <= MAX_RAW_DISCOUNT_VALUES:
+            grain.append(band.column)
+        else:
+            grain.append('discount_range')
+    return grain
+
+
+def build_cube(df, generation=None):
+    """Rollup of `df` at CUBE_GRAIN: per-measure sums and non-null counts, plus a
+    distinct-count sketch per cell for CUBE_DISTINCT (SUPERSTORE_DISTINCT_SKETCH)"""
+    started = time.perf_counter()
+    grain = _grain(df)
+    measures = [col for col in CUBE_MEASURES
+                if col in df.columns and pd.api.types.is_numeric_dtype(df[col])]
+    # Jumlah diakumulasi dalam 64-bit, bukan float32/int32 storage
+    data = {f"{col}__sum": df[col].astype(np.int64 if pd.api.types.is_integer_dtype(df[col]) else np.float64)
+            for col in measures}
+    data.update({f"{col}__count": df[col].notna().astype(np.int64) for col in measures})
+    keys = [frame_column(df, col) for col in grain]
+    # dropna=False: baris dengan key kosong (mis. diskon 0 di luar band) tetap masuk total
+    grouped = pd.DataFrame(data, index=df.index).groupby(keys, observed=True, dropna=False, sort=False)
+    frame = grouped.sum().reset_index()
+    distinct = {}
+    if settings.DISTINCT_SKETCH != 'off':
+        # ngroup() memberi nomor cell yang sama dengan urutan baris hasil sum()
+        cells = grouped.ngroup().to_numpy()
+        distinct = {col: build_sketch(cells, df[col], settings.DISTINCT_SKETCH, settings.HLL_PRECISION)
+                    for col in CUBE_DISTINCT if col in df.columns}
+    logger.info(f"Cube for generation {generation}: {len(frame)} cells from {len(df)} rows "
+                f"in {time.perf_counter() - started:.2f}s")
+    return Cube(generation, frame, grain, measures, distinct)
+
+
+def get_cube(dataset):
+    """Cube of `dataset`, built once per generation"""
+    global _cube
+    cube = _cube
+    if cube is None or cube.generation != dataset.generation:
+        cube = _cube = build_cube(dataset.df, dataset.generation)
+    return cube
+
+
+def _covers(cube, name):
+    if name in cube.grain:
+        return True
+    band = BANDS.get(name)
+    return band is not None and band.column in cube.grain
+
+
+def _measure_columns(cube, col, func):
+    if func == 'nunique':
+        return [] if col in cube.distinct else None
+    if col not in cube.measures:
+        return None
+    if func in ('sum', 'count'):
+        return [f"{col}__{func}"]
+    if func == 'mean':
+        return [f"{col}__sum", f"{col}__count"]
+    return None
+
+
+def _plan(cube, measures, by, filters):
+    # Kolom cube per measure, atau None kalau query butuh data level baris
+    if not all(_covers(cube, name) for name in by + list(filters)):
+        return None
+    needed = {}
+    for name, (col, func) in measures.items():
+        columns = _measure_columns(cube, col, func)
+        if columns is None:
+            return None
+        needed[name] = (columns, func)
+    return needed
+
+
+def _rollup(cube, frame, measures, needed, by):
+    source = sorted({c for columns, _ in needed.values() for c in columns})
+    if by:
+        keys = [frame_column(frame, name) for name in by]
+        totals = frame.groupby(keys, observed=True)[source].sum()
+    else:
+        totals = frame[source].sum().to_frame().T
+
+    result = pd.DataFrame(index=totals.index)
+    if any(func == 'nunique' for _, func in needed.values()):
+        # Nomor grup per cell, urutannya sama dengan baris totals; cell dengan key NULL
+        # (mis. discount_range untuk diskon 0) tidak masuk grup mana pun (-1)
+        cell_groups = np.full(len(cube.frame), -1, dtype=np.int64)
+        cell_groups[frame.index.to_numpy()] = (frame.groupby(keys, observed=True).ngroup().fillna(-1)
+                                               .to_numpy(dtype=np.int64) if by else 0)
+    for name, (columns, func) in needed.items():
+        if func == 'nunique':
+            result[name] = count_distinct(cube.distinct[measures[name][0]], cell_groups, len(totals))
+        elif func == 'mean':
+            result[name] = totals[columns[0]] / totals[columns[1]].replace(0, np.nan)
+        else:
+            result[name] = totals[columns[0]]
+    return result.reset_index(drop=not by)
+
+
+def answer(cube, measures, by=None, filters=None):
+    """`measures` grouped by `by`, from the cube; None when the query needs row-level data.
+
+    Takes the same arguments as query.aggregate() and returns groups sorted by key.
+    Sum, count and mean of CUBE_MEASURES roll up from the cube, and so does
+    nunique of CUBE_DISTINCT by merging the per-cell sketches.
+    """
+    return answer_many(cube, [(measures, by)], filters)[0]
+
+
+def answer_many(cube, queries, filters=None):
+    """answer() for several (measures, by) queries over the same `filters`.
+
+    The cube is filtered once for all of them. Returns one result per query,
+    None for the queries that need row-level data.
+    """
+    filters = filters or {}
+    plans = [_plan(cube, measures, list(by or []), filters) for measures, by in queries]
+    if all(needed is None for needed in plans):
+        return plans
+    frame = filter_frame(cube.frame, filters)
+    return [None if needed is None else _rollup(cube, frame, measures, needed, list(by or []))
+            for (measures, by), needed in zip(queries, plans)]
@@ -1,60 +1,304 @@
+import itertools
+import logging
+import threading
+import time
+from collections import namedtuple
+
 import pandas as pd
+from src.config import settings
 from src.config.database import get_db_connection
+from src.data import column_store, extract, snapshot
+from src.data.compact import compact_frame, concat_frames, memory_report
+from src.data.star import STAR_DIMENSIONS, join_star
+
+logger = logging.getLogger(__name__)
+
+# Satu generasi dataset. Generasi berikutnya dibangun terpisah lalu dipublikasikan
+# dengan satu assignment ke _dataset, jadi pembaca tidak pernah melihat state setengah jadi.
+Dataset = namedtuple('Dataset', [
+    'df', 'dim_customer', 'dim_product', 'dim_order', 'dim_time', 'dim_region', 'fact_sales',
+    'fingerprint', 'structure', 'generation',
+])
 
 # Global variables
-_df = None
-_dim_customer = None
-_dim_product = None
-_dim_order = None
-_dim_time = None
-_dim_region = None
-_fact_sales = None
+_dataset = None
+_generations = itertools.count(1)
+# Hanya satu load penuh berjalan; pemanggil lain menunggu hasilnya
+_load_lock = threading.Lock()
+# Setelah load gagal (yang disajikan hanya fallback), load dicoba lagi mulai _retry_at (backoff eksponensial)
+_failures = 0
+_retry_at = None
+
+def _load_failed():
+    global _failures, _retry_at
+    _failures += 1
+    delay = min(settings.LOAD_RETRY_SECONDS * 2 ** (_failures - 1), settings.LOAD_RETRY_MAX_SECONDS)
+    _retry_at = time.monotonic() + delay
+    logger.warning(f"Dataset load failed ({_failures}x), retrying in {delay:.0f}s")
+
+def _load_succeeded():
+    global _failures, _retry_at
+    _failures, _retry_at = 0, None
+
+def _compact(frames):
+    """Compact storage mode: every frame compacted, no separate fact_sales copy"""
+    if not settings.COMPACT_STORAGE:
+        return frames
+    compacted = {key: compact_frame(frame) for key, frame in frames.items() if frame is not None}
+    compacted['fact_sales'] = None
+    return compacted
+
+def _publish(frames, fingerprint=None, structure=None):
+    """Swap in a new dataset generation built from `frames`"""
+    global _dataset
+    frames = _compact(frames)
+    # Kolom dipetakan dari store bersama, jadi worker lain tidak menyimpan salinan sendiri
+    frames = column_store.share(fingerprint, frames)
+    dataset = Dataset(
+        df=frames['merged'],
+        dim_customer=frames['dim_customer'],
+        dim_product=frames['dim_product'],
+        dim_order=frames['dim_order'],
+        dim_time=frames['dim_time'],
+        dim_region=frames['dim_region'],
+        fact_sales=frames['fact_sales'],
+        fingerprint=fingerprint,
+        structure=structure,
+        generation=next(_generations),
+    )
+    _dataset = dataset
+    logger.info(f"Published dataset generation {dataset.generation}: {len(dataset.df)} rows, "
+                f"{dataset.df.memory_usage(deep=True).sum() / 1024 ** 2:.1f} MB")
+    return dataset
+
+def _dimension_frames(dataset):
+    return {
+        'dim_customer': dataset.dim_customer,
+        'dim_product': dataset.dim_product,
+        'dim_order': dataset.dim_order,
+        'dim_time': dataset.dim_time,
+        'dim_region': dataset.dim_region,
+    }
+
+def _load_from_warehouse(engine):
+    projections = extract.plan_projections(extract.read_table_columns(engine))
+    tables = extract.read_tables(engine, projections)
+    dim_customer = tables['dim_customer']
+    dim_product = tables['dim_product']
+    dim_order = tables['dim_order']
+    dim_time = tables['dim_time']
+    dim_region = tables['dim_region']
+    fact_sales = tables['fact_sales']
+    del tables
+
+    logger.info(f"dim_customer: {len(dim_customer)} rows")
+    logger.info(f"dim_product: {len(dim_product)} rows")
+    logger.info(f"dim_order: {len(dim_order)} rows")
+    logger.info(f"dim_time: {len(dim_time)} rows")
+    logger.info(f"dim_region: {len(dim_region)} rows")
+    logger.info(f"fact_sales: {len(fact_sales)} rows")
+
+    dims = {
+        'dim_customer': dim_customer,
+        'dim_product': dim_product,
+        'dim_order': dim_order,
+        'dim_time': dim_time,
+        'dim_region': dim_region,
+    }
+    try:
+        df = join_star(fact_sales, dims)
+    except ValueError as e:
+        # Surrogate key tidak unik: kembali ke rantai merge
+        logger.warning(f"Gather join unavailable ({str(e)}), falling back to merge")
+        df = (fact_sales
+              .merge(dim_customer, on='customer_key', how='left')
+              .merge(dim_product, on='product_key', how='left')
+              .merge(dim_order, on='order_key', how='left')
+              .merge(dim_time, on='time_key', how='left')
+              .merge(dim_region, on='region_key', how='left'))
+
+    logger.info(f"Merged df: {len(df)} rows")
+    logger.debug(f"Columns in df: {df.columns.tolist()}")
+
+    if 'order_date' in df.columns:
+        df['order_date'] = pd.to_datetime(df['order_date'])
+
+    return {
+        'merged': df,
+        'dim_customer': dim_customer,
+        'dim_product': dim_product,
+        'dim_order': dim_order,
+        'dim_time': dim_time,
+        'dim_region': dim_region,
+        'fact_sales': fact_sales,
+    }
+
+def _snapshot_frames(dataset):
+    return {'merged': dataset.df, **_dimension_frames(dataset)}
+
+def _empty_frames():
+    frames = {table: pd.DataFrame() for table, _ in STAR_DIMENSIONS}
+    frames['merged'] = pd.DataFrame()
+    frames['fact_sales'] = pd.DataFrame()
+    return frames
+
+def _build_dataset():
+    """Full load (snapshot or warehouse) published as a new generation"""
+    engine = get_db_connection()
+    fingerprint = structure = None
+    try:
+        fingerprint, structure = snapshot.compute_fingerprints(engine, salt=extract.projection_spec())
+    except Exception as e:
+        logger.warning(f"Could not read warehouse version: {str(e)}")
+
+    # Worker lain sudah memublikasikan kolomnya: cukup dipetakan
+    shared = column_store.attach_store(fingerprint)
+    if shared is not None:
+        logger.info(f"Attached shared column store: {len(shared['merged'])} rows")
+        _load_succeeded()
+        return _publish(shared, fingerprint, structure)
+
+    # Snapshot lokal dipakai selama fingerprint warehouse tidak berubah
+    cached = snapshot.read_snapshot(fingerprint) if fingerprint else None
+    if cached is not None:
+        logger.info(f"Loaded df from snapshot: {len(cached['merged'])} rows")
+        _load_succeeded()
+        return _publish(cached, fingerprint, structure)
+
+    try:
+        frames = _load_from_warehouse(engine)
+        fact_columns = frames['fact_sales'].columns.tolist()
+        dataset = _publish(frames, fingerprint, structure)
+        del frames
+        _load_succeeded()
+        snapshot.write_snapshot(fingerprint, _snapshot_frames(dataset), fact_columns)
+        return dataset
+    except Exception as e:
+        logger.error(f"Error loading data: {str(e)}")
+        current = _dataset
+        if current is not None and not current.df.empty:
+            logger.warning(f"Keeping dataset generation {current.generation}")
+            if _failures:
+                _load_failed()
+            return current
+        _load_failed()
+        stale = snapshot.read_snapshot()
+        if stale is not None:
+            logger.warning(f"Serving stale snapshot: {len(stale['merged'])} rows")
+            return _publish(stale)
+        return _publish(_empty_frames())
 
 def load_data():
-    global _df, _dim_customer, _dim_product, _dim_order, _dim_time, _dim_region, _fact_sales
-    if _df is None:  # Load only if not already loaded
-        engine = get_db_connection()
+    get_dataset()
+    return get_data()
+
+def _read_new_rows(engine, projections, table, column, watermark):
+    return extract.read_table(engine, table, projections[table],
+                              where=f"{column} > :watermark", params={'watermark': watermark})
+
+def reload_data():
+    """Full reload; the current generation keeps serving until the new one is published"""
+    with _load_lock:
+        return _build_dataset()
+
+def refresh_data():
+    """Incremental refresh: append fact rows above the high-water mark.
+
+    Only fact_sales rows whose REFRESH_WATERMARK_COLUMN is above the largest
+    value already loaded are fetched, plus dimension members whose surrogate key
+    is above the largest known key. Fact rows and dimension members are treated
+    as append-only; updates and deletes are picked up by reload_data(), which
+    runs automatically when a table was recreated or its schema changed.
+    The result is published as a new generation. Returns the number of fact
+    rows appended.
+    """
+    # Sama dengan load penuh: generasi yang sedang dibaca tidak bisa diganti di tengah refresh
+    with _load_lock:
+        return _refresh_dataset()
+
+def _refresh_dataset():
+    current = _dataset
+    if current is None or current.df.empty or current.structure is None:
+        _build_dataset()
+        return 0
+
+    engine = get_db_connection()
+    fingerprint, structure = snapshot.compute_fingerprints(engine, salt=extract.projection_spec())
+    if fingerprint == current.fingerprint:
+        return 0
+    if structure != current.structure:
+        logger.info("Warehouse schema or tables changed, running a full reload")
+        _build_dataset()
+        return 0
+
+    column = settings.REFRESH_WATERMARK_COLUMN
+    watermark = int(current.df[column].max())
+    # Fakta dibaca lebih dulu: dimensi yang dibaca sesudahnya pasti memuat
+    # semua member yang dirujuk fakta baru (ETL mengisi dimensi sebelum fakta)
+    projections = extract.plan_projections(extract.read_table_columns(engine))
+    new_facts = _read_new_rows(engine, projections, 'fact_sales', column, watermark)
+
+    dims = _dimension_frames(current)
+    for table, key in STAR_DIMENSIONS:
+        new_members = _read_new_rows(engine, projections, table, key, int(dims[table][key].max()))
+        if len(new_members):
+            logger.info(f"{table}: {len(new_members)} new rows")
+            dims[table] = concat_frames(dims[table], new_members)
+
+    new_rows = join_star(new_facts, dims)
+    if list(new_rows.columns) != list(current.df.columns):
+        logger.warning("Fetched rows do not match the loaded columns, running a full reload")
+        _build_dataset()
+        return 0
+
+    dataset = _publish({
+        'merged': concat_frames(current.df, new_rows) if len(new_rows) else current.df,
+        'fact_sales': concat_frames(current.fact_sales, new_facts) if current.fact_sales is not None else None,
+        **dims,
+    }, fingerprint, structure)
+    logger.info(f"Refresh appended {len(new_facts)} rows above {column} {watermark}")
+    snapshot.write_snapshot(fingerprint, _snapshot_frames(dataset), new_facts.columns.tolist())
+    return len(new_facts)
+
+def peek_dataset():
+    """Current dataset generation without triggering a load (None before the first load)"""
+    return _dataset
+
+def seconds_until_retry():
+    """Seconds until a failed load is retried (0 = due now), None when the last load succeeded"""
+    retry_at = _retry_at
+    return None if retry_at is None else max(retry_at - time.monotonic(), 0)
+
+def get_dataset():
+    """Current dataset generation.
+
+    The first call loads it; concurrent callers wait for that one load instead
+    of starting their own. While only a fallback (stale snapshot or empty
+    frames) is being served, the load is retried with exponential backoff by
+    whichever caller comes after the retry time; the others keep getting the
+    fallback meanwhile.
+    """
+    dataset = _dataset
+    if dataset is None:
+        with _load_lock:
+            if _dataset is None:
+                _build_dataset()
+        return _dataset
+    if _retry_at is not None and time.monotonic() >= _retry_at and _load_lock.acquire(blocking=False):
         try:
-            _dim_customer = pd.read_sql("SELECT * FROM dim_customer", engine)
-            _dim_product = pd.read_sql("SELECT * FROM dim_product", engine)
-            _dim_order = pd.read_sql("SELECT * FROM dim_order", engine)
-            _dim_time = pd.read_sql("SELECT * FROM dim_time", engine)
-            _dim_region = pd.read_sql("SELECT * FROM dim_region", engine)
-            _fact_sales = pd.read_sql("SELECT * FROM fact_sales", engine)
-            
-            print(f"dim_customer: {len(_dim_customer)} rows")
-            print(f"dim_product: {len(_dim_product)} rows")
-            print(f"dim_order: {len(_dim_order)} rows")
-            print(f"dim_time: {len(_dim_time)} rows")
-            print(f"dim_region: {len(_dim_region)} rows")
-            print(f"fact_sales: {len(_fact_sales)} rows")
-            
-            _df = (_fact_sales
-                   .merge(_dim_customer, on='customer_key', how='left')
-                   .merge(_dim_product, on='product_key', how='left')
-                   .merge(_dim_order, on='order_key', how='left')
-                   .merge(_dim_time, on='time_key', how='left')
-                   .merge(_dim_region, on='region_key', how='left'))
-            
-            print(f"Merged df: {len(_df)} rows")
-            print("Columns in df:", _df.columns.tolist())
-            
-            if 'order_date' in _df.columns:
-                _df['order_date'] = pd.to_datetime(_df['order_date'])
-        except Exception as e:
-            print(f"Error loading data: {str(e)}")
-            _df = pd.DataFrame()
-            _dim_customer = pd.DataFrame()
-            _dim_product = pd.DataFrame()
-            _dim_order = pd.DataFrame()
-            _dim_time = pd.DataFrame()
-            _dim_region = pd.DataFrame()
-            _fact_sales = pd.DataFrame()
-    
-    return _df, _dim_customer, _dim_product, _dim_order, _dim_time, _dim_region, _fact_sales
+            if _retry_at is not None and time.monotonic() >= _retry_at:
+                logger.info("Retrying dataset load")
+                _build_dataset()
+        finally:
+            _load_lock.release()
+        return _dataset
+    return dataset
 
 def get_data():
     """Getter function to access loaded data"""
-    if _df is None:
-        load_data()
-    return _df, _dim_customer, _dim_product, _dim_order, _dim_time, _dim_region, _fact_sales
\ No newline at end of file
+    return tuple(get_dataset()[:7])
+
+def get_memory_report():
+    """Per-column memory usage of the merged dataset"""
+    df, _, _, _, _, _, _ = get_data()
+    return memory_report(df)
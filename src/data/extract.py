@@ -0,0 +1,166 @@
+import io
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from sqlalchemy import text
+
+from src.config import settings
+from src.data.columns import dashboard_columns
+from src.data.compact import compact_frame
+from src.data.snapshot import WAREHOUSE_TABLES
+from src.data.star import STAR_DIMENSIONS
+from src.data.stream import read_table_streamed
+
+logger = logging.getLogger(__name__)
+
+_COLUMNS_QUERY = text("""
+    SELECT table_name, column_name
+    FROM information_schema.columns
+    WHERE table_schema = current_schema() AND table_name = ANY(:tables)
+    ORDER BY table_name, ordinal_position
+""")
+
+
+def read_table_columns(engine):
+    """Column names of every warehouse table, in table order"""
+    columns = {table: [] for table in WAREHOUSE_TABLES}
+    with engine.connect() as conn:
+        for table, column in conn.execute(_COLUMNS_QUERY, {'tables': WAREHOUSE_TABLES}):
+            columns[table].append(column)
+    return columns
+
+
+def projection_spec():
+    """What the extractor selects; part of the snapshot fingerprint"""
+    if settings.EXTRACT_PROJECTION == 'all':
+        return 'all'
+    keys = [key for _, key in STAR_DIMENSIONS] + [settings.REFRESH_WATERMARK_COLUMN]
+    return sorted(set(dashboard_columns()) | set(keys))
+
+
+def plan_projections(table_columns):
+    """Columns to select per table; None selects every column"""
+    spec = projection_spec()
+    if spec == 'all':
+        return {table: None for table in WAREHOUSE_TABLES}
+    wanted = set(spec)
+    return {table: [col for col in columns if col in wanted] or None
+            for table, columns in table_columns.items()}
+
+
+def quote_identifier(column):
+    return '"' + column.replace('"', '""') + '"'
+
+
+def select_statement(table, columns=None, where=None):
+    select_list = '*' if columns is None else ', '.join(quote_identifier(col) for col in columns)
+    statement = f"SELECT {select_list} FROM {table}"
+    if where:
+        statement += f" WHERE {where}"
+    return statement
+
+
+# OID tipe PostgreSQL -> dtype pandas untuk parsing hasil COPY
+_PG_TYPES = {
+    16: 'bool',
+    20: 'int64', 21: 'int64', 23: 'int64',
+    700: 'float64', 701: 'float64', 1700: 'float64',
+    25: 'str', 1042: 'str', 1043: 'str',
+    1082: 'datetime', 1114: 'datetime', 1184: 'datetime',
+}
+
+
+def _pyarrow_available():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def read_table_copy(engine, table, columns=None):
+    """Read a whole table with COPY ... TO STDOUT (CSV) and parse it into typed columns.
+
+    Skips the per-row Python tuples pd.read_sql builds. Needs psycopg2; integer
+    columns holding NULLs are parsed as float64, like read_sql does.
+    """
+    statement = select_statement(table, columns)
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(f"{statement} LIMIT 0")
+        names = [col.name for col in cursor.description]
+        types = {col.name: _PG_TYPES.get(col.type_code, 'str') for col in cursor.description}
+        buffer = io.BytesIO()
+        # NULL sebagai \N: string kosong (dan 'NA', 'null', ...) tetap string, seperti read_sql
+        cursor.copy_expert(f"COPY ({statement}) TO STDOUT WITH (FORMAT csv, NULL '\\N')", buffer)
+        cursor.close()
+        connection.commit()
+    finally:
+        connection.close()
+    logger.info(f"{table}: COPY transferred {buffer.tell() / 1024 ** 2:.1f} MB")
+
+    buffer.seek(0)
+    pyarrow = _pyarrow_available()
+    dtypes = {name: dtype for name, dtype in types.items() if dtype in ('float64', 'str')}
+    if pyarrow:
+        dtypes = {name: 'string[pyarrow]' if dtype == 'str' else dtype for name, dtype in dtypes.items()}
+    frame = pd.read_csv(
+        buffer,
+        names=names,
+        header=None,
+        dtype=dtypes,
+        true_values=['t'],
+        false_values=['f'],
+        keep_default_na=False,
+        na_values=['\\N'],
+        engine='pyarrow' if pyarrow else 'c',
+    )
+    for name, dtype in types.items():
+        # parse_dates engine pyarrow mengubah kolom date jadi string ('None' untuk NULL)
+        if dtype == 'datetime':
+            frame[name] = pd.to_datetime(frame[name])
+        # pyarrow tidak menerapkan na_values pada kolom yang dipaksa bertipe string
+        elif dtype == 'str' and pyarrow:
+            frame[name] = frame[name].mask(frame[name] == '\\N')
+    return frame
+
+
+def read_table(engine, table, columns=None, where=None, params=None):
+    """Read one table (optionally projected/filtered), compacted when configured.
+
+    With SUPERSTORE_FACT_ENGINE=copy a full fact_sales read goes through COPY,
+    falling back to read_sql if that fails. Otherwise SUPERSTORE_STREAM_CHUNKSIZE
+    streams it through a server-side cursor into compact columns.
+    """
+    frame = None
+    if table == 'fact_sales' and where is None and settings.FACT_EXTRACT_ENGINE == 'copy':
+        try:
+            frame = read_table_copy(engine, table, columns)
+        except Exception as e:
+            logger.warning(f"COPY extraction of {table} failed, using read_sql: {e}")
+    elif table == 'fact_sales' and where is None and settings.EXTRACT_CHUNKSIZE > 0:
+        frame = read_table_streamed(engine, select_statement(table, columns), settings.EXTRACT_CHUNKSIZE)
+    if frame is None:
+        frame = pd.read_sql(text(select_statement(table, columns, where)), engine, params=params)
+    return compact_frame(frame) if settings.COMPACT_STORAGE else frame
+
+
+def read_tables(engine, projections):
+    """Read every table in `projections` concurrently over the engine's pool"""
+    started = time.time()
+
+    def timed_read(table):
+        table_started = time.time()
+        frame = read_table(engine, table, projections[table])
+        logger.info(f"{table}: {len(frame)} rows, {len(frame.columns)} columns "
+                    f"in {time.time() - table_started:.2f}s")
+        return frame
+
+    with ThreadPoolExecutor(max_workers=settings.EXTRACT_WORKERS, thread_name_prefix='extract') as pool:
+        futures = {table: pool.submit(timed_read, table) for table in projections}
+        frames = {table: future.result() for table, future in futures.items()}
+    logger.info(f"Extracted {len(frames)} tables in {time.time() - started:.2f}s")
+    return frames
@@ -0,0 +1,141 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from src.data.bitmap import lookup
+
+# Kolom turunan: band dari kolom numerik, sama dengan pd.cut (interval tertutup kanan)
+Band = namedtuple('Band', ['column', 'bins', 'labels'])
+BANDS = {
+    'discount_range': Band('discount', [0, 0.1, 0.2, 0.3, 1.0], ['0-10%', '10-20%', '20-30%', '30%+']),
+}
+
+# Filter turunan per grup: baris yang `key`-nya punya agregat `func` atas `column` > `above`
+# (kondisi True) atau tidak (False), dihitung atas seluruh dataset; key NULL tidak ikut keduanya
+Cohort = namedtuple('Cohort', ['key', 'column', 'func', 'above'])
+COHORTS = {
+    'repeat_customer': Cohort('customer_name', 'order_key', 'nunique', 1),
+}
+
+# A filter maps a column to a condition:
+#   value                  column == value
+#   ('between', low, high) low <= column < high
+#   ('in', values)         column in values
+#   ('not in', values)     column not in values
+# or a cohort from COHORTS to True (members) or False (the other groups).
+
+
+def condition_mask(values, condition):
+    if isinstance(condition, tuple):
+        op = condition[0]
+        if op == 'between':
+            return (values >= condition[1]) & (values < condition[2])
+        if op == 'in':
+            return values.isin(condition[1])
+        if op == 'not in':
+            return ~values.isin(condition[1])
+        raise ValueError(f"Unknown filter operator {op!r}")
+    return values == condition
+
+
+def cohort_mask(df, name, member):
+    """Boolean array: rows of `df` in (member=True) or outside cohort `name`"""
+    cohort = COHORTS[name]
+    keys = frame_column(df, cohort.key)
+    totals = df[cohort.column].groupby(keys, observed=True).agg(cohort.func)
+    members = totals.index[(totals > cohort.above) == bool(member)]
+    return keys.isin(members).to_numpy()
+
+
+def frame_column(df, name):
+    """Column `name` of `df`, computing derived bands when needed"""
+    band = BANDS.get(name)
+    if band is not None and name not in df.columns:
+        return pd.cut(df[band.column], bins=band.bins, labels=band.labels).rename(name)
+    return df[name]
+
+
+def source_columns(names):
+    """Stored columns behind `names` (a band reads its source column)"""
+    return list(dict.fromkeys(BANDS[name].column if name in BANDS else name for name in names))
+
+
+def filter_key(filters):
+    """Hashable, order-independent form of `filters` (cache key)"""
+    def freeze(condition):
+        if isinstance(condition, tuple):
+            return tuple(tuple(part) if isinstance(part, (list, tuple, set)) else part for part in condition)
+        return condition
+    return tuple(sorted((name, freeze(condition)) for name, condition in (filters or {}).items()))
+
+
+def select_rows(df, filters, index=None):
+    """Sorted positions of the rows of `df` matching `filters` (None: every row).
+
+    With a bitmap `index` of `df`, the conditions it covers are resolved by
+    intersecting row bitmaps; the remaining conditions are only checked on
+    the rows selected so far. Cohorts are always evaluated over all of `df`.
+    """
+    filters = dict(filters or {})
+    if not filters:
+        return None
+    rows = None
+    if index is not None:
+        for name, condition in list(filters.items()):
+            bitmap = lookup(index, name, condition)
+            if bitmap is not None:
+                del filters[name]
+                rows = bitmap if rows is None else rows & bitmap
+        if rows is not None:
+            rows = rows.to_array()
+    for name in [name for name in filters if name in COHORTS]:
+        mask = cohort_mask(df, name, filters.pop(name))
+        rows = np.flatnonzero(mask) if rows is None else rows[mask[rows]]
+    for name, condition in filters.items():
+        if rows is None:
+            rows = np.flatnonzero(condition_mask(frame_column(df, name), condition).to_numpy())
+        else:
+            subset = take_rows(df, rows, source_columns([name]))
+            rows = rows[condition_mask(frame_column(subset, name), condition).to_numpy()]
+    return rows
+
+
+def take_rows(df, rows, columns=None):
+    """`columns` (default: all) of `df` at `rows`; the frame itself when rows is None"""
+    if rows is None:
+        return df
+    if columns is None:
+        return df.take(rows)
+    return pd.DataFrame({col: df[col].take(rows) for col in columns}, copy=False)
+
+
+def filter_frame(df, filters, index=None, columns=None):
+    """Rows of `df` matching every condition in `filters`"""
+    return take_rows(df, select_rows(df, filters, index), columns)
+
+
+# Filter klik halaman overview: "<tipe>|<nilai>|..." -> kolom yang difilter
+CLICK_FILTERS = {
+    'sales_trend': ('year', 'month'),
+    'category': ('category',),
+    'product': ('product_name',),
+    'segment': ('segment',),
+}
+
+
+def parse_filter_state(filter_state):
+    """(filter type, filters) of a click filter state like 'category|Technology'.
+
+    Returns ('', {}) for an empty or unrecognized state.
+    """
+    if not filter_state or not filter_state.strip():
+        return '', {}
+    parts = filter_state.split('|')
+    columns = CLICK_FILTERS.get(parts[0])
+    if columns is None or len(parts) < len(columns) + 1:
+        return '', {}
+    values = parts[1:len(columns) + 1]
+    if parts[0] == 'sales_trend':
+        values = [int(value) for value in values]
+    return parts[0], dict(zip(columns, values))
@@ -0,0 +1,348 @@
+import json
+import logging
+import os
+import threading
+import time
+
+import pandas as pd
+from sqlalchemy import bindparam, text
+
+from src.config import settings
+from src.config.database import get_db_connection
+from src.data import cube, data_loader, extract, snapshot, views
+from src.data.filters import BANDS, COHORTS, filter_key, frame_column, source_columns
+from src.data.star import STAR_DIMENSIONS, resolve_columns
+from src.utils.cache_backend import dump_frame, load_frame, open_cache
+
+logger = logging.getLogger(__name__)
+
+_SQL_AGGREGATES = {
+    'sum': 'SUM({})',
+    'mean': 'AVG({})',
+    'count': 'COUNT({})',
+    'nunique': 'COUNT(DISTINCT {})',
+    'min': 'MIN({})',
+    'max': 'MAX({})',
+}
+# Agregat yang bernilai 0 (bukan NULL/NaN) pada grup kosong
+_ZERO_WHEN_EMPTY = ('sum', 'count', 'nunique')
+
+# Daftar kolom warehouse di-cache; skema jarang berubah
+_CATALOG_TTL = 300
+_catalog = None
+
+# Hasil GROUP BY warehouse, dibagi antar worker lewat backend cache
+_results = None
+_results_lock = threading.Lock()
+
+# Fingerprint warehouse (versi data backend sql) dibaca ulang paling lambat tiap _VERSION_TTL detik
+_VERSION_TTL = 5
+_warehouse_version = None
+
+
+def backend():
+    """'pandas' (in-memory dataset, rollups from the cube) or 'sql' (GROUP BY pushed down to the warehouse)"""
+    return settings.QUERY_ENGINE
+
+
+# --- pandas backend ----------------------------------------------------------
+
+def _reduce(series, func):
+    if func == 'nunique':
+        return series.nunique()
+    if func == 'count':
+        return series.count()
+    return getattr(series, func)()
+
+
+def _group(df, measures, by):
+    if not by:
+        return pd.DataFrame([{name: _reduce(df[col], func) for name, (col, func) in measures.items()}])
+    keys = [frame_column(df, name) for name in by]
+    return df.groupby(keys, observed=True).agg(**measures).reset_index()
+
+
+def _aggregate_pandas(queries, filters):
+    # Satu potongan cube dan satu filtered view dipakai bersama semua query
+    dataset = data_loader.get_dataset()
+    results = [None] * len(queries)
+    if settings.CUBE_ENABLED and not dataset.df.empty:
+        results = cube.answer_many(cube.get_cube(dataset), queries, filters)
+    remaining = [i for i, result in enumerate(results) if result is None]
+    if remaining:
+        names = [name for i in remaining
+                 for name in list(queries[i][1]) + [col for col, _ in queries[i][0].values()]]
+        missing = [col for col in source_columns(names) if col not in dataset.df.columns]
+        if missing and not dataset.df.empty:
+            raise KeyError(f"Column {missing[0]!r} is not in the loaded dataset "
+                           f"(not extracted: see dashboard_columns() in src/data/columns.py)")
+        view = views.filtered_view(dataset, filters)
+        df = views.view_frame(dataset, view, source_columns(names))
+        for i in remaining:
+            results[i] = _group(df, *queries[i])
+    return results
+
+
+# --- SQL backend -------------------------------------------------------------
+
+def _sources():
+    global _catalog
+    cached = _catalog
+    if cached is None or time.monotonic() - cached[0] > _CATALOG_TTL:
+        table_columns = extract.read_table_columns(get_db_connection())
+        dim_columns = {table: table_columns[table] for table, _ in STAR_DIMENSIONS}
+        cached = _catalog = (time.monotonic(), resolve_columns(table_columns['fact_sales'], dim_columns))
+    return cached[1]
+
+
+def _literal(value):
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    return repr(value)
+
+
+def _sql_expression(name, sources, joins):
+    band = BANDS.get(name)
+    if band is not None:
+        column = _sql_expression(band.column, sources, joins)
+        cases = ' '.join(f"WHEN {column} > {_literal(low)} AND {column} <= {_literal(high)} THEN {_literal(label)}"
+                         for low, high, label in zip(band.bins[:-1], band.bins[1:], band.labels))
+        return f"CASE {cases} END"
+    if name not in sources:
+        raise KeyError(f"Unknown column {name!r}")
+    table, column = sources[name]
+    if table is not None:
+        joins.add(table)
+    return f"{table or 'fact_sales'}.{extract.quote_identifier(column)}"
+
+
+def _param(value):
+    return value.item() if hasattr(value, 'item') else value
+
+
+def _sql_condition(expression, condition, name, params, expanding):
+    if isinstance(condition, tuple):
+        op = condition[0]
+        if op == 'between':
+            params[f"{name}_low"], params[f"{name}_high"] = _param(condition[1]), _param(condition[2])
+            return f"{expression} >= :{name}_low AND {expression} < :{name}_high"
+        if op in ('in', 'not in'):
+            values = [_param(value) for value in condition[1]]
+            if not values:
+                return '1 = 0' if op == 'in' else '1 = 1'
+            params[name] = values
+            expanding.append(name)
+            return f"{expression} {op.upper()} :{name}"
+        raise ValueError(f"Unknown filter operator {op!r}")
+    params[name] = _param(condition)
+    return f"{expression} = :{name}"
+
+
+def _cohort_condition(name, member, sources, joins, param, params):
+    # Subquery GROUP BY ... HAVING di warehouse, bukan daftar nilai key sebagai parameter
+    cohort = COHORTS[name]
+    inner_joins = set()
+    key = _sql_expression(cohort.key, sources, inner_joins)
+    measure = _SQL_AGGREGATES[cohort.func].format(_sql_expression(cohort.column, sources, inner_joins))
+    params[param] = cohort.above
+    return (f"{_sql_expression(cohort.key, sources, joins)} IN (SELECT {key} FROM {_from_clause(inner_joins)} "
+            f"GROUP BY 1 HAVING {measure} {'>' if member else '<='} :{param})")
+
+
+def _from_clause(joins):
+    clause = 'fact_sales'
+    for table, key in STAR_DIMENSIONS:
+        if table in joins:
+            clause += f" LEFT JOIN {table} ON {table}.{key} = fact_sales.{key}"
+    return clause
+
+
+def build_sql(measures, by=None, filters=None, order_by=None, ascending=False, limit=None):
+    """GROUP BY statement over the star schema plus its bound parameters"""
+    sources = _sources()
+    joins = set()
+    by = list(by or [])
+    select = [f"{_sql_expression(name, sources, joins)} AS {extract.quote_identifier(name)}" for name in by]
+    select += [f"{_SQL_AGGREGATES[func].format(_sql_expression(col, sources, joins))} AS {extract.quote_identifier(name)}"
+               for name, (col, func) in measures.items()]
+
+    params, expanding = {}, []
+    # Sama dengan groupby pandas: grup dengan key NULL tidak ikut
+    where = [f"{_sql_expression(name, sources, joins)} IS NOT NULL" for name in by]
+    where += [_cohort_condition(name, condition, sources, joins, f"p{i}", params) if name in COHORTS
+              else _sql_condition(_sql_expression(name, sources, joins), condition, f"p{i}", params, expanding)
+              for i, (name, condition) in enumerate((filters or {}).items())]
+
+    statement = f"SELECT {', '.join(select)} FROM {_from_clause(joins)}"
+    if where:
+        statement += f" WHERE {' AND '.join(where)}"
+    if by:
+        statement += f" GROUP BY {', '.join(str(i + 1) for i in range(len(by)))}"
+    if order_by is not None:
+        positions = ''.join(f", {i + 1}" for i in range(len(by)))
+        statement += f" ORDER BY {extract.quote_identifier(order_by)} {'ASC' if ascending else 'DESC'}{positions}"
+    if limit is not None:
+        statement += f" LIMIT {int(limit)}"
+    query = text(statement)
+    if expanding:
+        query = query.bindparams(*[bindparam(name, expanding=True) for name in expanding])
+    return query, params
+
+
+def _result_cache():
+    global _results
+    if _results is None:
+        with _results_lock:
+            if _results is None:
+                _results = open_cache('aggregates', settings.RESPONSE_CACHE_SIZE * 4,
+                                      settings.RESPONSE_CACHE_MB * 1024 ** 2)
+    return _results
+
+
+def _warehouse_fingerprint():
+    global _warehouse_version
+    cached = _warehouse_version
+    if cached is None or time.monotonic() - cached[0] > _VERSION_TTL:
+        fingerprint = snapshot.compute_fingerprints(get_db_connection())[0]
+        cached = _warehouse_version = (time.monotonic(), fingerprint)
+    return cached[1]
+
+
+def _cached_aggregate_sql(measures, by, filters, order_by, ascending, limit):
+    if not settings.AGGREGATE_CACHE:
+        return _aggregate_sql(measures, by, filters, order_by, ascending, limit)
+    version = data_version()
+    key = json.dumps([version, sorted(measures.items()), by, filter_key(filters), order_by, ascending, limit],
+                     default=str)
+    entry = _result_cache().get(key)
+    if entry is not None and (settings.RESPONSE_CACHE_TTL <= 0
+                              or time.time() - entry[0] <= settings.RESPONSE_CACHE_TTL):
+        result = load_frame(entry[1])
+        if result is not None:
+            return result
+    result = _aggregate_sql(measures, by, filters, order_by, ascending, limit)
+    try:
+        _result_cache().set(key, version, dump_frame(result))
+    except (ValueError, TypeError, NotImplementedError) as e:
+        logger.debug(f"Aggregate result not cached: {e}")
+    return result
+
+
+def _aggregate_sql(measures, by, filters, order_by, ascending, limit):
+    query, params = build_sql(measures, by, filters, order_by, ascending, limit)
+    logger.debug(f"Aggregate query: {query} {params}")
+    with get_db_connection().connect() as conn:
+        result = pd.read_sql(query, conn, params=params)
+    for name, (_, func) in measures.items():
+        if func in _ZERO_WHEN_EMPTY:
+            result[name] = pd.to_numeric(result[name].fillna(0))
+        elif func == 'mean':
+            result[name] = pd.to_numeric(result[name])
+    for name in by:
+        band = BANDS.get(name)
+        if band is not None:
+            result[name] = pd.Categorical(result[name], categories=band.labels, ordered=True)
+    if order_by is None and by:
+        # Urutan grup mengikuti groupby pandas, bukan collation database
+        result = result.sort_values(list(by), kind='stable')
+    return result
+
+
+# --- API ---------------------------------------------------------------------
+
+def _complete_bands(result, by, measures):
+    """A grouping by one band reports every band, empty ones included"""
+    if len(by) != 1 or by[0] not in BANDS:
+        return result
+    result = result.set_index(by[0]).reindex(pd.CategoricalIndex(BANDS[by[0]].labels, ordered=True, name=by[0]))
+    for name, (_, func) in measures.items():
+        if func in _ZERO_WHEN_EMPTY:
+            result[name] = result[name].fillna(0)
+    return result.reset_index()
+
+
+def _widen(result, measures):
+    # Measure float32 (compact storage) jadi float64: pembulatan dan JSON sama dengan mode non-compact
+    for name in measures:
+        if result[name].dtype == 'float32':
+            result[name] = result[name].astype('float64')
+    return result
+
+
+def _order(result, order_by, ascending, limit):
+    if order_by is not None and limit is not None:
+        return result.nsmallest(limit, order_by) if ascending else result.nlargest(limit, order_by)
+    if order_by is not None:
+        return result.sort_values(order_by, ascending=ascending, kind='stable')
+    if limit is not None:
+        return result.head(limit)
+    return result
+
+
+def aggregate(measures, by=None, filters=None, order_by=None, ascending=False, limit=None):
+    """Aggregate the star schema, one row per group of `by`.
+
+    `measures` maps output names to (column, func) like pandas named
+    aggregation; func is one of sum, mean, count, nunique, min, max. `by` may
+    also name a derived band from BANDS. With `order_by` and `limit` only the
+    top (or, with ascending=True, bottom) `limit` groups are returned; without
+    `order_by` groups come out sorted by key. Without `by` the result is a
+    single row. Float measures are float64, also with compact storage.
+    """
+    return aggregate_many([dict(measures=measures, by=by, order_by=order_by, ascending=ascending, limit=limit)],
+                          filters)[0]
+
+
+def aggregate_many(queries, filters=None):
+    """aggregate() for several queries over the same `filters`, one result per query.
+
+    Each query is a dict of aggregate() arguments other than filters. The
+    pandas backend selects the filtered data once for all of them; the sql
+    backend still runs (and caches) one GROUP BY per query.
+    """
+    queries = [dict(query, by=list(query.get('by') or [])) for query in queries]
+    if backend() == 'sql':
+        results = [_cached_aggregate_sql(query['measures'], query['by'], filters, query.get('order_by'),
+                                         query.get('ascending', False), query.get('limit'))
+                   for query in queries]
+    else:
+        results = _aggregate_pandas([(query['measures'], query['by']) for query in queries], filters)
+        results = [_order(result, query.get('order_by'), query.get('ascending', False), query.get('limit'))
+                   for result, query in zip(results, queries)]
+    return [_widen(_complete_bands(result, query['by'], query['measures']).reset_index(drop=True), query['measures'])
+            for result, query in zip(results, queries)]
+
+
+def columns():
+    """Column names available to aggregate(), in wide-join order"""
+    if backend() == 'sql':
+        return list(_sources())
+    return data_loader.get_dataset().df.columns.tolist()
+
+
+def distinct(column):
+    """Distinct non-null values of `column`"""
+    if backend() == 'sql':
+        return aggregate({}, by=[column])[column].tolist()
+    return data_loader.get_dataset().df[column].dropna().unique().tolist()
+
+
+def data_version():
+    """Version of the data aggregate() reads, the same in every worker process.
+
+    The warehouse fingerprint of the loaded dataset; a dataset without one
+    (stale snapshot, empty fallback) only versions this process. The sql
+    backend uses the current warehouse fingerprint (re-read every few seconds).
+    """
+    if backend() == 'sql':
+        return _warehouse_fingerprint()
+    dataset = data_loader.get_dataset()
+    return dataset.fingerprint or f"{os.getpid()}:{dataset.generation}"
+
+
+def is_empty():
+    """True when there are no fact rows to show"""
+    if backend() == 'sql':
+        with get_db_connection().connect() as conn:
+            return conn.execute(text("SELECT 1 FROM fact_sales LIMIT 1")).first() is None
+    return data_loader.get_dataset().df.empty
@@ -0,0 +1,146 @@
+import logging
+import threading
+import time
+
+from src.config import settings
+from src.data import bitmap, cube, data_loader, query
+
+logger = logging.getLogger(__name__)
+
+_refresh_lock = threading.Lock()  # only one generation is built at a time
+_wakeup = threading.Event()
+_pending_lock = threading.Lock()  # guards _pending_full between trigger_refresh and the loop
+_pending_full = False
+_thread = None
+_status = {
+    'running': False,
+    'mode': None,
+    'last_started': None,
+    'last_finished': None,
+    'last_error': None,
+    'rows_appended': None,
+    'warmed_at': None,
+}
+
+
+def _warm_caches(dataset):
+    # Fallback kosong (warehouse tidak bisa dibaca, tidak ada snapshot) belum dianggap siap
+    if dataset.fingerprint is None and dataset.df.empty:
+        return False
+    # Cube dan bitmap index generasi baru dibangun di sini, bukan pada klik pertama
+    if settings.CUBE_ENABLED:
+        cube.get_cube(dataset)
+    if settings.BITMAP_INDEX:
+        bitmap.get_index(dataset)
+    if _status['warmed_at'] is None:
+        _status['warmed_at'] = time.time()
+    return True
+
+
+def warm_up():
+    """Load the dataset and build its cube and bitmap index, so no request pays for them.
+
+    With the sql query engine only the warehouse connection is checked.
+    Returns True once the process can serve (see is_ready()).
+    """
+    started = time.time()
+    try:
+        if query.backend() == 'sql':
+            query.is_empty()
+            _status['warmed_at'] = _status['warmed_at'] or time.time()
+        elif not _warm_caches(data_loader.get_dataset()):
+            logger.warning("Warm-up found no data, not ready yet")
+            return False
+    except Exception:
+        logger.exception("Warm-up failed")
+        return False
+    logger.info(f"Warm-up finished in {time.time() - started:.1f}s")
+    return True
+
+
+def is_ready():
+    """True once this process has data to serve (stays true across refreshes)"""
+    return _status['warmed_at'] is not None
+
+
+def run_refresh(full=False):
+    """Build and publish the next dataset generation on the calling thread.
+
+    Returns False without doing anything when another refresh is running.
+    Readers keep using the published generation until the swap.
+    """
+    if not _refresh_lock.acquire(blocking=False):
+        return False
+    try:
+        _status.update(running=True, mode='full' if full else 'incremental',
+                       last_started=time.time(), last_error=None)
+        if full:
+            data_loader.reload_data()
+            _status['rows_appended'] = None
+        else:
+            _status['rows_appended'] = data_loader.refresh_data()
+        _warm_caches(data_loader.peek_dataset())
+    except Exception as e:
+        logger.exception("Dataset refresh failed")
+        _status['last_error'] = str(e)
+    finally:
+        _status.update(running=False, last_finished=time.time())
+        _refresh_lock.release()
+    return True
+
+
+def _refresh_loop(interval):
+    global _pending_full
+    while True:
+        _wakeup.wait(interval if interval > 0 else None)
+        with _pending_lock:
+            _wakeup.clear()
+            full, _pending_full = _pending_full, False
+        run_refresh(full=full)
+
+
+def start_refresher(interval=None):
+    """Start the background refresh thread (idempotent)"""
+    global _thread
+    if _thread is not None and _thread.is_alive():
+        return _thread
+    interval = settings.REFRESH_INTERVAL if interval is None else interval
+    _thread = threading.Thread(target=_refresh_loop, args=(interval,), name='dataset-refresher', daemon=True)
+    _thread.start()
+    logger.info(f"Dataset refresher started (interval: {interval or 'manual'}s)")
+    return _thread
+
+
+def _warm_up_loop():
+    # Sampai siap: tunggu jadwal retry data_loader setelah load yang gagal
+    while not warm_up():
+        delay = data_loader.seconds_until_retry()
+        time.sleep(settings.LOAD_RETRY_SECONDS if delay is None else max(delay, 0.1))
+
+
+def start_background():
+    """Start this process's background work: the refresher (SUPERSTORE_REFRESH_INTERVAL)
+    and, unless the dataset was preloaded before fork, a warm-up thread that
+    retries until the process is ready"""
+    if settings.REFRESH_INTERVAL > 0:
+        start_refresher()
+    if not is_ready():
+        threading.Thread(target=_warm_up_loop, name='dataset-warm-up', daemon=True).start()
+
+
+def trigger_refresh(full=False):
+    """Ask the background thread for a refresh now; does not block"""
+    global _pending_full
+    with _pending_lock:
+        _pending_full = _pending_full or full
+        _wakeup.set()
+    start_refresher()
+
+
+def get_status():
+    dataset = data_loader.peek_dataset()
+    return {
+        **_status,
+        'generation': dataset.generation if dataset is not None else None,
+        'rows': len(dataset.df) if dataset is not None else None,
+    }
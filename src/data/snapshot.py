@@ -0,0 +1,152 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+
+import pandas as pd
+from sqlalchemy import text
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+WAREHOUSE_TABLES = ['dim_customer', 'dim_product', 'dim_order', 'dim_time', 'dim_region', 'fact_sales']
+SNAPSHOT_FORMAT = 1
+
+_SCHEMA_QUERY = text("""
+    SELECT table_name, column_name, data_type
+    FROM information_schema.columns
+    WHERE table_schema = current_schema() AND table_name = ANY(:tables)
+    ORDER BY table_name, ordinal_position
+""")
+
+# relfilenode berubah setiap kali tabel dibuat ulang (to_sql if_exists='replace'),
+# counter pg_stat berubah setiap ada insert/update/delete.
+_VERSION_QUERY = text("""
+    SELECT c.relname, c.relfilenode, s.n_tup_ins, s.n_tup_upd, s.n_tup_del
+    FROM pg_class c
+    JOIN pg_stat_user_tables s ON s.relid = c.oid
+    WHERE c.relname = ANY(:tables) AND s.schemaname = current_schema()
+    ORDER BY c.relname
+""")
+
+
+def _hash(payload):
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def compute_fingerprints(engine, salt=None):
+    """(data fingerprint, structure fingerprint) of the warehouse, from catalog queries only.
+
+    The structure fingerprint only covers the schema and the physical table
+    identity (relfilenode), so it stays the same while rows are appended and
+    changes when a table is altered or recreated by the ETL. `salt` (e.g. the
+    extractor's column projection) is mixed into both.
+    """
+    with engine.connect() as conn:
+        schema = [list(row) for row in conn.execute(_SCHEMA_QUERY, {'tables': WAREHOUSE_TABLES})]
+        version = [list(row) for row in conn.execute(_VERSION_QUERY, {'tables': WAREHOUSE_TABLES})]
+    structure = [row[:2] for row in version]
+    return (_hash({'format': SNAPSHOT_FORMAT, 'salt': salt, 'schema': schema, 'version': version}),
+            _hash({'format': SNAPSHOT_FORMAT, 'salt': salt, 'schema': schema, 'structure': structure}))
+
+
+def _current_pointer():
+    return os.path.join(settings.SNAPSHOT_DIR, 'CURRENT')
+
+
+def _read_manifest():
+    try:
+        with open(_current_pointer()) as f:
+            name = f.read().strip()
+        path = os.path.join(settings.SNAPSHOT_DIR, name)
+        with open(os.path.join(path, 'manifest.json')) as f:
+            return path, json.load(f)
+    except (OSError, ValueError):
+        return None, None
+
+
+def read_snapshot(fingerprint=None):
+    """Load the published snapshot.
+
+    Returns a dict of DataFrames keyed by 'merged' and the warehouse table names,
+    or None when the snapshot is missing, corrupt, or its fingerprint differs
+    from `fingerprint`. Passing fingerprint=None accepts a stale snapshot.
+    """
+    if not settings.SNAPSHOT_ENABLED:
+        return None
+    path, manifest = _read_manifest()
+    if manifest is None:
+        return None
+    if fingerprint is not None and manifest.get('fingerprint') != fingerprint:
+        logger.info("Snapshot is stale (fingerprint changed)")
+        return None
+    try:
+        frames = {}
+        for name, meta in manifest['tables'].items():
+            frame = pd.read_parquet(os.path.join(path, meta['file']))
+            if len(frame) != meta['rows']:
+                raise ValueError(f"{name}: expected {meta['rows']} rows, found {len(frame)}")
+            frames[name] = frame
+        if settings.COMPACT_STORAGE:
+            frames['fact_sales'] = None
+        else:
+            frames['fact_sales'] = frames['merged'][manifest['fact_columns']].copy()
+    except Exception as e:
+        logger.warning(f"Snapshot at {path} is unreadable, ignoring it: {e}")
+        return None
+    logger.info(f"Loaded snapshot {manifest['fingerprint'][:12]} written at {manifest['created_at']}")
+    return frames
+
+
+def snapshot_fingerprint():
+    """Fingerprint of the published snapshot, or None"""
+    _, manifest = _read_manifest()
+    return manifest.get('fingerprint') if manifest else None
+
+
+def write_snapshot(fingerprint, frames, fact_columns):
+    """Persist `frames` (same keys as read_snapshot) and publish them atomically.
+
+    fact_sales is not written: it is rebuilt from `fact_columns` of the merged frame.
+    """
+    if not settings.SNAPSHOT_ENABLED or fingerprint is None:
+        return False
+    name = f"{fingerprint[:16]}-{int(time.time())}"
+    path = os.path.join(settings.SNAPSHOT_DIR, name)
+    try:
+        os.makedirs(path, exist_ok=True)
+        tables = {}
+        for key, frame in frames.items():
+            if key == 'fact_sales' or frame is None:
+                continue
+            frame.to_parquet(os.path.join(path, f"{key}.parquet"), index=False)
+            tables[key] = {'file': f"{key}.parquet", 'rows': len(frame)}
+        manifest = {
+            'fingerprint': fingerprint,
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'tables': tables,
+            'fact_columns': list(fact_columns),
+        }
+        with open(os.path.join(path, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f)
+        pointer_tmp = f"{_current_pointer()}.{os.getpid()}.tmp"
+        with open(pointer_tmp, 'w') as f:
+            f.write(name)
+        os.replace(pointer_tmp, _current_pointer())
+    except Exception as e:
+        logger.warning(f"Could not write snapshot to {path}: {e}")
+        shutil.rmtree(path, ignore_errors=True)
+        return False
+    _remove_old_snapshots(keep=name)
+    logger.info(f"Snapshot {fingerprint[:12]} written to {path}")
+    return True
+
+
+def _remove_old_snapshots(keep):
+    for entry in os.listdir(settings.SNAPSHOT_DIR):
+        full = os.path.join(settings.SNAPSHOT_DIR, entry)
+        if entry != keep and os.path.isdir(full):
+            shutil.rmtree(full, ignore_errors=True)
@@ -0,0 +1,138 @@
+import numpy as np
+import pandas as pd
+
+# Urutan join sama dengan rantai merge lama di load_data()
+STAR_DIMENSIONS = [
+    ('dim_customer', 'customer_key'),
+    ('dim_product', 'product_key'),
+    ('dim_order', 'order_key'),
+    ('dim_time', 'time_key'),
+    ('dim_region', 'region_key'),
+]
+
+# A key lookup array is only used while it stays within this factor of the
+# dimension size; sparser keys fall back to a hash lookup.
+_MAX_KEY_DENSITY = 4
+
+
+def key_positions(dim_keys, fact_keys):
+    """Row position in the dimension for every fact key (-1 when unmatched).
+
+    Surrogate keys from the ETL are dense (index + 1), so the dimension is
+    treated as an array indexed by key and the lookup is a single gather.
+    """
+    dim_keys = pd.Series(dim_keys)
+    if not dim_keys.is_unique:
+        raise ValueError(f"{dim_keys.name} is not unique in its dimension table")
+    fact_keys = pd.to_numeric(pd.Series(fact_keys)).to_numpy()
+    if len(dim_keys) == 0:
+        return np.full(len(fact_keys), -1, dtype=np.intp)
+
+    max_key = int(dim_keys.max())
+    if dim_keys.min() < 0 or max_key > _MAX_KEY_DENSITY * len(dim_keys) + 1024:
+        return pd.Index(dim_keys).get_indexer(fact_keys)
+
+    lookup = np.full(max_key + 1, -1, dtype=np.intp)
+    lookup[dim_keys.to_numpy(dtype=np.int64)] = np.arange(len(dim_keys), dtype=np.intp)
+
+    positions = np.full(len(fact_keys), -1, dtype=np.intp)
+    valid = (fact_keys >= 0) & (fact_keys <= max_key)
+    if fact_keys.dtype.kind == 'f':
+        valid &= ~np.isnan(fact_keys)
+    positions[valid] = lookup[fact_keys[valid].astype(np.int64)]
+    return positions
+
+
+def gather(series, positions, name=None):
+    """Take `series` at `positions`; -1 becomes missing, like a left merge"""
+    has_missing = bool((positions < 0).any())
+    values = series.array if isinstance(series.dtype, pd.api.extensions.ExtensionDtype) else series.to_numpy()
+    values = pd.api.extensions.take(values, positions, allow_fill=has_missing)
+    return pd.Series(values, name=series.name if name is None else name, copy=False)
+
+
+def resolve_columns(fact_columns, dim_columns):
+    """Wide-join column name -> (dimension table, source column).
+
+    The table is None for fact columns. Names follow the old merge chain,
+    including the _x/_y suffixes pandas adds when two dimensions share a
+    column (order_date).
+    """
+    sources = {col: (None, col) for col in fact_columns}
+    for table, key in STAR_DIMENSIONS:
+        columns = dim_columns.get(table)
+        if columns is None:
+            continue
+        for col in columns:
+            if col == key:
+                continue
+            if col in sources:
+                sources = {(f"{name}_x" if name == col else name): source
+                           for name, source in sources.items()}
+                sources[f"{col}_y"] = (table, col)
+            else:
+                sources[col] = (table, col)
+    return sources
+
+
+class StarView:
+    """Fact table plus dimensions, resolved by surrogate-key gather.
+
+    Dimension attributes are only gathered when a column is requested, so a
+    caller that touches three columns never pays for the full wide join.
+    Column names come from resolve_columns().
+    """
+
+    def __init__(self, fact, dims):
+        self.fact = fact
+        self.dims = dims
+        self._positions = {}
+        self._cache = {}
+        self._sources = self._resolve_sources()
+
+    def _resolve_sources(self):
+        dim_columns = {table: list(dim.columns) for table, dim in self.dims.items() if dim is not None}
+        return resolve_columns(self.fact.columns, dim_columns)
+
+    @property
+    def columns(self):
+        return list(self._sources)
+
+    def __len__(self):
+        return len(self.fact)
+
+    def positions(self, table):
+        if table not in self._positions:
+            key = dict(STAR_DIMENSIONS)[table]
+            self._positions[table] = key_positions(self.dims[table][key], self.fact[key])
+        return self._positions[table]
+
+    def column(self, name):
+        if name not in self._cache:
+            table, col = self._sources[name]
+            if table is None:
+                self._cache[name] = pd.Series(self.fact[col].array, name=name, copy=False)
+            else:
+                self._cache[name] = gather(self.dims[table][col], self.positions(table), name)
+        return self._cache[name]
+
+    def __getitem__(self, name):
+        if isinstance(name, list):
+            return self.frame(name)
+        return self.column(name)
+
+    def frame(self, columns=None):
+        """Materialize `columns` (default: all) as a DataFrame"""
+        columns = self.columns if columns is None else columns
+        data = {}
+        for col in columns:
+            data[col] = self.column(col)
+            if col in self._sources and self._sources[col][0] is not None:
+                # Gathered columns are not needed again once they are in the frame
+                self._cache.pop(col, None)
+        return pd.DataFrame(data, copy=False)
+
+
+def join_star(fact, dims):
+    """Wide join of `fact` with every dimension in `dims`"""
+    return StarView(fact, dims).frame()
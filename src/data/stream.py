@@ -0,0 +1,140 @@
+import logging
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_datetime64_any_dtype, is_float_dtype, is_integer_dtype
+from sqlalchemy import text
+
+from src.data.compact import FLOAT32_COLUMNS, is_key_column
+
+logger = logging.getLogger(__name__)
+
+
+class _ArrayColumn:
+    """Numeric/datetime column filled chunk by chunk into one pre-sized array"""
+
+    def __init__(self, name, dtype, capacity):
+        self.name = name
+        self.values = np.empty(capacity, dtype=dtype)
+
+    def _reserve(self, dtype, size):
+        if dtype == self.values.dtype and size <= len(self.values):
+            return
+        capacity = max(size, 2 * len(self.values)) if size > len(self.values) else len(self.values)
+        grown = np.empty(capacity, dtype=dtype)
+        grown[:len(self.values)] = self.values
+        self.values = grown
+
+    def append(self, series, start):
+        values = series.to_numpy()
+        end = start + len(values)
+        dtype = self.values.dtype
+        if dtype.kind in 'iu' and values.dtype.kind in 'iu':
+            info = np.iinfo(dtype)
+            if len(values) and (values.min() < info.min or values.max() > info.max):
+                dtype = np.dtype(np.int64)
+        elif not (dtype.kind == 'f' and values.dtype.kind == 'f') and values.dtype != dtype:
+            # Misalnya NULL pada kolom integer: chunk datang sebagai float64
+            dtype = np.result_type(dtype, values.dtype)
+        self._reserve(dtype, end)
+        self.values[start:end] = values
+
+    def finish(self, rows):
+        return pd.Series(self.values[:rows], name=self.name, copy=False)
+
+
+class _DictionaryColumn:
+    """Text column stored as int32 codes into a growing dictionary"""
+
+    def __init__(self, name, capacity):
+        self.name = name
+        self.codes = np.empty(capacity, dtype=np.int32)
+        self.lookup = {}
+        self.categories = []
+
+    def append(self, series, start):
+        end = start + len(series)
+        if end > len(self.codes):
+            grown = np.empty(max(end, 2 * len(self.codes)), dtype=np.int32)
+            grown[:len(self.codes)] = self.codes
+            self.codes = grown
+        local_codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        mapping = np.empty(len(uniques) + 1, dtype=np.int32)
+        mapping[-1] = -1  # NULL
+        for i, value in enumerate(uniques):
+            code = self.lookup.get(value)
+            if code is None:
+                code = self.lookup[value] = len(self.categories)
+                self.categories.append(value)
+            mapping[i] = code
+        self.codes[start:end] = mapping[local_codes]
+
+    def finish(self, rows):
+        # Kategori diurutkan supaya urutan groupby sama dengan compact_frame()
+        categories = pd.Index(self.categories)
+        order = categories.argsort()
+        rank = np.empty(len(order) + 1, dtype=np.int32)
+        rank[order] = np.arange(len(order), dtype=np.int32)
+        rank[-1] = -1
+        codes = rank[self.codes[:rows]]
+        return pd.Series(pd.Categorical.from_codes(codes, categories[order]), name=self.name)
+
+
+class _ListColumn:
+    """Fallback for dtypes without a fixed-width representation"""
+
+    def __init__(self, name):
+        self.name = name
+        self.parts = []
+
+    def append(self, series, start):
+        self.parts.append(series)
+
+    def finish(self, rows):
+        return pd.concat(self.parts, ignore_index=True).rename(self.name) if self.parts else pd.Series(name=self.name)
+
+
+def _column_for(name, series, capacity):
+    dtype = series.dtype
+    if is_bool_dtype(dtype):
+        return _ArrayColumn(name, np.bool_, capacity)
+    if is_integer_dtype(dtype):
+        return _ArrayColumn(name, np.int32, capacity)
+    if is_float_dtype(dtype):
+        if is_key_column(name):
+            return _ArrayColumn(name, np.float64, capacity)
+        return _ArrayColumn(name, np.float32 if name in FLOAT32_COLUMNS else np.float64, capacity)
+    if is_datetime64_any_dtype(dtype) and getattr(dtype, 'tz', None) is None:
+        return _ArrayColumn(name, dtype, capacity)
+    if pd.api.types.infer_dtype(series, skipna=True) in ('string', 'empty'):
+        return _DictionaryColumn(name, capacity)
+    return _ListColumn(name)
+
+
+def read_table_streamed(engine, statement, chunksize):
+    """Read `statement` through a server-side cursor, `chunksize` rows at a time.
+
+    Each chunk is encoded straight into pre-sized compact columns (int32 keys and
+    integers, FLOAT32_COLUMNS as float32, text as dictionary codes), so peak memory
+    stays close to the size of the final frame instead of several times it.
+    """
+    with engine.connect() as conn:
+        capacity = conn.execute(text(f"SELECT count(*) FROM ({statement}) AS src")).scalar() or 0
+    columns = None
+    rows = 0
+    with engine.connect().execution_options(stream_results=True, max_row_buffer=chunksize) as conn:
+        for chunk in pd.read_sql(text(statement), conn, chunksize=chunksize):
+            if columns is None:
+                columns = {name: _column_for(name, chunk[name], max(capacity, len(chunk)))
+                           for name in chunk.columns}
+            for name, column in columns.items():
+                column.append(chunk[name], rows)
+            rows += len(chunk)
+    if columns is None:
+        return pd.read_sql(text(f"SELECT * FROM ({statement}) AS src LIMIT 0"), engine)
+    logger.info(f"Streamed {rows} rows in chunks of {chunksize}")
+    frame = pd.DataFrame({name: column.finish(rows) for name, column in columns.items()}, copy=False)
+    for name, column in columns.items():
+        if isinstance(column, _ArrayColumn) and is_integer_dtype(column.values.dtype) and not is_key_column(name):
+            frame[name] = pd.to_numeric(frame[name], downcast='integer')
+    return frame
@@ -0,0 +1,90 @@
+import threading
+from collections import OrderedDict, namedtuple
+from concurrent.futures import Future
+
+import numpy as np
+
+from src.config import settings
+from src.data import bitmap
+from src.data.filters import filter_key, select_rows, take_rows
+
+# Baris terpilih sebuah filter pada satu generasi dataset (rows None = semua baris).
+# Hanya posisi baris yang disimpan; kolom diambil saat dipakai.
+FilteredView = namedtuple('FilteredView', ['generation', 'key', 'rows'])
+
+_views = OrderedDict()  # (generation, filter key) -> FilteredView, urutan LRU
+_pending = {}  # (generation, filter key) -> Future milik thread yang sedang menghitung
+_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0, 'shared': 0}
+
+
+def _nbytes(view):
+    return 0 if view.rows is None else view.rows.nbytes
+
+
+def _store(key, view):
+    # Callback lambat yang selesai pada generasi lama tidak menghapus view generasi baru
+    if any(k[0] > key[0] for k in _views):
+        return
+    _views[key] = view
+    for stale in [k for k in _views if k[0] < key[0]]:
+        del _views[stale]
+    budget = settings.VIEW_CACHE_MB * 1024 ** 2
+    while len(_views) > 1 and (len(_views) > settings.VIEW_CACHE_SIZE
+                               or sum(_nbytes(v) for v in _views.values()) > budget):
+        _views.popitem(last=False)
+
+
+def _compute(dataset, filters, key):
+    index = bitmap.get_index(dataset) if settings.BITMAP_INDEX and filters else None
+    rows = select_rows(dataset.df, filters, index)
+    if rows is not None and len(dataset.df) < np.iinfo(np.int32).max:
+        rows = rows.astype(np.int32)
+    return FilteredView(dataset.generation, key[1], rows)
+
+
+def filtered_view(dataset, filters):
+    """Rows of `dataset` matching `filters`, memoized per (generation, filter spec).
+
+    Concurrent callers asking for the same view wait for the one computing it
+    instead of filtering again.
+    """
+    key = (dataset.generation, filter_key(filters))
+    with _lock:
+        view = _views.get(key)
+        if view is not None:
+            _views.move_to_end(key)
+            _stats['hits'] += 1
+            return view
+        future = _pending.get(key)
+        owner = future is None
+        if owner:
+            future = _pending[key] = Future()
+            _stats['misses'] += 1
+        else:
+            _stats['shared'] += 1
+    if not owner:
+        return future.result()
+
+    try:
+        view = _compute(dataset, filters, key)
+    except BaseException as e:
+        with _lock:
+            _pending.pop(key, None)
+        future.set_exception(e)
+        raise
+    with _lock:
+        _pending.pop(key, None)
+        _store(key, view)
+    future.set_result(view)
+    return view
+
+
+def view_frame(dataset, view, columns=None):
+    """`columns` of the rows in `view`; the dataset frame itself for an unfiltered view"""
+    return take_rows(dataset.df, view.rows, columns)
+
+
+def get_stats():
+    with _lock:
+        return {**_stats, 'entries': len(_views), 'bytes': sum(_nbytes(v) for v in _views.values())}
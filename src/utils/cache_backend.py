@@ -0,0 +1,224 @@
+import io
+import logging
+import os
+import sqlite3
+import stat
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Lokasi default file cache per backend ('shm' = tmpfs, dibagi semua worker di host yang sama);
+# di /dev/shm dalam direktori 0700 milik user ini, bukan langsung di direktori world-writable
+_DEFAULT_PATHS = {
+    'sqlite': os.path.join('.cache', 'cache.sqlite'),
+    'shm': os.path.join('/dev/shm', f'superstore-cache-{os.getuid()}', 'cache.sqlite'),
+}
+
+
+def dump_frame(frame):
+    """`frame` as Parquet bytes for a cache payload (raises ValueError/TypeError if it can't be stored)"""
+    buffer = io.BytesIO()
+    frame.to_parquet(buffer)
+    return buffer.getvalue()
+
+
+def load_frame(payload):
+    """Frame stored by dump_frame(), or None if the payload is unreadable"""
+    try:
+        return pd.read_parquet(io.BytesIO(payload))
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable cached frame: {e}")
+        return None
+
+
+def _owned(path):
+    # File cache (dan -wal/-shm-nya) harus file biasa milik user ini: file yang dibuat lebih dulu
+    # oleh user lain di direktori bersama tidak dibaca
+    info = os.lstat(path)
+    return stat.S_ISREG(info.st_mode) and info.st_uid == os.getuid()
+
+
+class MemoryBackend:
+    """Per-process LRU; entries of other data versions are dropped on write"""
+
+    shared = False
+
+    def __init__(self, namespace, max_entries, max_bytes):
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (waktu simpan, versi, payload)
+        self._nbytes = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """(stored timestamp, payload) or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0], entry[2]
+
+    def _pop(self, key):
+        self._nbytes -= len(self._entries.pop(key)[2])
+
+    def set(self, key, version, payload):
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+            self._entries[key] = (time.time(), version, payload)
+            self._nbytes += len(payload)
+            for stale in [k for k, (_, v, _) in self._entries.items() if v != version]:
+                self._pop(stale)
+            while len(self._entries) > 1 and (len(self._entries) > self.max_entries or self._nbytes > self.max_bytes):
+                self._pop(next(iter(self._entries)))
+                self._evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {'backend': 'memory', 'entries': len(self._entries), 'bytes': self._nbytes,
+                    'evictions': self._evictions}
+
+
+class SQLiteBackend:
+    """LRU in a SQLite file shared by every process that opens the same path.
+
+    Workers on one host see each other's entries. Entries of an older data
+    version are never hit again (the version is part of the key) and age out
+    through the LRU limits and the TTL of the caller.
+    """
+
+    shared = True
+
+    def __init__(self, namespace, max_entries, max_bytes, path, kind='sqlite'):
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.path = path
+        self.kind = kind
+        self._local = threading.local()
+        self._evictions = 0
+
+    def _connect(self):
+        # Koneksi per thread, dan dibuka ulang setelah fork (koneksi SQLite tidak boleh dipakai lintas proses)
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+        try:
+            os.close(os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600))
+        except FileExistsError:
+            pass
+        for path in (self.path, self.path + '-wal', self.path + '-shm'):
+            if os.path.lexists(path) and not _owned(path):
+                raise sqlite3.DatabaseError(f"{path} is not a file owned by this user")
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('CREATE TABLE IF NOT EXISTS cache_entries ('
+                     'namespace TEXT NOT NULL, key TEXT NOT NULL, version TEXT, stored REAL NOT NULL, '
+                     'accessed REAL NOT NULL, size INTEGER NOT NULL, payload BLOB NOT NULL, '
+                     'PRIMARY KEY (namespace, key))')
+        conn.execute('CREATE INDEX IF NOT EXISTS cache_entries_lru ON cache_entries (namespace, accessed)')
+        self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _run(self, action, default=None):
+        # Cache yang gagal dibaca/ditulis diperlakukan sebagai miss, bukan error halaman
+        try:
+            return action(self._connect())
+        except sqlite3.Error as e:
+            logger.warning(f"Cache {self.path} ({self.namespace}) unavailable: {e}")
+            return default
+
+    def get(self, key):
+        def action(conn):
+            row = conn.execute('SELECT stored, payload FROM cache_entries WHERE namespace = ? AND key = ?',
+                               (self.namespace, key)).fetchone()
+            if row is not None:
+                conn.execute('UPDATE cache_entries SET accessed = ? WHERE namespace = ? AND key = ?',
+                             (time.time(), self.namespace, key))
+            return row
+        return self._run(action)
+
+    def set(self, key, version, payload):
+        def action(conn):
+            now = time.time()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.execute('INSERT OR REPLACE INTO cache_entries VALUES (?, ?, ?, ?, ?, ?, ?)',
+                             (self.namespace, key, None if version is None else str(version), now, now,
+                              len(payload), payload))
+                evicted = self._evict(conn)
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            self._evictions += evicted
+        self._run(action)
+
+    def _evict(self, conn):
+        count, size = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries WHERE namespace = ?',
+                                   (self.namespace,)).fetchone()
+        if count <= self.max_entries and size <= self.max_bytes:
+            return 0
+        victims = []
+        for key, entry_size in conn.execute('SELECT key, size FROM cache_entries WHERE namespace = ? ORDER BY accessed',
+                                            (self.namespace,)).fetchall():
+            if count <= 1 or (count <= self.max_entries and size <= self.max_bytes):
+                break
+            victims.append((self.namespace, key))
+            count -= 1
+            size -= entry_size
+        conn.executemany('DELETE FROM cache_entries WHERE namespace = ? AND key = ?', victims)
+        return len(victims)
+
+    def delete(self, key):
+        self._run(lambda conn: conn.execute('DELETE FROM cache_entries WHERE namespace = ? AND key = ?',
+                                            (self.namespace, key)))
+
+    def clear(self):
+        self._run(lambda conn: conn.execute('DELETE FROM cache_entries WHERE namespace = ?', (self.namespace,)))
+
+    def stats(self):
+        row = self._run(lambda conn: conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries WHERE namespace = ?',
+            (self.namespace,)).fetchone(), (None, None))
+        return {'backend': self.kind, 'path': self.path, 'entries': row[0], 'bytes': row[1],
+                'evictions': self._evictions}
+
+
+def open_cache(namespace, max_entries, max_bytes):
+    """Cache backend for `namespace` chosen by SUPERSTORE_CACHE_BACKEND.
+
+    'memory' keeps entries in this process; 'sqlite' (file on disk) and 'shm'
+    (file on /dev/shm) are shared by every worker using the same path, and
+    only by processes of the same user. Payloads are bytes or str; frames go
+    through dump_frame()/load_frame().
+    """
+    kind = settings.CACHE_BACKEND
+    if kind == 'memory':
+        return MemoryBackend(namespace, max_entries, max_bytes)
+    if kind in _DEFAULT_PATHS:
+        return SQLiteBackend(namespace, max_entries, max_bytes, settings.CACHE_PATH or _DEFAULT_PATHS[kind], kind)
+    raise ValueError(f"Unknown cache backend {kind!r} (expected memory, sqlite or shm)")
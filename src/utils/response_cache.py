@@ -0,0 +1,106 @@
+import functools
+import json
+import threading
+import time
+
+import dash
+from plotly.io.json import to_json_plotly
+
+from src.config import settings
+from src.data.query import data_version
+from src.utils.cache_backend import open_cache
+
+# Output callback halaman yang sudah diserialisasi (JSON), per
+# (callback, filter state ternormalisasi, versi data), di backend SUPERSTORE_CACHE_BACKEND
+_backend = None
+_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0, 'expired': 0, 'uncached': 0}
+
+
+def _get_backend():
+    global _backend
+    if _backend is None:
+        with _lock:
+            if _backend is None:
+                _backend = open_cache('responses', settings.RESPONSE_CACHE_SIZE,
+                                      settings.RESPONSE_CACHE_MB * 1024 ** 2)
+    return _backend
+
+
+def _count(name):
+    with _lock:
+        _stats[name] += 1
+
+
+def _normalize(value):
+    """Filter state in a canonical form: stripped strings, dicts with sorted keys"""
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in sorted(value.items(), key=lambda item: str(item[0]))}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def cache_key(name, args, version):
+    return json.dumps([name, version, _normalize(list(args))], sort_keys=True, default=str)
+
+
+def _get(key):
+    entry = _get_backend().get(key)
+    if entry is None:
+        _count('misses')
+        return None
+    stored, payload = entry
+    if settings.RESPONSE_CACHE_TTL > 0 and time.time() - stored > settings.RESPONSE_CACHE_TTL:
+        _get_backend().delete(key)
+        _count('expired')
+        _count('misses')
+        return None
+    _count('hits')
+    return payload
+
+
+def _has_no_update(outputs):
+    values = outputs if isinstance(outputs, (list, tuple)) else [outputs]
+    return any(value is dash.no_update for value in values)
+
+
+def cached_callback(name):
+    """Cache the outputs of a page callback per (name, arguments, data version).
+
+    Outputs are stored serialized (figures and components as plain JSON) and
+    replayed as-is on a hit. Results containing dash.no_update are not cached.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args):
+            if not settings.RESPONSE_CACHE:
+                return func(*args)
+            version = data_version()
+            key = cache_key(name, args, version)
+            payload = _get(key)
+            if payload is not None:
+                return json.loads(payload)
+
+            outputs = func(*args)
+            if _has_no_update(outputs):
+                _count('uncached')
+                return outputs
+            # Encoder yang sama dengan response Dash, jadi hit dan miss identik
+            _get_backend().set(key, version, to_json_plotly(outputs))
+            return outputs
+        return wrapper
+    return decorator
+
+
+def clear():
+    _get_backend().clear()
+
+
+def get_stats():
+    """Hit/miss counters of this process plus the backend's entry count and size"""
+    with _lock:
+        stats = dict(_stats)
+    return {**stats, **_get_backend().stats()}
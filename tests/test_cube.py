@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.config import settings
+from src.data.cube import MAX_RAW_DISCOUNT_VALUES, answer, build_cube
+from src.data.filters import filter_frame, frame_column
+
+MEASURES = {
+    'total_sales': ('sales', 'sum'),
+    'avg_profit': ('profit', 'mean'),
+    'lines': ('quantity', 'count'),
+    'orders': ('order_key', 'nunique'),
+    'customers': ('customer_id', 'nunique'),
+}
+
+
+def _frame(discounts, n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'year': rng.choice([2014, 2015, 2016], n),
+        'category': pd.Categorical(rng.choice(['Furniture', 'Technology', 'Office Supplies'], n)),
+        'segment': rng.choice(['Consumer', 'Corporate'], n),
+        'region': rng.choice(['East', 'West', 'Central'], n),
+        'sales': rng.gamma(2, 100, n).round(2),
+        'profit': rng.normal(20, 80, n).round(2),
+        'quantity': rng.integers(1, 10, n),
+        'discount': rng.choice(discounts, n),
+        'order_key': rng.integers(1, n // 2, n),
+        'customer_id': pd.Categorical([f'C-{i}' for i in rng.integers(0, 300, n)]),
+    })
+
+
+def _expected(df, by, filters=None):
+    df = filter_frame(df, filters or {})
+    grouped = df.groupby([frame_column(df, name) for name in by], observed=True)
+    return pd.DataFrame({name: grouped[col].agg(func) for name, (col, func) in MEASURES.items()}).reset_index()
+
+
+@pytest.fixture(autouse=True)
+def exact_distinct(monkeypatch):
+    monkeypatch.setattr(settings, 'DISTINCT_SKETCH', 'exact')
+
+
+# Diskon mentah di grain cube, atau (terlalu banyak nilai) hanya band-nya
+@pytest.mark.parametrize('discounts', [
+    [0, 0.1, 0.2, 0.3, 0.5],
+    np.round(np.linspace(0, 0.8, MAX_RAW_DISCOUNT_VALUES + 10), 3),
+])
+@pytest.mark.parametrize('by, filters', [
+    (['category'], None),
+    (['year', 'region'], {'segment': 'Corporate'}),
+    (['discount_range'], None),
+    (['discount_range'], {'category': ('in', ['Furniture', 'Technology'])}),
+])
+def test_answer_matches_groupby(discounts, by, filters):
+    df = _frame(discounts)
+    result = answer(build_cube(df), MEASURES, by, filters)
+    expected = _expected(df, by, filters)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False, check_categorical=False)
+
+
+def test_answer_without_grouping():
+    df = _frame([0, 0.2])
+    result = answer(build_cube(df), MEASURES)
+    assert len(result) == 1
+    assert result['total_sales'].iloc[0] == pytest.approx(df['sales'].sum())
+    assert result['orders'].iloc[0] == df['order_key'].nunique()
+
+
+def test_row_level_queries_are_not_answered():
+    cube = build_cube(_frame([0, 0.2]))
+    assert answer(cube, {'top': ('sales', 'max')}, ['category']) is None
+    assert answer(cube, MEASURES, ['customer_id']) is None
@@ -0,0 +1,82 @@
+import numpy as np
+import plotly.graph_objects as go
+import pytest
+
+from src.components.figures import apply_point_budget, histogram, histogram_bins
+
+
+def test_bins_have_round_edges_and_count_every_value():
+    values = np.random.default_rng(2).gamma(2, 100, 5000)
+    edges, totals = histogram_bins(values, 20)
+    widths = np.diff(edges)
+    assert np.allclose(widths, widths[0])
+    scale = 10 ** np.floor(np.log10(widths[0]))
+    assert widths[0] / scale in (1, 2, 2.5, 5)
+    assert edges[0] <= values.min() and edges[-1] >= values.max()
+    assert totals.sum() == len(values)
+    assert len(totals) <= 25
+
+
+def test_weights_are_summed_per_bin():
+    edges, totals = histogram_bins([0.5, 1.5, 1.7, np.nan, 3.0], 3, weights=[1, 2, 3, 100, 4])
+    assert edges.tolist() == [0, 1, 2, 3, 4]
+    # NaN (dan bobotnya) dibuang
+    assert totals.tolist() == [1, 5, 0, 4]
+
+
+def test_float32_values_on_an_edge_stay_in_their_bin():
+    # float32: 0.7 tersimpan sebagai 0.69999999, tetap di bin [0.7, 0.8)
+    values = [0.1, 0.2, 0.3, 0.7, 0.8]
+    for dtype in (np.float64, np.float32):
+        edges, totals = histogram_bins(np.array(values, dtype=dtype), 8)
+        assert edges.tolist() == pytest.approx([0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9])
+        assert totals.tolist() == [1, 1, 1, 0, 0, 0, 1, 1]
+
+
+@pytest.mark.parametrize('values', [[], [np.nan], [5.0, 5.0]])
+def test_degenerate_inputs(values):
+    edges, totals = histogram_bins(values, 10)
+    assert totals.sum() == len([v for v in values if not np.isnan(v)])
+    assert len(edges) == len(totals) + 1
+
+
+def test_histogram_draws_one_bar_per_bin():
+    values = np.arange(100)
+    figure = histogram(values, 10, 'Title', 'value', '#667eea')
+    edges, totals = histogram_bins(values, 10)
+    bar = figure.data[0]
+    assert bar.type == 'bar'
+    assert list(bar.y) == totals.tolist()
+    assert np.allclose(bar.width, np.diff(edges))
+
+
+def _scatter(n, seed=3):
+    rng = np.random.default_rng(seed)
+    x, y = rng.normal(0, 1, n), rng.normal(0, 1, n)
+    # Satu outlier jauh dari cluster
+    x[0], y[0] = 40.0, -40.0
+    return go.Figure([
+        go.Scatter(x=x, y=y, mode='markers', marker={'size': rng.uniform(1, 10, n), 'color': np.arange(n)},
+                   customdata=np.arange(n), name='points'),
+        go.Scatter(x=[-3, 3], y=[0, 0], mode='lines', name='trend'),
+    ])
+
+
+def test_figure_within_budget_is_unchanged():
+    figure = _scatter(100)
+    assert apply_point_budget(figure, 100) is figure
+    assert apply_point_budget(figure, 0) is figure
+
+
+def test_scatter_above_budget_is_thinned_to_webgl():
+    figure = apply_point_budget(_scatter(20_000), 1000)
+    points, trend = figure.data
+    assert points.type == 'scattergl' and trend.type == 'scatter'
+    assert 0 < len(points.x) <= 1000
+    # Properti per titik dipotong bersama x/y
+    kept = np.asarray(points.customdata)
+    original = _scatter(20_000).data[0]
+    assert np.array_equal(points.x, np.asarray(original.x)[kept])
+    assert np.array_equal(points.marker.size, np.asarray(original.marker.size)[kept])
+    assert np.array_equal(points.marker.color, kept)
+    assert 0 in kept
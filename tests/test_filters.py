@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.bitmap import CHUNK_SIZE, build_index
+from src.data.filters import filter_key, select_rows
+
+
+@pytest.fixture(scope='module')
+def df():
+    # Lebih dari dua chunk: kategori besar jadi bitset, kota jadi array container
+    n = 2 * CHUNK_SIZE + 1234
+    rng = np.random.default_rng(1)
+    return pd.DataFrame({
+        'category': pd.Categorical(rng.choice(['Furniture', 'Technology', 'Office Supplies'], n)),
+        'segment': rng.choice(['Consumer', 'Corporate', 'Home Office'], n),
+        'city': pd.Categorical([f'City {i}' for i in rng.integers(0, 500, n)]),
+        'year': rng.choice([2014, 2015, 2016], n),
+        'month': rng.integers(1, 13, n),
+        'customer_name': pd.Categorical([f'Cust {i}' for i in rng.integers(0, 40_000, n)]),
+        'order_key': rng.integers(1, 60_000, n),
+        'discount': rng.choice([0, 0.1, 0.2, 0.35, 0.5], n),
+        'sales': rng.gamma(2, 100, n),
+    })
+
+
+@pytest.fixture(scope='module')
+def index(df):
+    return build_index(df)
+
+
+def _expected(df, filters):
+    mask = np.ones(len(df), dtype=bool)
+    for name, condition in filters.items():
+        if name == 'discount_range':
+            low, high = {'0-10%': (0, 0.1), '20-30%': (0.2, 0.3), '30%+': (0.3, 1.0)}[condition]
+            mask &= (df['discount'] > low).to_numpy() & (df['discount'] <= high).to_numpy()
+        elif name == 'repeat_customer':
+            orders = df.groupby('customer_name', observed=True)['order_key'].nunique()
+            mask &= df['customer_name'].isin(orders.index[(orders > 1) == condition]).to_numpy()
+        elif isinstance(condition, tuple) and condition[0] == 'between':
+            mask &= ((df[name] >= condition[1]) & (df[name] < condition[2])).to_numpy()
+        elif isinstance(condition, tuple):
+            isin = df[name].isin(condition[1]).to_numpy()
+            mask &= isin if condition[0] == 'in' else ~isin
+        else:
+            mask &= (df[name] == condition).to_numpy()
+    return np.flatnonzero(mask)
+
+
+@pytest.mark.parametrize('filters', [
+    {'category': 'Technology'},
+    {'category': 'Furniture', 'year': 2015, 'month': 3},
+    {'city': ('in', ['City 7', 'City 99', 'Nowhere'])},
+    {'city': ('in', [])},
+    {'segment': ('not in', ['Consumer']), 'category': 'Office Supplies'},
+    {'category': 'Unknown'},
+    {'year': 2016, 'sales': ('between', 100, 300)},
+    {'discount_range': '20-30%', 'segment': 'Corporate'},
+    {'repeat_customer': True, 'category': 'Technology'},
+    {'repeat_customer': False},
+])
+def test_select_rows_with_and_without_index(df, index, filters):
+    expected = _expected(df, filters)
+    without = select_rows(df, filters)
+    with_index = select_rows(df, filters, index)
+    assert np.array_equal(without, expected)
+    assert np.array_equal(with_index, expected)
+
+
+def test_no_filters_select_every_row(df, index):
+    assert select_rows(df, {}) is None
+    assert select_rows(df, None, index) is None
+
+
+def test_filter_key_ignores_order():
+    a = filter_key({'year': 2015, 'city': ('in', ['A', 'B'])})
+    b = filter_key({'city': ('in', ('A', 'B')), 'year': 2015})
+    assert a == b
+    assert hash(a) == hash(b)
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+
+from src.data import query
+from src.data.filters import filter_frame, frame_column
+from src.data.star import join_star, resolve_columns
+
+
+def _star(n=500, seed=4):
+    rng = np.random.default_rng(seed)
+    dims = {
+        'dim_customer': pd.DataFrame({'customer_key': np.arange(1, 41), 'customer_id': [f'C-{i}' for i in range(40)],
+                                      'customer_name': [f'Cust {i % 30}' for i in range(40)],
+                                      'segment': rng.choice(['Consumer', 'Corporate', 'Home Office'], 40)}),
+        'dim_product': pd.DataFrame({'product_key': np.arange(1, 21),
+                                     'category': rng.choice(['Furniture', 'Technology'], 20)}),
+        'dim_order': pd.DataFrame({'order_key': np.arange(1, 201), 'order_id': [f'O-{i}' for i in range(200)]}),
+        'dim_time': pd.DataFrame({'time_key': np.arange(1, 13), 'year': [2014, 2015, 2016] * 4,
+                                  'month': np.arange(1, 13)}),
+        'dim_region': pd.DataFrame({'region_key': np.arange(1, 9),
+                                    'region': ['East', 'West', 'Central', 'South'] * 2}),
+    }
+    fact = pd.DataFrame({
+        'order_key': rng.integers(1, 201, n),
+        'product_key': rng.integers(1, 21, n),
+        'customer_key': rng.integers(1, 41, n),
+        'time_key': rng.integers(1, 13, n),
+        'region_key': rng.integers(1, 9, n),
+        'sales': rng.gamma(2, 100, n).round(2),
+        'discount': rng.choice([0, 0.1, 0.2, 0.3, 0.5], n),
+    })
+    return fact, dims
+
+
+@pytest.fixture
+def star(monkeypatch):
+    fact, dims = _star()
+    sources = resolve_columns(list(fact.columns), {table: list(frame.columns) for table, frame in dims.items()})
+    monkeypatch.setattr(query, '_sources', lambda: sources)
+    return fact, dims
+
+
+def test_filtered_group_by_text(star):
+    statement, params = query.build_sql({'total_sales': ('sales', 'sum'), 'customers': ('customer_id', 'nunique')},
+                                        ['category'], {'region': 'West', 'segment': ('in', ['Consumer'])},
+                                        order_by='total_sales', limit=5)
+    assert str(statement) == (
+        'SELECT dim_product."category" AS "category", SUM(fact_sales."sales") AS "total_sales", '
+        'COUNT(DISTINCT dim_customer."customer_id") AS "customers" '
+        'FROM fact_sales '
+        'LEFT JOIN dim_customer ON dim_customer.customer_key = fact_sales.customer_key '
+        'LEFT JOIN dim_product ON dim_product.product_key = fact_sales.product_key '
+        'LEFT JOIN dim_region ON dim_region.region_key = fact_sales.region_key '
+        'WHERE dim_product."category" IS NOT NULL AND dim_region."region" = :p0 '
+        'AND dim_customer."segment" IN (__[POSTCOMPILE_p1]) '
+        'GROUP BY 1 ORDER BY "total_sales" DESC, 1 LIMIT 5'
+    )
+    assert params == {'p0': 'West', 'p1': ['Consumer']}
+
+
+def test_only_needed_dimensions_are_joined(star):
+    statement, params = query.build_sql({'n': ('sales', 'count')}, None, {'sales': ('between', 10, 100)})
+    assert str(statement) == ('SELECT COUNT(fact_sales."sales") AS "n" FROM fact_sales '
+                              'WHERE fact_sales."sales" >= :p0_low AND fact_sales."sales" < :p0_high')
+    assert params == {'p0_low': 10, 'p0_high': 100}
+
+
+def test_unknown_column_is_rejected(star):
+    with pytest.raises(KeyError):
+        query.build_sql({'n': ('shipping_cost', 'sum')}, ['category'])
+
+
+MEASURES = {'total_sales': ('sales', 'sum'), 'orders': ('order_key', 'nunique'), 'lines': ('sales', 'count')}
+
+
+# Hasil GROUP BY di database sama dengan groupby pandas atas join yang sama
+@pytest.mark.parametrize('by, filters', [
+    (['category', 'year'], {'region': 'West'}),
+    (['discount_range'], {'segment': ('in', ['Consumer', 'Corporate'])}),
+    (['region'], {'discount_range': '20-30%', 'year': ('not in', [2015])}),
+    (['segment'], {'repeat_customer': True}),
+    (['segment'], {'repeat_customer': False, 'sales': ('between', 50, 400)}),
+])
+def test_statement_matches_pandas(star, by, filters):
+    fact, dims = star
+    engine = create_engine('sqlite://')
+    for table, frame in {'fact_sales': fact, **dims}.items():
+        frame.to_sql(table, engine, index=False)
+    statement, params = query.build_sql(MEASURES, by, filters)
+    with engine.connect() as connection:
+        result = pd.read_sql(statement, connection, params=params).sort_values(by, ignore_index=True)
+
+    df = filter_frame(join_star(fact, dims), filters)
+    grouped = df.groupby([frame_column(df, name) for name in by], observed=True)
+    expected = pd.DataFrame({name: grouped[col].agg(func) for name, (col, func) in MEASURES.items()}).reset_index()
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False, check_categorical=False)
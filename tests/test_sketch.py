@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.sketch import MAX_PRECISION, MIN_PRECISION, build_sketch, count_distinct
+
+
+@pytest.mark.parametrize('precision', [MIN_PRECISION, MAX_PRECISION])
+def test_count_distinct_at_precision_bounds(precision):
+    # 200k distinct values in 4 cells; groups {0, 1} and {2, 3} plus an unselected group (-1)
+    n = 200_000
+    values = pd.Series(np.arange(n)).astype(str)
+    cells = np.arange(n) % 4
+    sketch = build_sketch(cells, values, mode='hll', precision=precision)
+
+    assert sketch.keys.min() >= 0
+    assert sketch.keys.max() < 1 << precision
+
+    counts = count_distinct(sketch, np.array([0, 0, 1, -1]), 2)
+    expected = np.array([n // 2, n // 4])
+    error = 1.04 / np.sqrt(2 ** precision)
+    assert np.all(np.abs(counts - expected) <= 4 * error * expected)
+
+
+def test_count_distinct_exact_mode():
+    values = pd.Series(['a', 'b', 'a', 'c', None, 'b'])
+    sketch = build_sketch(np.array([0, 0, 1, 1, 1, 2]), values, mode='exact')
+    assert count_distinct(sketch, np.array([0, 0, 1]), 2).tolist() == [3, 1]
+
+
+def test_precision_out_of_range():
+    with pytest.raises(ValueError):
+        build_sketch(np.zeros(1), pd.Series([1]), precision=MAX_PRECISION + 1)
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.star import STAR_DIMENSIONS, join_star, key_positions
+
+
+def _star(key_offset=1):
+    dates = pd.to_datetime(['2014-01-03', '2014-02-10', '2015-06-30'])
+    dims = {
+        'dim_customer': pd.DataFrame({'customer_id': ['C-1', 'C-2'], 'segment': ['Consumer', 'Corporate'],
+                                      'customer_key': [1, 2]}),
+        'dim_product': pd.DataFrame({'category': pd.Categorical(['Technology', 'Furniture', 'Technology']),
+                                     'product_key': [1, 2, 3]}),
+        'dim_order': pd.DataFrame({'order_id': ['O-1', 'O-2'], 'order_date': dates[:2], 'order_key': [1, 2]}),
+        'dim_time': pd.DataFrame({'order_date': dates, 'year': dates.year, 'time_key': [1, 2, 3]}),
+        'dim_region': pd.DataFrame({'region': ['East', 'West'], 'region_key': [1, 2]}),
+    }
+    for table, key in STAR_DIMENSIONS:
+        dims[table][key] += key_offset - 1
+    fact = pd.DataFrame({
+        'order_key': [1, 2, 2, 1, 3],  # order_key 3 tidak ada di dim_order
+        'product_key': [3, 1, 2, 2, 1],
+        'customer_key': [2, 1, 1, 2, 2],
+        'time_key': [1, 2, 2, 3, 1],
+        'region_key': [1, 2, 1, 1, 2],
+        'sales': [10.5, 20.0, 7.25, 3.0, 1.0],
+    })
+    for _, key in STAR_DIMENSIONS:
+        fact[key] += key_offset - 1
+    return fact, dims
+
+
+def _merge_chain(fact, dims):
+    df = fact
+    for table, key in STAR_DIMENSIONS:
+        df = df.merge(dims[table], on=key, how='left')
+    return df
+
+
+# Key rapat (index + 1) memakai lookup array, key jarang memakai hash lookup
+@pytest.mark.parametrize('key_offset', [1, 10_000])
+def test_join_star_matches_merge_chain(key_offset):
+    fact, dims = _star(key_offset)
+    expected = _merge_chain(fact, dims)
+    result = join_star(fact, dims)
+    pd.testing.assert_frame_equal(result[expected.columns], expected)
+    assert set(result.columns) == set(expected.columns)
+
+
+def test_key_positions_marks_unmatched_keys():
+    positions = key_positions(pd.Series([1, 2, 3]), pd.Series([3.0, np.nan, 7.0, 1.0]))
+    assert positions.tolist() == [2, -1, -1, 0]
+
+
+def test_duplicate_dimension_keys_are_rejected():
+    with pytest.raises(ValueError):
+        key_positions(pd.Series([1, 1], name='customer_key'), pd.Series([1]))
@@ -0,0 +1,67 @@
+import pandas as pd
+import pytest
+
+from src.components.tables import apply_filter_query, table_page
+
+FORMATS = {'sales': ',.2f'}
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        'city': pd.Categorical(['Seattle', 'Houston', 'New York City', 'houston heights', 'Chicago', 'Austin']),
+        'state': ['Washington', 'Texas', 'New York', 'Texas', 'Illinois', 'Texas'],
+        'sales': [1200.5, 300.0, 5000.25, 300.0, 75.0, 980.0],
+        'orders': [12, 3, 40, 3, 1, 9],
+    })
+
+
+@pytest.mark.parametrize('filter_query, cities', [
+    ('{sales} > 300', ['Seattle', 'New York City', 'Austin']),
+    ('{sales} >= 300 && {orders} < 10', ['Houston', 'houston heights', 'Austin']),
+    ('{orders} = 3', ['Houston', 'houston heights']),
+    ('{state} != Texas', ['Seattle', 'New York City', 'Chicago']),
+    ('{state} eq "New York"', ['New York City']),
+    ('{city} contains Hou', ['Houston']),
+    ('{city} icontains hou', ['Houston', 'houston heights']),
+    ('{city} ieq HOUSTON', ['Houston']),
+    ('{city} scontains houston', ['houston heights']),
+])
+def test_filter_query_operators(frame, filter_query, cities):
+    assert apply_filter_query(frame, filter_query)['city'].tolist() == cities
+
+
+@pytest.mark.parametrize('filter_query', [
+    '',
+    None,
+    '{missing} > 1',
+    '{sales} ~ 3',
+    '{sales} > lots',
+])
+def test_unusable_filter_parts_are_ignored(frame, filter_query):
+    assert len(apply_filter_query(frame, filter_query)) == len(frame)
+
+
+def test_page_of_sorted_rows(frame):
+    sort_by = [{'column_id': 'sales', 'direction': 'desc'}, {'column_id': 'city', 'direction': 'asc'}]
+    records, page_count, tooltips, page = table_page(frame, 1, 2, sort_by, '{state} != Illinois', FORMATS)
+    assert [r['city'] for r in records] == ['Austin', 'Houston']
+    assert (page_count, page) == (3, 1)
+    assert tooltips[0]['sales'] == {'value': '980.00', 'type': 'markdown'}
+    assert tooltips[1]['city']['value'] == 'Houston'
+
+
+def test_sort_on_unknown_column_is_ignored(frame):
+    records, _, _, _ = table_page(frame, 0, 10, [{'column_id': 'missing', 'direction': 'asc'}], None, FORMATS)
+    assert [r['city'] for r in records] == frame['city'].tolist()
+
+
+def test_page_past_the_end_moves_to_last_page(frame):
+    records, page_count, _, page = table_page(frame, 7, 4, None, None, FORMATS)
+    assert (page_count, page) == (2, 1)
+    assert [r['city'] for r in records] == ['Chicago', 'Austin']
+
+
+def test_no_matching_rows_give_one_empty_page(frame):
+    records, page_count, tooltips, page = table_page(frame, 3, 10, None, '{sales} > 1e9', FORMATS)
+    assert (records, page_count, tooltips, page) == ([], 1, [], 0)
@@ -0,0 +1,22 @@
+"""WSGI entry point for production servers (gunicorn -c gunicorn.conf.py wsgi:server).
+
+With gunicorn's preload_app the dataset, its cube and bitmap index and the
+prediction models are loaded here, once, in the master. Forked workers share
+those pages copy-on-write and start serving warm.
+"""
+import gc
+import logging
+
+from app import create_app
+from src.data.refresher import warm_up
+
+logging.basicConfig(level=logging.INFO)
+
+app = create_app(background=False)
+server = app.server
+
+warm_up()
+# Objek yang sudah ada tidak dipindai GC lagi: kalau dipindai, header objeknya ditulis
+# dan halaman copy-on-write yang dibagi dengan worker jadi tersalin
+gc.collect()
+gc.freeze()